@@ -0,0 +1,76 @@
+"""Backfill `event_participants` from the legacy `involved_*` columns of `events`.
+
+Usage:
+    python backfill_event_participants.py --commit [--batch 5000]
+
+By default the script runs in dry-run mode and reports how many participant
+rows would be written. Rows are inserted with INSERT OR IGNORE, so the script
+can be re-run safely (e.g. after an interrupted run).
+"""
+import argparse
+import sys
+from pathlib import Path
+
+
+def get_args():
+    p = argparse.ArgumentParser()
+    p.add_argument('--commit', action='store_true')
+    p.add_argument('--batch', type=int, default=5000)
+    return p.parse_args()
+
+
+def main():
+    args = get_args()
+    try:
+        # ensure project root is on sys.path so `src` package resolves
+        proj_root = Path(__file__).resolve().parents[1]
+        if str(proj_root) not in sys.path:
+            sys.path.insert(0, str(proj_root))
+        from src.db.database import get_connection
+        from src.db.migrations import apply_migrations
+        from src.db.queries import extract_participants, record_participants
+    except Exception as e:
+        print('Failed to import DB helper:', e)
+        sys.exit(1)
+
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='events'")
+    if not c.fetchone():
+        print('Events table not found in DB. Run init_db or ensure schema is applied.')
+        conn.close()
+        sys.exit(1)
+    apply_migrations(conn)
+
+    last_id = 0
+    scanned = 0
+    written = 0
+    while True:
+        c.execute(
+            'SELECT id, timestamp, involved_characters, involved_locations FROM events WHERE id > ? ORDER BY id LIMIT ?',
+            (last_id, args.batch),
+        )
+        rows = c.fetchall()
+        if not rows:
+            break
+        for row_id, ts, chars, locs in rows:
+            event = {'involved_characters': chars, 'involved_locations': locs}
+            if args.commit:
+                written += record_participants(c, row_id, event, ts)
+            else:
+                written += len(extract_participants(event))
+        scanned += len(rows)
+        last_id = rows[-1][0]
+        if args.commit:
+            conn.commit()
+        print(f'Scanned {scanned} events (last id {last_id}), {written} participant rows')
+
+    if not args.commit:
+        print('Dry-run mode; no changes made. Rerun with --commit to write.')
+    else:
+        print(f'Backfilled {written} participant rows from {scanned} events')
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Bytes-on-the-wire and CPU benchmark for the ZMQ payload codecs.
+
+Usage:
+    python scripts/bench_codecs.py [--count 100000]
+
+Encodes and decodes a tick message and a typical event message with every
+installed codec (`src.wire`) and reports frame bytes and µs per
+encode/decode. MessagePack is only included when `msgpack` is installed.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+
+def get_args():
+    p = argparse.ArgumentParser()
+    p.add_argument('--count', type=int, default=100_000)
+    return p.parse_args()
+
+
+TICK = {
+    'type': 'system_tick',
+    'tick_id': 48211,
+    'timestamp': 1792224000.123456,
+    'data': {'world_time': 48211, 'timestamp': 1792224000.123, 'ticks': 1},
+}
+
+EVENT = {
+    'event_id': 'evt_1792224000123_3f2a000017',
+    'timestamp': 1792224000.456789,
+    'id': 'evt_1792224000120_3f2a000016',
+    'type': 'character_interaction',
+    'location_id': 7,
+    'involved_characters': [12, 31],
+    'involved_factions': [3],
+    'description': 'Mara trades a worn compass to the ferryman for passage across the flooded quarter.',
+    'metadata': {'arc': 'the_drowned_road', 'mood': 'wary', 'items': [{'id': 44, 'qty': 1}], 'impact': 0.35},
+}
+
+
+def time_per_call(fn, arg, count):
+    t0 = time.perf_counter()
+    for _ in range(count):
+        fn(arg)
+    return (time.perf_counter() - t0) / count * 1e6
+
+
+def main():
+    args = get_args()
+    proj_root = Path(__file__).resolve().parents[1]
+    if str(proj_root) not in sys.path:
+        sys.path.insert(0, str(proj_root))
+    from src.wire import CODECS, MSGPACK_CODEC
+
+    if MSGPACK_CODEC is None:
+        print('msgpack not installed; only JSON is measured (pip install msgpack)')
+    print(f"{'payload':8s} {'codec':8s} {'bytes':>6s} {'enc µs':>8s} {'dec µs':>8s}")
+    for label, payload in (('tick', TICK), ('event', EVENT)):
+        for codec in CODECS.values():
+            body = codec.encode(payload)
+            assert codec.decode(body) == payload
+            enc = time_per_call(codec.encode, payload, args.count)
+            dec = time_per_call(codec.decode, body, args.count)
+            print(f'{label:8s} {codec.name:8s} {len(body):6d} {enc:8.2f} {dec:8.2f}')
+
+
+if __name__ == '__main__':
+    main()
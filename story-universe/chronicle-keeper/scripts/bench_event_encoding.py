@@ -0,0 +1,101 @@
+"""Encoding CPU per accepted event: serialize-once vs the old per-stage encoding.
+
+Usage:
+    python scripts/bench_event_encoding.py [--count 20000]
+
+Times the serialization work an accepted event costs after schema
+validation:
+
+- legacy: `json.dumps` for the `payload` column, `json.dumps` of the ZMQ
+  event message, and FastAPI's `jsonable_encoder` + `json.dumps` of the row
+  for `/world/events/recent`
+- once: one `encode_event`, the stored buffer decoded for the column, the
+  envelope spliced onto it for ZMQ, and the buffer joined into the history
+  response
+
+Reports µs per event for each stage and the total saved.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+
+def get_args():
+    p = argparse.ArgumentParser()
+    p.add_argument('--count', type=int, default=20_000)
+    return p.parse_args()
+
+
+RAW_EVENT = {
+    'id': 'evt_1792224000120_3f2a000016',
+    'type': 'character_interaction',
+    'timestamp': 1792224000,
+    'source': 'narrative_engine',
+    'location_id': 7,
+    'involved_characters': [12, 31],
+    'involved_factions': [3],
+    'description': 'Mara trades a worn compass to the ferryman for passage across the flooded quarter.',
+    'data': {'arc': 'the_drowned_road', 'mood': 'wary', 'items': [{'id': 44, 'qty': 1}], 'impact': 0.35},
+    'metadata': {'causationId': 'evt_1792223990001_3f2a000002', 'correlationId': 'arc_1792223000000_3f2a000001'},
+}
+
+
+def timed(fn, count):
+    t0 = time.perf_counter()
+    for _ in range(count):
+        fn()
+    return (time.perf_counter() - t0) / count * 1e6
+
+
+def main():
+    args = get_args()
+    proj_root = Path(__file__).resolve().parents[1]
+    if str(proj_root) not in sys.path:
+        sys.path.insert(0, str(proj_root))
+    from fastapi.encoders import jsonable_encoder
+    from src.ids import new_id
+    from src.messaging.publisher import TickPublisher
+    from src.models.canonical_event import CanonicalEvent, encode_event
+    from src.wire import JSON_CODEC
+
+    evd = CanonicalEvent.model_validate(dict(RAW_EVENT)).model_dump()
+    # event messages are built without a socket; the publisher never connects
+    pub = TickPublisher.__new__(TickPublisher)
+    pub.codec = JSON_CODEC
+    pub.skip_unsubscribed = False
+
+    def row(payload):
+        return {'id': 1, 'canonical_id': evd['id'], 'timestamp': evd['timestamp'], 'type': evd['type'],
+                'description': evd['description'], 'involved_characters': str(evd['involved_characters']),
+                'involved_locations': '[]', 'metadata': str(evd['metadata']), 'payload': payload,
+                'applied_at': evd['timestamp']}
+
+    legacy_payload = json.dumps(evd, default=str)
+    record = encode_event(evd)
+    stored = record.encoded.decode('utf-8')
+
+    stages = [
+        ('encode', lambda: None, lambda: encode_event(evd)),
+        ('store', lambda: json.dumps(evd, default=str), lambda: record.encoded.decode('utf-8')),
+        ('publish', lambda: json.dumps({'event_id': new_id(), 'timestamp': time.time(), **evd}).encode('utf-8'),
+         lambda: pub._event_message(record).body),
+        ('history', lambda: json.dumps(jsonable_encoder(row(legacy_payload))).encode('utf-8'),
+         lambda: stored.encode('utf-8')),
+    ]
+    totals = [0.0, 0.0]
+    print(f"{'stage':8s} {'legacy µs':>10s} {'once µs':>10s}")
+    for name, legacy, once in stages:
+        a = timed(legacy, args.count)
+        b = timed(once, args.count)
+        totals[0] += a
+        totals[1] += b
+        print(f'{name:8s} {a:10.2f} {b:10.2f}')
+    saved = totals[0] - totals[1]
+    print(f"{'total':8s} {totals[0]:10.2f} {totals[1]:10.2f}  saved {saved:.2f} µs/event "
+          f"({saved / totals[0] * 100:.0f}%)")
+
+
+if __name__ == '__main__':
+    main()
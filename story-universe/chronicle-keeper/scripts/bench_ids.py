@@ -0,0 +1,59 @@
+"""Throughput benchmark for the shared event id generator.
+
+Usage:
+    python scripts/bench_ids.py [--count 1000000] [--threads 1]
+
+Compares `src.ids.new_id` with the legacy `evt_<seconds>_<randint>` scheme
+and reports ids/sec plus how many legacy ids collided.
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+
+def get_args():
+    p = argparse.ArgumentParser()
+    p.add_argument('--count', type=int, default=1_000_000)
+    p.add_argument('--threads', type=int, default=1)
+    return p.parse_args()
+
+
+def legacy_id():
+    return f"evt_{int(time.time())}_{random.randint(0,9999)}"
+
+
+def run(fn, count, threads):
+    per_thread = count // threads
+    out = [None] * threads
+
+    def worker(slot):
+        out[slot] = [fn() for _ in range(per_thread)]
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    t0 = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - t0
+    ids = [i for chunk in out for i in chunk]
+    return len(ids) / elapsed, len(ids) - len(set(ids))
+
+
+def main():
+    args = get_args()
+    proj_root = Path(__file__).resolve().parents[1]
+    if str(proj_root) not in sys.path:
+        sys.path.insert(0, str(proj_root))
+    from src.ids import new_id
+
+    for name, fn in (('new_id', new_id), ('legacy', legacy_id)):
+        rate, dupes = run(fn, args.count, args.threads)
+        print(f'{name:8s} {rate:12,.0f} ids/sec  {dupes} collisions in {args.count:,}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""Publisher sender-thread throughput and latency: one message per pass vs micro-batches.
+
+Usage:
+    python scripts/bench_publisher.py [--count 20000] [--pings 200] [--addr tcp://127.0.0.1:5599]
+
+Runs a bound `TickPublisher` with a SUB socket on the same host and, for
+each sender setting (`send_batch` messages, `send_linger_us` wait):
+
+- burst: `--count` events are published back-to-back; reports messages/sec
+  from the first publish to the last message received
+- idle: `--pings` single events, each sent only after the previous one
+  arrived; reports publish-to-receive latency (p50/p99 µs)
+
+`send_batch=1` with no linger is the old one-message-per-pass sender.
+"""
+import argparse
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+
+def get_args():
+    p = argparse.ArgumentParser()
+    p.add_argument('--count', type=int, default=20_000)
+    p.add_argument('--pings', type=int, default=200)
+    p.add_argument('--addr', default='tcp://127.0.0.1:5599')
+    return p.parse_args()
+
+
+SETTINGS = [
+    ('one per pass', 1, 0),
+    ('batch 64', 64, 0),
+    ('batch 64 +200µs', 64, 200),
+]
+
+EVENT = {
+    'id': 'evt_1792224000120_3f2a000016',
+    'type': 'character_interaction',
+    'timestamp': 1792224000,
+    'location_id': 7,
+    'involved_characters': [12, 31],
+    'description': 'Mara trades a worn compass to the ferryman for passage across the flooded quarter.',
+}
+
+
+def burst(pub, sub, count):
+    def produce():
+        for _ in range(count):
+            pub.publish_event(EVENT)
+
+    received = 0
+    producer = threading.Thread(target=produce)
+    t0 = time.perf_counter()
+    producer.start()
+    # stop once the stream goes quiet; anything missing was dropped at the HWM
+    while received < count and sub.poll(1000):
+        sub.recv_multipart()
+        received += 1
+    elapsed = time.perf_counter() - t0
+    producer.join()
+    return received, received / elapsed
+
+
+def pings(pub, sub, n):
+    latencies = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        pub.publish_event(EVENT)
+        if not sub.poll(1000):
+            continue
+        sub.recv_multipart()
+        latencies.append((time.perf_counter() - t0) * 1e6)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+
+
+def main():
+    args = get_args()
+    proj_root = Path(__file__).resolve().parents[1]
+    if str(proj_root) not in sys.path:
+        sys.path.insert(0, str(proj_root))
+    import zmq
+    from src.messaging.publisher import SendLanes, TickPublisher
+
+    pub = TickPublisher(address=args.addr, bind=True, replay_addr='')
+    # room for the whole burst, so only the sender's speed is measured
+    pub._lanes = SendLanes(sizes={'event': args.count})
+    sub = zmq.Context.instance().socket(zmq.SUB)
+    sub.setsockopt(zmq.RCVHWM, 0)
+    sub.connect(args.addr)
+    sub.setsockopt_string(zmq.SUBSCRIBE, 'system:event')
+    try:
+        deadline = time.monotonic() + 5
+        while not pub.subscribers('event') and time.monotonic() < deadline:
+            time.sleep(0.02)
+        print(f"{'sender':18s} {'burst msg/s':>12s} {'delivered':>10s} {'flushes':>8s} "
+              f"{'idle p50 µs':>12s} {'idle p99 µs':>12s}")
+        for label, batch, linger_us in SETTINGS:
+            pub.send_batch = batch
+            pub.send_linger_s = linger_us / 1e6
+            flushes = pub._flushes
+            received, rate = burst(pub, sub, args.count)
+            flushes = pub._flushes - flushes
+            p50, p99 = pings(pub, sub, args.pings)
+            print(f'{label:18s} {rate:12,.0f} {received:10d} {flushes:8d} {p50:12.0f} {p99:12.0f}')
+    finally:
+        sub.close(linger=0)
+        pub.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""Replay benchmark for the snapshot+replay engine.
+
+Usage:
+    python scripts/bench_replay.py [--events 1000000] [--tail 10000]
+
+Builds a throwaway database, writes `--events` synthetic events straight
+into the log, then times:
+
+- a full replay of the log from the base snapshot (the no-snapshot worst case)
+- taking a snapshot
+- recovery from that snapshot plus a `--tail`-event tail
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+CHARACTERS = 1000
+LOCATIONS = 50
+FACTIONS = 20
+
+
+def get_args():
+    p = argparse.ArgumentParser()
+    p.add_argument('--events', type=int, default=1_000_000)
+    p.add_argument('--tail', type=int, default=10_000)
+    p.add_argument('--seed', type=int, default=7)
+    return p.parse_args()
+
+
+def make_event(rng, i):
+    roll = rng.random()
+    if roll < 0.4:
+        return {'type': 'character_action', 'timestamp': i, 'character_id': str(rng.randint(1, CHARACTERS)),
+                'action': 'move', 'location_id': str(rng.randint(1, LOCATIONS))}
+    if roll < 0.7:
+        return {'type': 'dialogue', 'timestamp': i, 'involved_characters': [str(rng.randint(1, CHARACTERS))]}
+    if roll < 0.8:
+        return {'type': 'character_state_change', 'timestamp': i, 'character_id': str(rng.randint(1, CHARACTERS)),
+                'new_status': rng.choice(['alive', 'injured'])}
+    src, tgt = rng.sample(range(1, FACTIONS + 1), 2)
+    return {'type': 'faction_event', 'timestamp': i, 'source_faction_id': src, 'target_faction_id': tgt,
+            'action': 'attack', 'severity': round(rng.random(), 2)}
+
+
+def write_events(conn, rng, start, count):
+    rows = []
+    for i in range(start, start + count):
+        ev = make_event(rng, i)
+        rows.append((f'evt_{i}', i, ev['type'], json.dumps(ev), 1_700_000_000 + i))
+        if len(rows) == 50_000:
+            conn.executemany('INSERT INTO events (canonical_id, timestamp, type, payload, applied_at) VALUES (?, ?, ?, ?, ?)', rows)
+            rows = []
+    if rows:
+        conn.executemany('INSERT INTO events (canonical_id, timestamp, type, payload, applied_at) VALUES (?, ?, ?, ?, ?)', rows)
+    conn.commit()
+
+
+def main():
+    args = get_args()
+    proj_root = Path(__file__).resolve().parents[1]
+    if str(proj_root) not in sys.path:
+        sys.path.insert(0, str(proj_root))
+    from src.db.database import configure_connection
+    from src.db.migrations import apply_migrations
+    from src.services.event_store import rebuild, take_snapshot
+
+    rng = random.Random(args.seed)
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, 'bench_replay.db')
+    conn = configure_connection(sqlite3.connect(path))
+    conn.executescript((proj_root / 'src' / 'db' / 'schema.sql').read_text(encoding='utf-8'))
+    conn.execute('CREATE TABLE IF NOT EXISTS events (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp INTEGER, type TEXT, '
+                 'description TEXT, involved_characters TEXT, involved_locations TEXT, metadata TEXT)')
+    conn.execute('CREATE TABLE IF NOT EXISTS system_state (key TEXT PRIMARY KEY, value TEXT)')
+    apply_migrations(conn)
+    conn.executemany('INSERT INTO characters (id, name, location_id, status) VALUES (?, ?, 1, ?)',
+                     [(i, f'C{i}', 'alive') for i in range(1, CHARACTERS + 1)])
+    conn.executemany('INSERT INTO locations (id, name) VALUES (?, ?)', [(i, f'L{i}') for i in range(1, LOCATIONS + 1)])
+    conn.executemany('INSERT INTO factions (id, name, personality_traits) VALUES (?, ?, ?)',
+                     [(i, f'F{i}', '{}') for i in range(1, FACTIONS + 1)])
+    conn.executemany('INSERT INTO faction_metrics (faction_id, trust) VALUES (?, 0.5)', [(i,) for i in range(1, FACTIONS + 1)])
+    conn.commit()
+    take_snapshot(conn)
+
+    t0 = time.perf_counter()
+    write_events(conn, rng, 0, args.events)
+    print(f'wrote {args.events:,} events in {time.perf_counter() - t0:.1f}s')
+
+    full = rebuild(conn)
+    print(f"full replay   {full['applied']:>10,} events  {full['seconds']:8.2f}s  "
+          f"{full['applied'] / full['seconds']:10,.0f} events/sec")
+
+    t0 = time.perf_counter()
+    take_snapshot(conn)
+    size = conn.execute('SELECT LENGTH(state) FROM state_snapshots ORDER BY id DESC LIMIT 1').fetchone()[0]
+    print(f'snapshot      {size / 1024:10,.1f} KiB  {time.perf_counter() - t0:8.2f}s')
+
+    write_events(conn, rng, args.events, args.tail)
+    tail = rebuild(conn)
+    print(f"snapshot+tail {tail['applied']:>10,} events  {tail['seconds']:8.2f}s  "
+          f"{tail['applied'] / max(tail['seconds'], 1e-9):10,.0f} events/sec")
+    conn.close()
+    for suffix in ('', '-wal', '-shm'):
+        try:
+            os.remove(path + suffix)
+        except OSError:
+            pass
+    os.rmdir(tmp)
+
+
+if __name__ == '__main__':
+    main()
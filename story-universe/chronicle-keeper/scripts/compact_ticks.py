@@ -0,0 +1,61 @@
+"""Run one tick-retention pass now and report what it reclaimed.
+
+Usage:
+    python scripts/compact_ticks.py [--keep-hours H] [--vacuum-pages N]
+    python scripts/compact_ticks.py --enable-auto-vacuum
+
+The pass moves legacy `system_tick` rows out of `events`, rolls raw ticks
+older than `--keep-hours` into hourly rows, and runs an incremental vacuum.
+`--enable-auto-vacuum` converts a database created before
+`auto_vacuum=INCREMENTAL` was the default. This rewrites the whole file, so
+stop the service first and expect it to take a while on an SD card.
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+
+def get_args():
+    p = argparse.ArgumentParser()
+    p.add_argument('--keep-hours', type=float, default=None)
+    p.add_argument('--vacuum-pages', type=int, default=None)
+    p.add_argument('--enable-auto-vacuum', action='store_true')
+    return p.parse_args()
+
+
+def main():
+    args = get_args()
+    try:
+        proj_root = Path(__file__).resolve().parents[1]
+        if str(proj_root) not in sys.path:
+            sys.path.insert(0, str(proj_root))
+        from src.db.database import DB_PATH, get_connection
+        from src.db.migrations import apply_migrations
+        from src.services import tick_retention
+    except Exception as e:
+        print('Failed to import DB helper:', e)
+        sys.exit(1)
+
+    conn = get_connection()
+    apply_migrations(conn)
+    if args.enable_auto_vacuum:
+        size = os.path.getsize(DB_PATH)
+        tick_retention.enable_incremental_vacuum(conn)
+        conn.close()
+        print(f'auto_vacuum=INCREMENTAL enabled; file {size} -> {os.path.getsize(DB_PATH)} bytes')
+        return
+    conn.close()
+
+    retention = tick_retention.TickRetention(
+        get_connection,
+        keep_hours=tick_retention.TICK_KEEP_HOURS if args.keep_hours is None else args.keep_hours,
+        vacuum_pages=tick_retention.VACUUM_PAGES if args.vacuum_pages is None else args.vacuum_pages,
+    )
+    result = retention.run_once()
+    print(f"Moved {result['legacy_moved']} legacy tick rows out of events, "
+          f"rolled up {result['rolled_up']} ticks, freed {result['pages_freed']} pages")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Collapse duplicate keys that block the unique indexes in `src/db/migrations.py`.
+
+Usage:
+    python dedupe_unique_keys.py --commit
+
+Startup migrations refuse to build a unique index (e.g.
+`ux_faction_relationships_pair`) while its table holds duplicate keys, and
+log the keys instead. This script keeps the newest row (highest rowid) for
+each duplicated key and then builds the indexes.
+
+By default the script runs in dry-run mode and lists the duplicate keys and
+how many rows would be deleted.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+
+def get_args():
+    p = argparse.ArgumentParser()
+    p.add_argument('--commit', action='store_true')
+    return p.parse_args()
+
+
+def main():
+    args = get_args()
+    try:
+        # ensure project root is on sys.path so `src` package resolves
+        proj_root = Path(__file__).resolve().parents[1]
+        if str(proj_root) not in sys.path:
+            sys.path.insert(0, str(proj_root))
+        from src.db.database import get_connection
+        from src.db.migrations import INDEXES, apply_migrations, dedupe_unique_keys, duplicate_keys
+    except Exception as e:
+        print('Failed to import DB helper:', e)
+        sys.exit(1)
+
+    conn = get_connection()
+    c = conn.cursor()
+    for name, table, columns, unique in INDEXES:
+        c.execute("SELECT 1 FROM sqlite_master WHERE name IN (?, ?)", (table, name))
+        if not unique or len(c.fetchall()) != 1:
+            # table missing, or the index already exists
+            continue
+        for row in duplicate_keys(c, table, columns):
+            print(f'{name}: {table} ({columns}) = {row[:-1]!r} has {row[-1]} rows')
+
+    removed = dedupe_unique_keys(conn, commit=args.commit)
+    if not args.commit:
+        print(f'Would delete {sum(removed.values())} rows: {removed}')
+        print('Dry-run mode; no changes made. Rerun with --commit to write.')
+    else:
+        print(f'Deleted {sum(removed.values())} rows: {removed}')
+        print('Created:', apply_migrations(conn))
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
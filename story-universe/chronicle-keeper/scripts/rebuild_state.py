@@ -0,0 +1,67 @@
+"""Rebuild canonical tables from the newest snapshot plus the event tail.
+
+Usage:
+    python scripts/rebuild_state.py [--until-event ID] [--commit]
+    python scripts/rebuild_state.py --snapshot
+
+By default the rebuild runs inside a transaction that is rolled back, and
+the script reports which tables differ from the live ones. `--commit`
+replaces the live tables (disaster recovery, or rewinding the world to
+`--until-event`). `--snapshot` takes a snapshot now and exits.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+
+def get_args():
+    p = argparse.ArgumentParser()
+    p.add_argument('--commit', action='store_true')
+    p.add_argument('--until-event', type=int, default=None)
+    p.add_argument('--snapshot', action='store_true')
+    return p.parse_args()
+
+
+def main():
+    args = get_args()
+    try:
+        proj_root = Path(__file__).resolve().parents[1]
+        if str(proj_root) not in sys.path:
+            sys.path.insert(0, str(proj_root))
+        from src.db.database import get_connection
+        from src.db.migrations import apply_migrations
+        from src.services.event_store import capture_state, rebuild, take_snapshot
+    except Exception as e:
+        print('Failed to import DB helper:', e)
+        sys.exit(1)
+
+    conn = get_connection()
+    apply_migrations(conn)
+    if args.snapshot:
+        print(f'Snapshot {take_snapshot(conn)} written')
+        conn.close()
+        return
+
+    before = capture_state(conn.cursor())
+    try:
+        stats = rebuild(conn, until_event_id=args.until_event, commit=args.commit)
+    except LookupError as e:
+        print(f'Cannot rebuild: {e}. Take a snapshot first (--snapshot).')
+        conn.close()
+        sys.exit(1)
+    after = capture_state(conn.cursor())
+    if not args.commit:
+        conn.rollback()
+    conn.close()
+
+    changed = [t for t in after if before.get(t) != after[t]]
+    print(f"Snapshot {stats['snapshot_id']} (after event {stats['snapshot_event_id']}): "
+          f"replayed {stats['applied']} events, skipped {stats['skipped']} legacy rows "
+          f"in {stats['seconds']:.2f}s")
+    print(f"Tables differing from live: {', '.join(changed) if changed else 'none'}")
+    if not args.commit:
+        print('Dry run; re-run with --commit to replace the live tables.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Fast-forward the world clock for soak tests.
+
+Usage:
+    python scripts/soak_clock.py [--ticks N] [--max-backlog M]
+
+Advances N ticks (default: 30 days of world time at 5s ticks) as fast as
+the publisher's send queue drains, publishing on the normal tick socket so
+a running narrative engine sees every tick. Writes to the configured DB
+(`CHRONICLE_KEEPER_DB_PATH`); stop the API first, since it binds the same
+ZMQ port and runs its own clock.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+MONTH_OF_TICKS = 30 * 24 * 3600 // 5
+
+
+def get_args():
+    p = argparse.ArgumentParser()
+    p.add_argument('--ticks', type=int, default=MONTH_OF_TICKS)
+    p.add_argument('--max-backlog', type=int, default=None)
+    return p.parse_args()
+
+
+def main():
+    args = get_args()
+    try:
+        proj_root = Path(__file__).resolve().parents[1]
+        if str(proj_root) not in sys.path:
+            sys.path.insert(0, str(proj_root))
+        from src.db.database import get_connection
+        from src.db.migrations import apply_migrations
+        from src.services.clock import CLOCK_MAX_BACKLOG, WorldClock
+    except Exception as e:
+        print('Failed to import clock:', e)
+        sys.exit(1)
+
+    conn = get_connection()
+    apply_migrations(conn)
+    conn.close()
+
+    clock = WorldClock()
+    start = clock.load_time()
+    try:
+        stats = clock.run_accelerated(args.ticks, CLOCK_MAX_BACKLOG if args.max_backlog is None else args.max_backlog)
+    finally:
+        clock.stop()
+    print(f"World time {start} -> {clock.world_time}: {stats['ticks']} ticks in {stats['seconds']:.1f}s "
+          f"({stats['ticks_per_s']:.0f} ticks/s, {stats['stalls']} backpressure stalls)")
+
+
+if __name__ == '__main__':
+    main()
@@ -14,6 +14,8 @@ try:
         ZMQ_PUB_BIND_ADDR,
         ZMQ_PUB_CLIENT_ADDR,
         ZMQ_SUB_ADDR,
+        ZMQ_REPLAY_BIND_ADDR,
+        ZMQ_REPLAY_CLIENT_ADDR,
         TICK_PORT,
         TICK_PUBLISHER_RECONNECT_DELAY,
     )
@@ -28,5 +30,7 @@ except Exception:
     ZMQ_PUB_BIND_ADDR = os.getenv("ZMQ_PUB_BIND_ADDR", f"tcp://*:{os.getenv('ZMQ_PORT','5555')}")
     ZMQ_PUB_CLIENT_ADDR = os.getenv("ZMQ_PUB_CLIENT_ADDR", f"tcp://{CHRONICLE_IP}:{os.getenv('ZMQ_PORT','5555')}")
     ZMQ_SUB_ADDR = os.getenv("ZMQ_SUB_ADDR", ZMQ_PUB_CLIENT_ADDR)
+    ZMQ_REPLAY_BIND_ADDR = os.getenv("ZMQ_REPLAY_BIND_ADDR", f"tcp://*:{os.getenv('ZMQ_REPLAY_PORT','5556')}")
+    ZMQ_REPLAY_CLIENT_ADDR = os.getenv("ZMQ_REPLAY_CLIENT_ADDR", f"tcp://{CHRONICLE_IP}:{os.getenv('ZMQ_REPLAY_PORT','5556')}")
     TICK_PORT = int(os.getenv("ZMQ_PORT", "5555"))
     TICK_PUBLISHER_RECONNECT_DELAY = float(os.getenv("TICK_PUBLISHER_RECONNECT_DELAY", "5.0"))
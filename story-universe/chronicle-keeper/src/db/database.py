@@ -1,12 +1,225 @@
 # SQLite/DuckDB connection helpers for Chronicle Keeper
+#
+# Connections are pooled per thread and opened in WAL mode so readers never
+# block the ingest writer. `get_connection()` keeps its historical contract:
+# callers may `close()` the returned object, which releases it back to the
+# pool instead of closing the file. Acquisitions on a thread nest: only the
+# outermost holder's release rolls back uncommitted work, so a helper that
+# closes its connection never discards its caller's open transaction.
 
+import logging
 import sqlite3
+import threading
 from pathlib import Path
+from typing import Dict, List, Optional
 
 import os
 DB_PATH = os.environ.get("CHRONICLE_KEEPER_DB_PATH")
 if not DB_PATH:
     DB_PATH = Path(__file__).parent.parent.parent / 'universe.db'
 
-def get_connection():
-    return sqlite3.connect(DB_PATH)
+# Storage profile (override via environment for constrained devices)
+DB_SYNCHRONOUS = os.environ.get("CHRONICLE_DB_SYNCHRONOUS", "NORMAL")
+DB_MMAP_SIZE = int(os.environ.get("CHRONICLE_DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+DB_CACHE_SIZE_KB = int(os.environ.get("CHRONICLE_DB_CACHE_SIZE_KB", "16384"))
+DB_STATEMENT_CACHE = int(os.environ.get("CHRONICLE_DB_STATEMENT_CACHE", "256"))
+DB_BUSY_TIMEOUT_MS = int(os.environ.get("CHRONICLE_DB_BUSY_TIMEOUT_MS", "5000"))
+
+logger = logging.getLogger(__name__)
+
+
+class PooledConnection:
+    """Thin proxy around a pooled `sqlite3.Connection`.
+
+    Everything is delegated to the underlying connection except `close()`,
+    which hands the connection back to its pool. A proxy dropped without
+    `close()` is released when it is garbage collected, as an unreferenced
+    `sqlite3.Connection` would be closed. That only happens on the thread
+    that acquired it. A collection on any other thread gives up the hold
+    without touching the connection, because the owner may be mid-transaction.
+    """
+
+    __slots__ = ('_conn', '_pool', '_row_factory', '_released', '_owner')
+
+    def __init__(self, conn: sqlite3.Connection, pool: "ConnectionPool"):
+        object.__setattr__(self, '_conn', conn)
+        object.__setattr__(self, '_pool', pool)
+        # restored on release, so a nested caller's tweak does not leak outward
+        object.__setattr__(self, '_row_factory', conn.row_factory)
+        object.__setattr__(self, '_released', False)
+        object.__setattr__(self, '_owner', threading.get_ident())
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._conn.__exit__(exc_type, exc, tb)
+
+    @property
+    def raw(self) -> sqlite3.Connection:
+        return self._conn
+
+    def close(self):
+        if self._released:
+            return
+        object.__setattr__(self, '_released', True)
+        self._pool.release(self._conn, self._row_factory)
+
+    def __del__(self):
+        try:
+            if self._released:
+                return
+            if threading.get_ident() == self._owner:
+                self.close()
+                return
+            object.__setattr__(self, '_released', True)
+            self._pool.forget(self._conn)
+            logger.debug("Pooled connection dropped unclosed and collected off its owning thread")
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """Per-thread reusable SQLite connections for a single database file."""
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        self._dedicated: List[sqlite3.Connection] = []
+        # pooled connection -> number of unreleased proxies handed out for it
+        self._holders: Dict[sqlite3.Connection, int] = {}
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=DB_BUSY_TIMEOUT_MS / 1000.0,
+            cached_statements=DB_STATEMENT_CACHE,
+            # each connection is only used by its owning thread; this just lets
+            # close_all() shut them down from whichever thread calls it
+            check_same_thread=False,
+        )
+        configure_connection(conn)
+        return conn
+
+    def acquire(self) -> PooledConnection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+            with self._lock:
+                self._connections[threading.get_ident()] = conn
+        with self._lock:
+            self._holders[conn] = self._holders.get(conn, 0) + 1
+        return PooledConnection(conn, self)
+
+    def open_dedicated(self) -> sqlite3.Connection:
+        """Open a long-lived connection outside the per-thread map.
+
+        The caller owns it and must serialize access across threads; it is
+        still closed by `close_all()`.
+        """
+        conn = self._open()
+        with self._lock:
+            self._dedicated.append(conn)
+        return conn
+
+    def _drop_hold(self, conn: sqlite3.Connection) -> int:
+        with self._lock:
+            held = self._holders.get(conn, 0) - 1
+            if held > 0:
+                self._holders[conn] = held
+            else:
+                self._holders.pop(conn, None)
+        return held
+
+    def forget(self, conn: sqlite3.Connection):
+        """Give up one hold without touching the connection (safe from any thread)."""
+        self._drop_hold(conn)
+
+    def release(self, conn: sqlite3.Connection, row_factory=None):
+        held = self._drop_hold(conn)
+        if held > 0:
+            # An outer caller on this thread still holds the connection: leave
+            # its transaction alone and undo only this caller's row factory.
+            conn.row_factory = row_factory
+            return
+        # Outermost release mirrors closing a fresh connection: uncommitted
+        # work is discarded and per-caller tweaks do not leak to the next user.
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.ProgrammingError:
+            return
+        conn.row_factory = None
+
+    def close_all(self):
+        with self._lock:
+            conns = list(self._connections.values()) + self._dedicated
+            self._connections.clear()
+            self._dedicated = []
+            self._holders.clear()
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        # Connections owned by other threads are now closed; drop our own handle
+        # so the next acquire on this thread reopens.
+        self._local = threading.local()
+
+
+def configure_connection(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """Apply the WAL journal and storage profile to an open connection."""
+    c = conn.cursor()
+    try:
+        c.execute("PRAGMA journal_mode=WAL")
+    except sqlite3.OperationalError:
+        # In-memory and read-only databases cannot switch journal mode
+        pass
+    c.execute(f"PRAGMA synchronous={DB_SYNCHRONOUS}")
+    c.execute(f"PRAGMA busy_timeout={int(DB_BUSY_TIMEOUT_MS)}")
+    c.execute(f"PRAGMA cache_size=-{int(DB_CACHE_SIZE_KB)}")
+    c.execute(f"PRAGMA mmap_size={int(DB_MMAP_SIZE)}")
+    c.execute("PRAGMA temp_store=MEMORY")
+    c.close()
+    return conn
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path=None) -> ConnectionPool:
+    path = str(db_path or DB_PATH)
+    with _pools_lock:
+        pool = _pools.get(path)
+        if pool is None:
+            pool = ConnectionPool(path)
+            _pools[path] = pool
+        return pool
+
+
+def get_connection(db_path=None) -> PooledConnection:
+    return get_pool(db_path).acquire()
+
+
+def close_all_connections(db_path: Optional[str] = None):
+    """Close pooled connections (all pools, or only the one for `db_path`)."""
+    with _pools_lock:
+        if db_path is not None:
+            pools = [_pools.pop(str(db_path), None)]
+        else:
+            pools = list(_pools.values())
+            _pools.clear()
+    for pool in pools:
+        if pool is not None:
+            pool.close_all()
@@ -2,11 +2,17 @@
 import sqlite3
 from pathlib import Path
 
+from src.db.database import configure_connection
+from src.db.migrations import apply_migrations
+
 DB_PATH = Path(__file__).parent.parent.parent / 'universe.db'
 SCHEMA_PATH = Path(__file__).parent / 'schema.sql'
 
 def init_db():
     conn = sqlite3.connect(DB_PATH)
+    # must precede the first table; lets tick retention hand pages back to the SD card
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    configure_connection(conn)
     with open(SCHEMA_PATH, 'r') as f:
         conn.executescript(f.read())
     # Ensure character_state, system_state and events tables exist for automation
@@ -30,6 +36,7 @@ def init_db():
         metadata TEXT
     )''')
     conn.commit()
+    apply_migrations(conn)
     conn.close()
 
 if __name__ == "__main__":
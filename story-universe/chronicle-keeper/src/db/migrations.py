@@ -0,0 +1,250 @@
+"""Idempotent schema migrations for Chronicle Keeper.
+
+`apply_migrations(conn)` is safe to run on every startup: each step checks
+`sqlite_master` (or `PRAGMA table_info`) first and skips tables that do not
+exist yet (test DBs only create a subset of the schema).
+
+Migrations never delete data. A unique index whose table already holds
+duplicate keys is not built; the duplicates are logged and collapsed only
+by an explicit `python scripts/dedupe_unique_keys.py --commit`.
+"""
+import logging
+import sqlite3
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (table name, table it depends on, DDL). Created only once the parent exists.
+TABLES: List[Tuple[str, str, str]] = [
+    # One row per (entity, event); `timestamp` is denormalized from `events`
+    # so per-entity history is an ordered index range scan.
+    ('event_participants', 'events', """
+        CREATE TABLE IF NOT EXISTS event_participants (
+            event_id INTEGER NOT NULL,
+            entity_type TEXT NOT NULL, -- 'character', 'location' or 'faction'
+            entity_id TEXT NOT NULL,
+            role TEXT NOT NULL DEFAULT 'involved', -- actor, target, location, involved
+            timestamp INTEGER,
+            PRIMARY KEY (entity_type, entity_id, event_id),
+            FOREIGN KEY(event_id) REFERENCES events(id)
+        ) WITHOUT ROWID
+    """),
+    # Compact copies of canonical state; replay resumes after `last_event_id`.
+    ('state_snapshots', 'events', """
+        CREATE TABLE IF NOT EXISTS state_snapshots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            last_event_id INTEGER NOT NULL, -- events.id of the last event reflected in `state`
+            world_time INTEGER,
+            created_at INTEGER NOT NULL,
+            state BLOB NOT NULL -- zlib-compressed JSON {table: {columns, rows}}
+        )
+    """),
+    # Clock ticks, kept out of `events`; `last_event_id` places each tick in the log.
+    ('world_ticks', 'events', """
+        CREATE TABLE IF NOT EXISTS world_ticks (
+            world_time INTEGER PRIMARY KEY,
+            timestamp INTEGER NOT NULL,
+            last_event_id INTEGER NOT NULL -- events.id of the last event logged before this tick
+        )
+    """),
+    # Single-row counter bumped by the state triggers below, so readers can
+    # tell a commit that changed world state from one that did not.
+    ('state_generation', 'system_state', """
+        CREATE TABLE IF NOT EXISTS state_generation (
+            id INTEGER PRIMARY KEY CHECK (id = 0),
+            generation INTEGER NOT NULL
+        )
+    """),
+    # One row per wall-clock hour of ticks older than the retention window.
+    ('tick_rollups', 'events', """
+        CREATE TABLE IF NOT EXISTS tick_rollups (
+            hour_start INTEGER PRIMARY KEY,
+            ticks INTEGER NOT NULL,
+            first_world_time INTEGER NOT NULL,
+            last_world_time INTEGER NOT NULL,
+            first_event_id INTEGER NOT NULL, -- last_event_id of the hour's first tick
+            last_event_id INTEGER NOT NULL
+        )
+    """),
+]
+
+# `system_state` keys the world clock owns; it rewrites them on every flush,
+# so they do not count as world-state changes
+CLOCK_STATE_KEYS = ('time', 'time_lease')
+
+# Tables behind the versioned `/world/state` snapshot
+STATE_TABLES = ('characters', 'locations', 'factions', 'character_state', 'faction_metrics',
+                'faction_relationships', 'faction_cooldowns', 'system_state')
+
+
+def _state_triggers() -> List[Tuple[str, str, str]]:
+    clock_keys = ', '.join(f"'{k}'" for k in CLOCK_STATE_KEYS)
+    conditions = {'INSERT': f"NEW.key NOT IN ({clock_keys})",
+                  'UPDATE': f"NEW.key NOT IN ({clock_keys}) OR OLD.key NOT IN ({clock_keys})",
+                  'DELETE': f"OLD.key NOT IN ({clock_keys})"}
+    triggers = []
+    for table in STATE_TABLES:
+        for op in ('INSERT', 'UPDATE', 'DELETE'):
+            name = f'trg_{table}_{op.lower()}_generation'
+            when = f" WHEN {conditions[op]}" if table == 'system_state' else ''
+            triggers.append((name, table, f"""
+                CREATE TRIGGER IF NOT EXISTS {name} AFTER {op} ON {table}{when}
+                BEGIN UPDATE state_generation SET generation = generation + 1 WHERE id = 0; END
+            """))
+    return triggers
+
+
+# (trigger name, table, DDL). Created once both the table and `state_generation` exist.
+TRIGGERS: List[Tuple[str, str, str]] = _state_triggers()
+
+# (table, column, column definition). Added with ALTER TABLE when missing.
+COLUMNS: List[Tuple[str, str, str]] = [
+    # CanonicalEvent.id; `events.id` stays the integer rowid. Legacy rows keep NULL.
+    ('events', 'canonical_id', 'TEXT'),
+    # full event JSON and the time its consequences were applied, for replay
+    ('events', 'payload', 'TEXT'),
+    ('events', 'applied_at', 'INTEGER'),
+]
+
+# (index name, table, columns, unique)
+INDEXES: List[Tuple[str, str, str, bool]] = [
+    # /world/events/recent and the validator's recent-events window
+    ('idx_events_timestamp', 'events', 'timestamp', False),
+    ('idx_events_type_timestamp', 'events', 'type, timestamp', False),
+    # duplicate detection and causation lookups probe the canonical id
+    ('ux_events_canonical_id', 'events', 'canonical_id', True),
+    # ContinuityValidator relationship lookups; INSERT OR REPLACE upserts rely on uniqueness
+    ('ux_faction_relationships_pair', 'faction_relationships', 'source_faction_id, target_faction_id', True),
+    ('idx_faction_relationships_target', 'faction_relationships', 'target_faction_id', False),
+    # per-faction cooldown lookups and INSERT OR REPLACE upserts
+    ('ux_faction_cooldowns_key', 'faction_cooldowns', 'faction_id, cooldown_key', True),
+    # inventory listing and stack lookup in pickup_item
+    ('idx_inventory_owner_item', 'inventory', 'owner_type, owner_id, item_id', False),
+    ('idx_faction_members_faction', 'faction_members', 'faction_id', False),
+    ('idx_characters_location', 'characters', 'location_id', False),
+    # character/location filters on /world/events/recent
+    ('idx_event_participants_entity_ts', 'event_participants', 'entity_type, entity_id, timestamp', False),
+    ('idx_event_participants_event', 'event_participants', 'event_id', False),
+    ('idx_state_snapshots_last_event', 'state_snapshots', 'last_event_id', False),
+    # tick retention ages raw ticks out by wall-clock time
+    ('idx_world_ticks_timestamp', 'world_ticks', 'timestamp', False),
+]
+
+
+def _table_exists(cur, table: str) -> bool:
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,))
+    return cur.fetchone() is not None
+
+
+def _index_exists(cur, name: str) -> bool:
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type='index' AND name=?", (name,))
+    return cur.fetchone() is not None
+
+
+def _trigger_exists(cur, name: str) -> bool:
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type='trigger' AND name=?", (name,))
+    return cur.fetchone() is not None
+
+
+def _column_exists(cur, table: str, column: str) -> bool:
+    cur.execute(f"PRAGMA table_info({table})")
+    return any(r[1] == column for r in cur.fetchall())
+
+
+def _not_null(columns: str) -> str:
+    # rows with a NULL key column never conflict: a UNIQUE index admits any number
+    return ' AND '.join(f"{col.strip()} IS NOT NULL" for col in columns.split(','))
+
+
+def duplicate_keys(cur, table: str, columns: str) -> List[Tuple]:
+    """Keys (plus their row count) that occur more than once in `table`."""
+    cur.execute(
+        f"SELECT {columns}, COUNT(*) FROM {table} WHERE {_not_null(columns)} "
+        f"GROUP BY {columns} HAVING COUNT(*) > 1"
+    )
+    return cur.fetchall()
+
+
+def _dedupe(cur, table: str, columns: str) -> int:
+    """Keep the newest row (highest rowid) for each key so a unique index can be built."""
+    not_null = _not_null(columns)
+    cur.execute(
+        f"DELETE FROM {table} WHERE {not_null} AND rowid NOT IN "
+        f"(SELECT MAX(rowid) FROM {table} WHERE {not_null} GROUP BY {columns})"
+    )
+    return cur.rowcount or 0
+
+
+def dedupe_unique_keys(conn, commit: bool = True) -> Dict[str, int]:
+    """Collapse duplicate keys for every unique index not yet built.
+
+    Destructive: only the newest row per key survives. Returns the rows
+    removed (or, with `commit=False`, that would be removed) per index.
+    """
+    cur = conn.cursor()
+    removed = {}
+    for name, table, columns, unique in INDEXES:
+        if not unique or not _table_exists(cur, table) or _index_exists(cur, name):
+            continue
+        dups = duplicate_keys(cur, table, columns)
+        if not dups:
+            continue
+        if commit:
+            removed[name] = _dedupe(cur, table, columns)
+        else:
+            removed[name] = sum(row[-1] - 1 for row in dups)
+    if commit:
+        conn.commit()
+    return removed
+
+
+def apply_migrations(conn) -> List[str]:
+    """Create any missing tables, triggers, columns and secondary indexes. Returns the names created."""
+    cur = conn.cursor()
+    created = []
+    for name, parent, ddl in TABLES:
+        if _table_exists(cur, parent) and not _table_exists(cur, name):
+            cur.execute(ddl)
+            created.append(name)
+    if _table_exists(cur, 'state_generation'):
+        cur.execute("INSERT OR IGNORE INTO state_generation (id, generation) VALUES (0, 0)")
+        for name, table, ddl in TRIGGERS:
+            if _table_exists(cur, table) and not _trigger_exists(cur, name):
+                cur.execute(ddl)
+                created.append(name)
+    for table, column, definition in COLUMNS:
+        if _table_exists(cur, table) and not _column_exists(cur, table, column):
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            created.append(f"{table}.{column}")
+    for name, table, columns, unique in INDEXES:
+        if not _table_exists(cur, table) or _index_exists(cur, name):
+            continue
+        if unique:
+            dups = duplicate_keys(cur, table, columns)
+            if dups:
+                logger.error(
+                    "migration %s skipped: %d duplicate keys in %s (%s): %s; "
+                    "review them and run `python scripts/dedupe_unique_keys.py --commit` to keep the newest row per key",
+                    name, len(dups), table, columns, ", ".join(repr(row[:-1]) for row in dups[:20]),
+                )
+                continue
+        try:
+            cur.execute(
+                f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} ON {table} ({columns})"
+            )
+        except sqlite3.OperationalError as e:
+            # Older DBs may be missing a column; leave that index for a later migration
+            logger.warning("migration %s skipped: %s", name, e)
+            continue
+        created.append(name)
+    if created:
+        cur.execute('ANALYZE')
+    conn.commit()
+    return created
+
+
+if __name__ == "__main__":
+    from src.db.database import get_connection
+    conn = get_connection()
+    print(apply_migrations(conn))
+    conn.close()
@@ -1,4 +1,195 @@
 # Query helpers for Chronicle Keeper DB
+import ast
+import base64
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.models.canonical_event import event_bytes
+
+# Event fields that name a participant: (event key, entity_type, role, is_list).
+# Order matters: the first role recorded for an entity wins.
+PARTICIPANT_FIELDS = [
+    ('character_id', 'character', 'actor', False),
+    ('source_id', 'character', 'actor', False),
+    ('target_id', 'character', 'target', False),
+    ('involved_characters', 'character', 'involved', True),
+    ('location_id', 'location', 'location', False),
+    ('involved_locations', 'location', 'involved', True),
+    ('source_faction_id', 'faction', 'actor', False),
+    ('target_faction_id', 'faction', 'target', False),
+    ('involved_factions', 'faction', 'involved', True),
+]
+
+
+def _as_list(value) -> List[Any]:
+    if value is None or value == '':
+        return []
+    if isinstance(value, (list, tuple, set)):
+        return list(value)
+    if isinstance(value, str):
+        # rows written before event_participants existed store str(list) reprs
+        for parse in (json.loads, ast.literal_eval):
+            try:
+                parsed = parse(value)
+            except Exception:
+                continue
+            return list(parsed) if isinstance(parsed, (list, tuple, set)) else [parsed]
+    return [value]
+
+
+def extract_participants(event: Dict[str, Any]) -> List[Tuple[str, str, str]]:
+    """Return unique (entity_type, entity_id, role) tuples named by an event."""
+    data = event.get('data') if isinstance(event.get('data'), dict) else {}
+    seen = set()
+    out = []
+    for key, etype, role, is_list in PARTICIPANT_FIELDS:
+        value = event.get(key)
+        if value is None:
+            value = data.get(key)
+        values = _as_list(value) if is_list else ([] if value is None or value == '' else [value])
+        for v in values:
+            if v is None or isinstance(v, (dict, list)):
+                continue
+            ident = (etype, str(v))
+            if ident in seen:
+                continue
+            seen.add(ident)
+            out.append((etype, str(v), role))
+    return out
+
+
+def record_participants(cur, event_row_id: int, event: Dict[str, Any], timestamp: Optional[int] = None) -> int:
+    rows = [(event_row_id, etype, eid, role, timestamp) for etype, eid, role in extract_participants(event)]
+    if rows:
+        cur.executemany(
+            'INSERT OR IGNORE INTO event_participants (event_id, entity_type, entity_id, role, timestamp) VALUES (?, ?, ?, ?, ?)',
+            rows,
+        )
+    return len(rows)
+
+
+def insert_event(cur, event: Dict[str, Any], description: Optional[str] = None, applied_at: Optional[int] = None) -> int:
+    """Insert an accepted event plus its participant rows; returns the events rowid.
+
+    `payload` keeps the full event as canonical JSON (the `EventRecord`
+    buffer from ingest, not re-encoded) and `applied_at` the time its
+    consequences were applied, so the event can be replayed later.
+    """
+    cur.execute("""
+        INSERT INTO events (canonical_id, timestamp, type, description, involved_characters, involved_locations, metadata, payload, applied_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (
+        event.get("id"),
+        event.get("timestamp"),
+        event.get("type"),
+        description or event.get("description") or str(event.get("data", {})),
+        str(event.get("involved_characters", []) or []),
+        str(event.get("involved_locations", []) or []),
+        str(event.get("metadata", {})),
+        event_bytes(event).decode("utf-8"),
+        int(time.time()) if applied_at is None else int(applied_at),
+    ))
+    row_id = cur.lastrowid
+    record_participants(cur, row_id, event, event.get("timestamp"))
+    return row_id
+
+
+def event_exists(conn, canonical_id) -> bool:
+    """Single probe of the unique `canonical_id` index."""
+    cur = conn.cursor()
+    cur.execute('SELECT 1 FROM events WHERE canonical_id = ?', (str(canonical_id),))
+    return cur.fetchone() is not None
+
+
+def encode_cursor(timestamp, row_id) -> str:
+    """Opaque page cursor for the (timestamp, events.id) position of a row.
+
+    `since` tails read only the id part.
+    """
+    raw = f"{int(timestamp or 0)}:{int(row_id)}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int]:
+    """Inverse of `encode_cursor`; raises ValueError on malformed input."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii")
+        ts, row_id = raw.split(":")
+        return int(ts), int(row_id)
+    except Exception:
+        raise ValueError(f"invalid cursor: {cursor!r}")
+
+
+def query_recent_events(conn, limit: int = 50, offset: int = 0, event_type: Optional[str] = None,
+                        character_id=None, location_id=None, before: Optional[Tuple[int, int]] = None,
+                        after_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Newest-first events, optionally filtered by type and participant.
+
+    Participant filters drive the query from `event_participants` so they are
+    index range scans ordered by timestamp rather than LIKE scans over `events`.
+
+    Rows are ordered by (timestamp, events.id), which every index involved
+    covers (the rowid/event_id is the implicit trailing key). `before` is a
+    keyset position to continue the newest-first listing from.
+
+    `after_id` instead tails: rows committed after that `events.id`, in
+    commit order. The tail is keyed on the id alone because `timestamp` is
+    client-supplied: a backdated event (or one without a timestamp)
+    committed later would sort before a (timestamp, id) position and never
+    be delivered.
+    """
+    c = conn.cursor()
+    params: List[Any] = []
+    filters = []
+    if character_id is not None:
+        query = ("SELECT e.* FROM event_participants p JOIN events e ON e.id = p.event_id"
+                 " WHERE p.entity_type = 'character' AND p.entity_id = ?")
+        params.append(str(character_id))
+        key = ("p.timestamp", "p.event_id")
+        if location_id is not None:
+            filters.append("EXISTS (SELECT 1 FROM event_participants pl WHERE pl.entity_type = 'location'"
+                           " AND pl.entity_id = ? AND pl.event_id = e.id)")
+            params.append(str(location_id))
+    elif location_id is not None:
+        query = ("SELECT e.* FROM event_participants p JOIN events e ON e.id = p.event_id"
+                 " WHERE p.entity_type = 'location' AND p.entity_id = ?")
+        params.append(str(location_id))
+        key = ("p.timestamp", "p.event_id")
+    else:
+        query = "SELECT e.* FROM events e WHERE 1"
+        key = ("e.timestamp", "e.id")
+    if event_type:
+        # a tail only covers the few rows past `after_id`: walk that rowid range
+        # in order (unary + keeps the type index out of the plan) instead of
+        # collecting every row of the type and sorting
+        filters.append("+e.type = ?" if after_id is not None else "e.type = ?")
+        params.append(event_type)
+    if after_id is not None:
+        filters.append(f"{key[1]} > ?")
+        params.append(after_id)
+        order = f"{key[1]} ASC"
+    else:
+        if before is not None:
+            filters.append(f"({key[0]}, {key[1]}) < (?, ?)")
+            params.extend(before)
+        order = f"{key[0]} DESC, {key[1]} DESC"
+    for f in filters:
+        query += " AND " + f
+    query += f" ORDER BY {order} LIMIT ?"
+    params.append(limit)
+    if offset and before is None and after_id is None:
+        query += " OFFSET ?"
+        params.append(offset)
+    c.execute(query, params)
+    return [dict(zip([col[0] for col in c.description], row)) for row in c.fetchall()]
+
+
+def latest_event_id(conn) -> int:
+    """Highest `events.id` committed so far (0 for an empty log); the `since` tail position."""
+    row = conn.execute("SELECT MAX(id) FROM events").fetchone()
+    return row[0] or 0
+
 
 def get_latest_events(conn, limit=50):
     c = conn.cursor()
@@ -52,12 +243,52 @@ def get_world_state(conn):
     except sqlite3.OperationalError:
         state['character_state'] = {}
 
-    # System-level values (e.g., time)
+    # System-level values (e.g., time). `time_lease` is the clock's internal
+    # crash-recovery lease (src.services.clock), not world state.
     try:
-        c.execute("SELECT key, value FROM system_state")
+        c.execute("SELECT key, value FROM system_state WHERE key <> 'time_lease'")
         system = {r[0]: r[1] for r in c.fetchall()}
         state['system'] = system
     except sqlite3.OperationalError:
         state['system'] = {}
 
     return state
+
+
+def add_faction_runtime_state(conn, state):
+    """Attach faction metrics, outgoing relationships and cooldowns to `state['factions']`."""
+    import sqlite3
+    c = conn.cursor()
+    factions = state.setdefault('factions', {})
+    # faction metrics
+    try:
+        c.execute('SELECT faction_id, trust, power, resources, influence FROM faction_metrics')
+        for r in c.fetchall():
+            fid = str(r[0])
+            factions.setdefault(fid, {})
+            factions[fid]['metrics'] = {'trust': float(r[1]) if r[1] is not None else 0.5, 'power': int(r[2] or 0), 'resources': int(r[3] or 0), 'influence': int(r[4] or 0)}
+    except sqlite3.OperationalError:
+        pass
+    # outgoing relationships
+    try:
+        c.execute('SELECT source_faction_id, target_faction_id, relationship_type, strength, cooldown_until FROM faction_relationships')
+        for r in c.fetchall():
+            src = str(r[0])
+            tgt = str(r[1])
+            rel = {'relationship_type': r[2], 'strength': float(r[3] or 0.0), 'cooldown_until': int(r[4] or 0)}
+            factions.setdefault(src, {})
+            factions[src].setdefault('outgoing_relationships', {})
+            factions[src]['outgoing_relationships'][tgt] = rel
+    except sqlite3.OperationalError:
+        pass
+    # faction cooldowns
+    try:
+        c.execute('SELECT faction_id, cooldown_key, until_ts, metadata FROM faction_cooldowns')
+        for r in c.fetchall():
+            fid = str(r[0])
+            factions.setdefault(fid, {})
+            factions[fid].setdefault('cooldowns', {})
+            factions[fid]['cooldowns'][r[1]] = int(r[2])
+    except sqlite3.OperationalError:
+        pass
+    return state
@@ -32,5 +32,8 @@ def setup_test_db(db_path):
     conn.close()
 
 def teardown_test_db(db_path):
-    if os.path.exists(db_path):
-        os.remove(db_path)
+    from src.db.database import close_all_connections
+    close_all_connections(db_path)
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
@@ -1,23 +1,31 @@
 
 # FastAPI app entry for Chronicle Keeper (Raspberry Pi 5)
-from fastapi import FastAPI, Request, HTTPException, status, Depends, BackgroundTasks
-from typing import Optional
+from fastapi import FastAPI, Request, Response, HTTPException, status, Depends, BackgroundTasks, Body, WebSocket
+from typing import Any, List, Optional
 import os
 
 from src.services.continuity import ContinuityValidator
-from src.db.database import get_connection
-from src.db.queries import get_world_state as assemble_world_state
+from src.services.ingest_queue import IngestWriter, IngestQueueFull
+from src.services.world_state import ResyncRequired, WorldStateView
+from src.services.event_store import SnapshotScheduler
+from src.services.world_history import HistoryUnavailable, WorldHistory
+from src.services.tick_retention import TickRetention
+from src.db.database import get_connection, get_pool
+from src.db.queries import insert_event, query_recent_events, latest_event_id, encode_cursor, decode_cursor
 from src.services.inventory import list_inventory, pickup_item, use_inventory_item, equip_inventory_item
 from src.services.event_consumer import handle_event as handle_event_consumer
 from src.services import event_handlers
 import time
+import asyncio
 
 from src.messaging.publisher import TickPublisher
+from src.messaging.ws_gateway import EventGateway, SubscriptionFilter
 from src.config import ZMQ_PUB_CLIENT_ADDR
-from src.services.clock import start_world_clock
-from src.models.canonical_event import CanonicalEvent
+from src.services.clock import start_world_clock, stop_world_clock, get_clock_status, get_world_time, ack_tick
+from src.models.canonical_event import CanonicalEvent, encode_event, event_bytes
+from src.ids import new_id
 from pydantic import ValidationError
-import random
+from starlette.concurrency import run_in_threadpool
 
 # Simple API key auth and rate limiting (in-memory)
 API_KEY = os.environ.get("CHRONICLE_API_KEY")
@@ -65,9 +73,6 @@ def startup_tasks():
     # If running tests against a test DB, avoid starting the world clock thread to prevent file locks
     db_path = os.environ.get("CHRONICLE_KEEPER_DB_PATH", "")
     is_test_db = db_path.endswith("test_chronicle.db")
-    if not is_test_db and not os.environ.get("CHRONICLE_DISABLE_CLOCK"):
-        from src.services.clock import start_world_clock
-        start_world_clock()
 
     # Ensure test DB tables exist if running in test mode
     try:
@@ -77,14 +82,73 @@ def startup_tasks():
     except ImportError:
         pass
 
+    # Create any missing secondary indexes (idempotent)
+    try:
+        from src.db.migrations import apply_migrations
+        conn = get_connection()
+        try:
+            created = apply_migrations(conn)
+            if created:
+                print(f"[ChronicleKeeper] Created indexes: {', '.join(created)}")
+        finally:
+            conn.close()
+    except Exception:
+        import traceback
+        traceback.print_exc()
+
+    # the clock writes to `world_ticks`, so it starts once migrations have run
+    if not is_test_db and not os.environ.get("CHRONICLE_DISABLE_CLOCK"):
+        from src.services.clock import start_world_clock
+        start_world_clock()
+
+    if not is_test_db:
+        snapshot_scheduler.start()
+        tick_retention.start()
+
 # Fallback: If running as a script (not under Uvicorn), start the world clock directly
 if __name__ == "__main__":
     print("[ChronicleKeeper] __main__ entry: starting world clock thread...")
     from src.services.clock import start_world_clock
     start_world_clock()
 
-# Validator now reads canonical state from DB directly
+# Validator keeps a resident copy of canonical state loaded from the DB
 validator = ContinuityValidator(db_conn_getter=get_connection)
+# Single writer that validates and commits ingested events in micro-batches
+ingest_writer = IngestWriter(validator, get_connection)
+# Versioned /world/state snapshot; rebuilt only after a commit changes the world
+world_state = WorldStateView(lambda: get_pool().open_dedicated())
+# Periodic canonical-state snapshots for snapshot+replay recovery
+snapshot_scheduler = SnapshotScheduler(get_connection)
+# /world/state?as_of= materializes past states from snapshots (LRU cached)
+world_history = WorldHistory(get_connection)
+# Tick rollups, legacy tick cleanup and incremental vacuum, off the hot path
+tick_retention = TickRetention(get_connection)
+
+
+@app.on_event("shutdown")
+def shutdown_tasks():
+    # flush events that are already queued before the process exits
+    ingest_writer.stop()
+    # the clock persists world time behind publication; write the exact time on the way out
+    if get_clock_status().get('running'):
+        stop_world_clock()
+    snapshot_scheduler.stop()
+    tick_retention.stop()
+    world_state.close()
+    ws_gateway.detach()
+
+
+def refresh_world_cache(kind: str, entity_id, conn):
+    """Patch the validator's resident state after a committed CRUD write."""
+    # CRUD writes are not in the event log; the next snapshot has to capture them
+    snapshot_scheduler.note_out_of_band_write()
+    cache = validator.cache
+    if cache is None:
+        return
+    try:
+        getattr(cache, f'refresh_{kind}')(entity_id, conn=conn)
+    except Exception:
+        cache.invalidate()
 
 @app.get("/ping")
 def ping():
@@ -93,57 +157,78 @@ def ping():
 
 
 publisher = TickPublisher(address=ZMQ_PUB_CLIENT_ADDR, bind=False)  # Connect, do not bind (address from config)
+# WebSocket fan-out of everything the in-process publishers send
+ws_gateway = EventGateway()
 
-@app.post("/event")
-async def ingest_event(event: dict, background: BackgroundTasks, api_key: str = require_api_key()):
+
+@app.websocket("/ws/events")
+async def events_websocket(websocket: WebSocket):
+    """Live tick/event stream with server-side filters.
+
+    Query params: `event_type`, `character_id`, `location_id`, `correlation_id`
+    (comma-separated), `policy` (drop_oldest|drop_newest|coalesce), `buffer`.
+    """
+    params = websocket.query_params
+    if API_KEY:
+        key = websocket.headers.get("x-api-key") or params.get("api_key") or ""
+        if key not in (API_KEY, ADMIN_KEY):
+            await websocket.close(code=1008)
+            return
+    flt = SubscriptionFilter.from_params(params.get("event_type"), params.get("character_id"),
+                                         params.get("location_id"), params.get("correlation_id"))
+    try:
+        channel = ws_gateway.open(flt, params.get("policy"), int(params["buffer"]) if params.get("buffer") else None)
+    except ValueError:
+        await websocket.close(code=1003)
+        return
+    await websocket.accept()
+    await ws_gateway.serve(websocket, channel)
+
+def parse_event(event: dict):
+    """Coerce a raw event dict to the canonical model; returns (event, rejection).
+
+    The event comes back as an `EventRecord`, encoded once here; storage,
+    publishing and `/world/events/recent?view=events` reuse that buffer.
+    """
     # Accept raw dict for backward compatibility; ensure minimal fields and coerce to CanonicalEvent.
     # Auto-generate an `id` if missing to preserve previous behavior where clients didn't provide one.
+    if not isinstance(event, dict):
+        return None, {"status": "rejected", "reason": "schema validation failed: event must be an object"}
     if 'id' not in event or not event.get('id'):
-        event['id'] = f"evt_{int(time.time())}_{random.randint(0,9999)}"
+        event['id'] = new_id()
 
     try:
         parsed = CanonicalEvent.model_validate(event) if hasattr(CanonicalEvent, 'model_validate') else CanonicalEvent(**event)
-        evd = parsed.dict() if hasattr(parsed, 'dict') else parsed.model_dump()
+        return encode_event(parsed.dict() if hasattr(parsed, 'dict') else parsed.model_dump()), None
     except ValidationError as ve:
         # Return 200 with rejected payload to preserve legacy behavior
-        return {"status": "rejected", "reason": f"schema validation failed: {ve}"}
+        return None, {"status": "rejected", "reason": f"schema validation failed: {ve}"}
     except Exception:
         # Fallback: treat as rejected but include minimal reason
-        return {"status": "rejected", "reason": "schema validation failed"}
-    is_valid, reason = validator.validate_event(evd)
-    if not is_valid:
-        # Maintain backwards-compatible behavior for clients/tests: return 200 with rejected payload
-        return {"status": "rejected", "reason": reason}
+        return None, {"status": "rejected", "reason": "schema validation failed"}
 
-    # Store event in DB and apply consequences using the validator (commits handled inside)
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("""
-        INSERT INTO events (timestamp, type, description, involved_characters, involved_locations, metadata)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, (
-        evd.get("timestamp"),
-        evd.get("type"),
-        evd.get("description") or str(evd.get("data", {})),
-        str(evd.get("involved_characters", []) or []),
-        str(evd.get("involved_locations", []) or []),
-        str(evd.get("metadata", {}))
-    ))
-    # Let the validator apply any DB-side consequences using the same connection for consistency
-    try:
-        validator.apply_event_consequences(evd, db_conn=conn)
-    except Exception:
-        # Non-fatal: log and continue
-        import traceback
-        traceback.print_exc()
+
+# Ingest endpoints stay on the event loop but never block it: schema checks are
+# cheap, while validation, SQLite writes and commits happen on the ingest
+# writer thread and are awaited through a future. Publishing only enqueues.
+@app.post("/event")
+async def ingest_event(event: dict, background: BackgroundTasks, api_key: str = require_api_key()):
+    evd, rejection = parse_event(event)
+    if rejection:
+        return rejection
+    # Validation, storage and consequences run on the group-commit writer;
+    # the reply is sent once the batch holding this event has committed.
     try:
-        conn.commit()
-    except Exception:
-        pass
+        fut = ingest_writer.submit(evd)
+    except IngestQueueFull as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     try:
-        conn.close()
+        result = await asyncio.wrap_future(fut)
     except Exception:
-        pass
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="event could not be committed")
+    if result.get("status") != "accepted":
+        # Maintain backwards-compatible behavior for clients/tests: return 200 with rejected payload
+        return {"status": "rejected", "reason": result.get("reason")}
 
     # Broadcast event to other nodes using canonical model dict
     try:
@@ -160,6 +245,62 @@ async def ingest_event(event: dict, background: BackgroundTasks, api_key: str =
 
     return {"status": "accepted", "id": evd.get("id")}
 
+
+# Upper bound on events accepted by one /events/batch request
+MAX_EVENTS_PER_BATCH = int(os.environ.get("CHRONICLE_MAX_EVENTS_PER_BATCH", "500"))
+
+
+@app.post("/events/batch")
+async def ingest_events_batch(background: BackgroundTasks, events: List[Any] = Body(...), api_key: str = require_api_key()):
+    """Ingest an ordered array of events; returns one result per event, in order.
+
+    Events are validated in order, each against the state left by the accepted
+    events before it; all accepted events are written in one transaction and
+    published as a single batch.
+    """
+    if len(events) > MAX_EVENTS_PER_BATCH:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"at most {MAX_EVENTS_PER_BATCH} events per batch")
+    results = [None] * len(events)
+    parsed = []
+    # schema validation of a large batch is CPU work; keep it off the event loop
+    for i, (evd, rejection) in enumerate(await run_in_threadpool(lambda: [parse_event(e) for e in events])):
+        if rejection:
+            results[i] = rejection
+        else:
+            parsed.append((i, evd))
+
+    if parsed:
+        try:
+            fut = ingest_writer.submit_batch([evd for _, evd in parsed])
+        except IngestQueueFull as e:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+        try:
+            outcomes = await asyncio.wrap_future(fut)
+        except Exception:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="events could not be committed")
+        accepted = []
+        for (i, evd), outcome in zip(parsed, outcomes):
+            if outcome.get("status") == "accepted":
+                results[i] = {"status": "accepted", "id": evd.get("id")}
+                accepted.append(evd)
+            else:
+                results[i] = {"status": "rejected", "reason": outcome.get("reason")}
+
+        if accepted:
+            try:
+                publisher.publish_events(accepted)
+            except Exception:
+                print("[ChronicleKeeper] Warning: failed to publish event batch")
+            for evd in accepted:
+                try:
+                    background.add_task(event_handlers.dispatch_event, evd, get_connection)
+                except Exception:
+                    pass
+
+    n_accepted = sum(1 for r in results if r["status"] == "accepted")
+    return {"results": results, "accepted": n_accepted, "rejected": len(results) - n_accepted}
+
 # ------------------------
 # CRUD endpoints (characters, locations, factions)
 # ------------------------
@@ -178,6 +319,7 @@ def create_character(payload: dict, admin: bool = Depends(require_admin)):
     ))
     conn.commit()
     char_id = c.lastrowid
+    refresh_world_cache('character', char_id, conn)
     conn.close()
     return {'status': 'created', 'id': char_id}
 
@@ -190,6 +332,7 @@ def update_character(char_id: int, payload: dict, admin: bool = Depends(require_
         payload.get('name'), payload.get('age'), str(payload.get('traits', {})), payload.get('location_id'), payload.get('status'), char_id
     ))
     conn.commit()
+    refresh_world_cache('character', char_id, conn)
     conn.close()
     return {'status': 'updated', 'id': char_id}
 
@@ -200,6 +343,7 @@ def delete_character(char_id: int, admin: bool = Depends(require_admin)):
     c = conn.cursor()
     c.execute('DELETE FROM characters WHERE id=?', (char_id,))
     conn.commit()
+    refresh_world_cache('character', char_id, conn)
     conn.close()
     return {'status': 'deleted', 'id': char_id}
 
@@ -213,6 +357,7 @@ def create_location(payload: dict, admin: bool = Depends(require_admin)):
     ))
     conn.commit()
     loc_id = c.lastrowid
+    refresh_world_cache('location', loc_id, conn)
     conn.close()
     return {'status': 'created', 'id': loc_id}
 
@@ -225,6 +370,7 @@ def update_location(loc_id: int, payload: dict, admin: bool = Depends(require_ad
         payload.get('name'), payload.get('description'), payload.get('region'), int(payload.get('forbidden', 0)), int(payload.get('locked', 0)), payload.get('political_status'), str(payload.get('metadata', {})), loc_id
     ))
     conn.commit()
+    refresh_world_cache('location', loc_id, conn)
     conn.close()
     return {'status': 'updated', 'id': loc_id}
 
@@ -235,6 +381,7 @@ def delete_location(loc_id: int, admin: bool = Depends(require_admin)):
     c = conn.cursor()
     c.execute('DELETE FROM locations WHERE id=?', (loc_id,))
     conn.commit()
+    refresh_world_cache('location', loc_id, conn)
     conn.close()
     return {'status': 'deleted', 'id': loc_id}
 
@@ -248,6 +395,7 @@ def create_faction(payload: dict, admin: bool = Depends(require_admin)):
     ))
     conn.commit()
     fid = c.lastrowid
+    refresh_world_cache('faction', fid, conn)
     conn.close()
     return {'status': 'created', 'id': fid}
 
@@ -277,6 +425,10 @@ def import_factions(payload: dict, admin: bool = Depends(require_admin)):
         c.execute('INSERT INTO factions (name, ideology, relationships) VALUES (?, ?, ?)', (name, None, '{}'))
         inserted += 1
     conn.commit()
+    if inserted:
+        snapshot_scheduler.note_out_of_band_write()
+    if inserted and validator.cache is not None:
+        validator.cache.invalidate()
     conn.close()
     return {'status': 'imported', 'inserted': inserted}
 
@@ -289,6 +441,7 @@ def update_faction(fid: int, payload: dict, admin: bool = Depends(require_admin)
         payload.get('name'), payload.get('ideology'), str(payload.get('relationships', {})), fid
     ))
     conn.commit()
+    refresh_world_cache('faction', fid, conn)
     conn.close()
     return {'status': 'updated', 'id': fid}
 
@@ -299,6 +452,7 @@ def delete_faction(fid: int, admin: bool = Depends(require_admin)):
     c = conn.cursor()
     c.execute('DELETE FROM factions WHERE id=?', (fid,))
     conn.commit()
+    refresh_world_cache('faction', fid, conn)
     conn.close()
     return {'status': 'deleted', 'id': fid}
 
@@ -351,6 +505,7 @@ def update_faction_metrics(fid: int, payload: dict, admin: bool = Depends(requir
             params.append(fid)
             c.execute('UPDATE faction_metrics SET ' + ', '.join(updates) + ' WHERE faction_id = ?', params)
     conn.commit()
+    refresh_world_cache('faction', fid, conn)
     conn.close()
     return {'status': 'updated', 'id': fid}
 
@@ -399,6 +554,7 @@ def upsert_faction_relationship(fid: int, target_id: int, payload: dict, admin:
         params.append(rid)
         c.execute('UPDATE faction_relationships SET ' + ', '.join(updates) + ' WHERE id = ?', params)
     conn.commit()
+    refresh_world_cache('faction', fid, conn)
     conn.close()
     return {'status': 'ok', 'relationship_id': rid}
 
@@ -430,62 +586,92 @@ def set_faction_cooldown(fid: int, key: str, payload: dict, admin: bool = Depend
         cid = row[0]
         c.execute('UPDATE faction_cooldowns SET until_ts = ?, metadata = ? WHERE id = ?', (int(until_ts), metadata, cid))
     conn.commit()
+    refresh_world_cache('faction', fid, conn)
     conn.close()
     return {'status': 'ok', 'cooldown_id': cid}
 
 
-from src.db.database import get_connection
+@app.post('/world/cache/reload')
+def reload_world_cache(admin: bool = Depends(require_admin)):
+    """Force the validator's resident world state to be re-read from the DB
+    (e.g. after import scripts or manual SQL edits)."""
+    snapshot_scheduler.note_out_of_band_write()
+    validator.reload_state()
+    return {'status': 'reloaded', 'version': validator.cache.version if validator.cache else 0}
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag == etag or tag == "W/" + etag:
+            return True
+    return False
+
 
 @app.get("/world/state")
-def get_world_state():
-    conn = get_connection()
-    try:
-        state = assemble_world_state(conn)
-    finally:
-        conn.close()
-    # Augment state with faction_metrics and explicit relationships/cooldowns when available
-    try:
-        conn = get_connection()
-        c = conn.cursor()
-        # faction metrics
-        try:
-            c.execute('SELECT faction_id, trust, power, resources, influence FROM faction_metrics')
-            for r in c.fetchall():
-                fid = str(r[0])
-                if 'factions' not in state:
-                    state['factions'] = {}
-                state['factions'].setdefault(fid, {})
-                state['factions'][fid].setdefault('metrics', {})
-                state['factions'][fid]['metrics'] = {'trust': float(r[1]) if r[1] is not None else 0.5, 'power': int(r[2] or 0), 'resources': int(r[3] or 0), 'influence': int(r[4] or 0)}
-        except Exception:
-            pass
-        # outgoing relationships
-        try:
-            c.execute('SELECT source_faction_id, target_faction_id, relationship_type, strength, cooldown_until FROM faction_relationships')
-            for r in c.fetchall():
-                src = str(r[0])
-                tgt = str(r[1])
-                rel = {'relationship_type': r[2], 'strength': float(r[3] or 0.0), 'cooldown_until': int(r[4] or 0)}
-                state['factions'].setdefault(src, {})
-                state['factions'][src].setdefault('outgoing_relationships', {})
-                state['factions'][src]['outgoing_relationships'][tgt] = rel
-        except Exception:
-            pass
-        # faction cooldowns
+def get_world_state(request: Request, as_of: Optional[int] = None):
+    """Current world snapshot, served from a pre-serialized body per world version.
+
+    Send the last `ETag` back as `If-None-Match` to get a bodyless 304 while
+    nothing has changed. World time is not part of the versioned body (it
+    would change the version every tick); it comes in `X-World-Time`, on
+    304s too. `as_of=<world time>` returns the state at that world time
+    instead, rebuilt from the nearest snapshot plus replay.
+    """
+    if as_of is not None:
         try:
-            c.execute('SELECT faction_id, cooldown_key, until_ts, metadata FROM faction_cooldowns')
-            for r in c.fetchall():
-                fid = str(r[0])
-                state['factions'].setdefault(fid, {})
-                state['factions'][fid].setdefault('cooldowns', {})
-                state['factions'][fid]['cooldowns'][r[1]] = int(r[2])
-        except Exception:
-            pass
-        conn.close()
-    except Exception:
-        pass
+            past = world_history.state_as_of(as_of)
+        except HistoryUnavailable as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        if past is not None:
+            info, body = past
+            return Response(content=body, media_type="application/json", headers={
+                "X-World-Time": str(info["world_time"]),
+                "X-As-Of-Event-Id": str(info["event_id"]),
+                "X-Replayed-Events": str(info["replayed"]),
+            })
+    version, body = world_state.current()
+    headers = {"ETag": f'"{version}"', "X-World-Version": str(version), "Cache-Control": "no-cache"}
+    world_time = get_world_time()
+    if world_time is not None:
+        headers["X-World-Time"] = str(world_time)
+    if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@app.get("/world/clock")
+def world_clock_status():
+    """In-memory world time, persistence lag and tick jitter."""
+    return get_clock_status()
+
+
+@app.post("/world/clock/ack")
+def world_clock_ack(payload: dict, api_key: str = require_api_key()):
+    """Consumer watermark: `{"consumer": name, "world_time": last tick fully processed}`."""
+    consumer = str(payload.get("consumer") or "").strip()
+    try:
+        world_time = int(payload.get("world_time"))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="world_time must be an integer")
+    if not consumer:
+        raise HTTPException(status_code=400, detail="consumer is required")
+    return ack_tick(consumer, world_time)
+
 
-    return state
+@app.get("/world/state/changes")
+def get_world_state_changes(since: int):
+    """Entity-level deltas committed after world version `since`.
+
+    Returns 410 once `since` falls outside the retained history; the client
+    must then re-fetch `/world/state` and continue from its `X-World-Version`.
+    """
+    try:
+        version, changes = world_state.changes_since(since)
+    except ResyncRequired as e:
+        raise HTTPException(status_code=410, detail={"error": "resync required", "version": e.version})
+    return {"since": since, "version": version, "changes": changes}
 
 @app.get("/world/characters")
 def get_characters():
@@ -571,17 +757,7 @@ def api_use_inventory_decision(inventory_id: int, payload: dict = {}, api_key: s
     # Persist event to events table and publish
     conn = get_connection()
     c = conn.cursor()
-    c.execute("""
-        INSERT INTO events (timestamp, type, description, involved_characters, involved_locations, metadata)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, (
-        event.get('timestamp'),
-        event.get('type'),
-        f"character {character_id} used inventory {inventory_id}",
-        str([character_id]),
-        str([]),
-        str(event.get('metadata', {}))
-    ))
+    insert_event(c, dict(event, involved_characters=[character_id]), description=f"character {character_id} used inventory {inventory_id}")
     conn.commit()
     conn.close()
     try:
@@ -612,39 +788,69 @@ def api_equip_inventory(inventory_id: int, payload: dict = {}, api_key: str = re
 
 @app.get("/world/events/recent")
 def get_recent_events(
+    response: Response,
     limit: int = 50,
     offset: int = 0,
     event_type: str = None,
     character_id: int = None,
-    location_id: int = None
+    location_id: int = None,
+    cursor: str = None,
+    since: str = None,
+    view: str = "rows",
 ):
     """
     Get recent events with optional filtering and pagination.
     - limit: max number of events
-    - offset: skip this many events
+    - offset: skip this many events (legacy; ignored when a cursor is given)
     - event_type: filter by event type
     - character_id: filter by involved character
     - location_id: filter by involved location
+    - cursor: continue a newest-first listing from `X-Next-Cursor`
+    - since: return events committed after this cursor, in commit order (tailing)
+    - view: `rows` (default) returns `events` table rows; `events` returns the
+      canonical events themselves, served from their stored encoding as-is
+
+    The body stays a plain list. `X-Next-Cursor` is set when more older events
+    may exist; `X-Latest-Cursor` is the position to pass as `since` next time.
+    Tailing follows commit order (`events.id`), so backdated events and ones
+    without a timestamp are still delivered.
     """
+    if view not in ("rows", "events"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="view must be 'rows' or 'events'")
+    try:
+        before = decode_cursor(cursor) if cursor else None
+        after = decode_cursor(since) if since else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     conn = get_connection()
-    c = conn.cursor()
-    query = "SELECT * FROM events"
-    filters = []
-    params = []
-    if event_type:
-        filters.append("type = ?")
-        params.append(event_type)
-    if character_id is not None:
-        filters.append("involved_characters LIKE ?")
-        params.append(f'%{character_id}%')
-    if location_id is not None:
-        filters.append("involved_locations LIKE ?")
-        params.append(f'%{location_id}%')
-    if filters:
-        query += " WHERE " + " AND ".join(filters)
-    query += " ORDER BY timestamp DESC LIMIT ? OFFSET ?"
-    params.extend([limit, offset])
-    c.execute(query, params)
-    events = [dict(zip([col[0] for col in c.description], row)) for row in c.fetchall()]
-    conn.close()
+    try:
+        # read before the page: an event committed in between is tailed next
+        # time (and maybe listed now) rather than skipped
+        latest = latest_event_id(conn) if after is None and not before and not offset else None
+        events = query_recent_events(conn, limit=limit, offset=offset, event_type=event_type,
+                                     character_id=character_id, location_id=location_id,
+                                     before=before, after_id=after[1] if after else None)
+    finally:
+        conn.close()
+
+    if after is not None:
+        newest = events[-1] if events else None
+        response.headers['X-Latest-Cursor'] = encode_cursor(newest['timestamp'], newest['id']) if newest else since
+    else:
+        if latest:
+            response.headers['X-Latest-Cursor'] = encode_cursor(0, latest)
+        if len(events) >= limit > 0:
+            response.headers['X-Next-Cursor'] = encode_cursor(events[-1]['timestamp'], events[-1]['id'])
+    if view == "events":
+        body = b"[" + b",".join(_stored_event_bytes(row) for row in events) + b"]"
+        cursors = {k: v for k, v in response.headers.items() if k.lower().startswith("x-")}
+        return Response(content=body, media_type="application/json", headers=cursors)
     return events
+
+
+def _stored_event_bytes(row: dict) -> bytes:
+    if row.get('payload'):
+        return row['payload'].encode("utf-8")
+    # rows written before payloads were stored
+    return event_bytes({'id': row.get('canonical_id'), 'type': row.get('type'),
+                        'timestamp': row.get('timestamp'), 'description': row.get('description')})
@@ -4,21 +4,54 @@ Provides a robust PUB socket wrapper for ticks and events with reconnection logi
 error handling, and metrics collection.
 """
 
-import json
+import os
 import time
 import logging
 import zmq
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, Optional, Any, Callable
+from typing import Dict, List, Optional, Any, Callable
 from datetime import datetime
-from threading import Lock
+from threading import Lock, RLock
 import threading
 import queue
-from src.config import ZMQ_PUB_CLIENT_ADDR, ZMQ_PUB_BIND_ADDR, TICK_PUBLISHER_RECONNECT_DELAY
+from collections import OrderedDict, deque
+from src.config import ZMQ_PUB_CLIENT_ADDR, ZMQ_PUB_BIND_ADDR, ZMQ_REPLAY_BIND_ADDR, TICK_PUBLISHER_RECONNECT_DELAY
+from src.ids import new_id
+from src.wire import JSON, Encoded, decode_body, encode_body, encode_frames, get_codec
 
 logger = logging.getLogger(__name__)
 
+# Payload codec for the stream ("json" or "msgpack"); every message carries
+# its content type, so subscribers decode either without configuration.
+WIRE_CODEC = os.environ.get("ZMQ_WIRE_CODEC", "json")
+# Messages kept per topic for gap recovery over the replay channel
+REPLAY_BUFFER = int(os.environ.get("ZMQ_REPLAY_BUFFER", "1000"))
+# Bound publishers skip queueing/encoding for topics nobody subscribes to
+SKIP_UNSUBSCRIBED = os.environ.get("ZMQ_SKIP_UNSUBSCRIBED", "1") == "1"
+# How often an idle sender thread reads subscription changes
+SUBSCRIPTION_POLL_S = 0.1
+# Sender micro-batching: flush up to SEND_BATCH messages per pass, waiting at
+# most SEND_LINGER_US after the first for more to arrive
+SEND_BATCH = int(os.environ.get("ZMQ_SEND_BATCH", "64"))
+SEND_LINGER_US = float(os.environ.get("ZMQ_SEND_LINGER_US", "0"))
+
+# Send lanes, highest priority first. Each lane has its own bound (entries)
+# and drop policy: `drop_newest` rejects new entries when full, `drop_oldest`
+# evicts the oldest, and `conflate` keeps only the newest entry per topic.
+LANE_ORDER = ("control", "event", "log")
+DROP_POLICIES = ("drop_newest", "drop_oldest", "conflate")
+LANE_SIZES = {
+    "control": int(os.environ.get("ZMQ_LANE_CONTROL_SIZE", "16")),
+    "event": int(os.environ.get("ZMQ_LANE_EVENT_SIZE", "1000")),
+    "log": int(os.environ.get("ZMQ_LANE_LOG_SIZE", "1000")),
+}
+LANE_POLICIES = {
+    "control": os.environ.get("ZMQ_LANE_CONTROL_POLICY", "conflate"),
+    "event": os.environ.get("ZMQ_LANE_EVENT_POLICY", "drop_newest"),
+    "log": os.environ.get("ZMQ_LANE_LOG_POLICY", "drop_oldest"),
+}
+
 
 class ConnectionState(Enum):
     DISCONNECTED = "disconnected"
@@ -31,16 +64,21 @@ class ConnectionState(Enum):
 class PublisherMetrics:
     """Metrics for message publishing."""
     messages_sent: int = 0
+    messages_skipped: int = 0
     message_errors: int = 0
     reconnects: int = 0
     last_error: Optional[str] = None
     last_error_time: Optional[float] = None
     last_success_time: Optional[float] = None
+    # messages dropped per send lane; for a conflating lane, stale entries replaced by newer ones
+    lane_drops: Dict[str, int] = field(default_factory=lambda: {lane: 0 for lane in LANE_ORDER})
     
     def to_dict(self) -> Dict[str, Any]:
         return {
             'messages_sent': self.messages_sent,
+            'messages_skipped': self.messages_skipped,
             'message_errors': self.message_errors,
+            'lane_drops': dict(self.lane_drops),
             'reconnects': self.reconnects,
             'last_error': self.last_error,
             'last_error_time': self.last_error_time,
@@ -49,6 +87,251 @@ class PublisherMetrics:
         }
 
 
+class _Batch(list):
+    """Send-queue entry holding payloads for one topic; `seq` is the first one's sequence number."""
+
+    def __init__(self, payloads, seq: Optional[int] = None):
+        super().__init__(payloads)
+        self.seq = seq
+
+
+class SendLanes:
+    """Priority send queue with one bounded lane per class of traffic.
+
+    `get` always serves the highest-priority non-empty lane, so a burst of
+    events never delays a tick and logs go out only when nothing else
+    waits. A conflating lane keeps one entry per topic: a new tick replaces
+    the one still queued, so subscribers only ever get the newest.
+    """
+
+    def __init__(self, sizes: Optional[Dict[str, int]] = None, policies: Optional[Dict[str, str]] = None):
+        self.sizes = {lane: max(1, int(n)) for lane, n in {**LANE_SIZES, **(sizes or {})}.items()}
+        self.policies = {**LANE_POLICIES, **(policies or {})}
+        for lane, policy in self.policies.items():
+            if policy not in DROP_POLICIES:
+                raise ValueError(f"unknown drop policy {policy!r} for lane {lane!r}")
+        self._cond = threading.Condition()
+        self._lanes = {lane: OrderedDict() if self.conflates(lane) else deque() for lane in LANE_ORDER}
+
+    def conflates(self, lane: str) -> bool:
+        return self.policies[lane] == "conflate"
+
+    def put(self, lane: str, topic: str, batch: "_Batch"):
+        """Queue `batch`; returns `(accepted, messages dropped)`."""
+        with self._cond:
+            q = self._lanes[lane]
+            dropped = 0
+            if self.conflates(lane):
+                stale = q.pop(topic, None)
+                if stale is not None:
+                    dropped = len(stale)
+                elif len(q) >= self.sizes[lane]:
+                    return False, len(batch)
+                q[topic] = batch
+            else:
+                if len(q) >= self.sizes[lane]:
+                    if self.policies[lane] == "drop_newest":
+                        return False, len(batch)
+                    _topic, oldest = q.popleft()
+                    dropped = len(oldest)
+                q.append((topic, batch))
+            self._cond.notify()
+            return True, dropped
+
+    def _pending(self) -> bool:
+        return any(self._lanes.values())
+
+    def get(self, timeout: Optional[float] = None):
+        """`(lane, topic, batch)` from the highest-priority non-empty lane; raises `queue.Empty`."""
+        with self._cond:
+            if not self._cond.wait_for(self._pending, timeout):
+                raise queue.Empty
+            return self._pop()
+
+    def get_nowait(self):
+        return self.get(timeout=0)
+
+    def _pop(self):
+        for lane in LANE_ORDER:
+            q = self._lanes[lane]
+            if q:
+                topic, batch = q.popitem(last=False) if self.conflates(lane) else q.popleft()
+                return lane, topic, batch
+
+    def get_batch(self, max_messages: int, linger_s: float = 0.0, timeout: Optional[float] = None):
+        """Up to `max_messages` messages' worth of `(lane, topic, batch)` entries, in priority order.
+
+        Blocks up to `timeout` for the first entry, then waits at most
+        `linger_s` after it for more. An entry is never split, so a large
+        batch entry can exceed `max_messages` on its own. Raises `queue.Empty`.
+        """
+        with self._cond:
+            if not self._cond.wait_for(self._pending, timeout):
+                raise queue.Empty
+            entries = []
+            count = 0
+            deadline = time.monotonic() + linger_s
+            while True:
+                while count < max_messages and self._pending():
+                    entry = self._pop()
+                    entries.append(entry)
+                    count += len(entry[2])
+                if count >= max_messages:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._cond.wait_for(self._pending, remaining):
+                    break
+            return entries
+
+    def qsize(self) -> int:
+        with self._cond:
+            return sum(len(q) for q in self._lanes.values())
+
+    def depths(self) -> Dict[str, int]:
+        with self._cond:
+            return {lane: len(q) for lane, q in self._lanes.items()}
+
+
+class ReplayLog:
+    """Per-topic sequence numbers plus the last `size` messages of each topic.
+
+    Numbers start at 1 per full topic and are assigned when a message is
+    accepted for publishing. A message later dropped from the send queue
+    therefore still shows up as a gap that subscribers can recover.
+    Conflating lanes are the exception: they are numbered when sent, so a
+    replaced stale tick leaves no gap and is never replayed. A tick skipped
+    because nobody subscribes is numbered when accepted, like any other.
+    """
+
+    def __init__(self, size: int = REPLAY_BUFFER):
+        self.size = max(1, int(size))
+        self._lock = Lock()
+        self._seq: Dict[str, int] = {}
+        self._ring: Dict[str, deque] = {}
+
+    def append(self, topic: str, payloads: List[dict]) -> int:
+        """Number and keep `payloads`; returns the first one's sequence number."""
+        with self._lock:
+            first = self._seq.get(topic, 0) + 1
+            ring = self._ring.get(topic)
+            if ring is None:
+                ring = self._ring[topic] = deque(maxlen=self.size)
+            for i, payload in enumerate(payloads):
+                ring.append((first + i, payload))
+            self._seq[topic] = first + len(payloads) - 1
+            return first
+
+    def replay(self, topic: str, first: int, last: int) -> Dict[str, Any]:
+        """Buffered messages `first..last` of `topic`, plus the buffered/assigned bounds."""
+        with self._lock:
+            ring = list(self._ring.get(topic, ()))
+            newest = self._seq.get(topic, 0)
+        oldest = ring[0][0] if ring else newest + 1
+        messages = [[seq, payload.value if isinstance(payload, Encoded) else payload]
+                    for seq, payload in ring if first <= seq <= last]
+        return {'topic': topic, 'first': oldest, 'last': newest, 'messages': messages}
+
+    def last_seqs(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._seq)
+
+
+# One sequence space per process, shared by every publisher in it (the
+# clock's tick publisher and the API's event publisher use different topics).
+_replay_log = ReplayLog()
+
+
+class ReplayServer:
+    """REP socket answering `src.wire.fetch_range` requests from a `ReplayLog`.
+
+    Runs on its own thread, which owns the socket.
+    """
+
+    def __init__(self, address: str, log: Optional[ReplayLog] = None, codec=None):
+        self.address = address
+        self.log = log or _replay_log
+        self.codec = codec or get_codec(WIRE_CODEC)
+        self.requests = 0
+        self.errors = 0
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, timeout: float = 2.0):
+        self._stop.clear()
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run, name="ReplayServer", daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout)
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        return self.log.replay(str(request['topic']), int(request['first']), int(request['last']))
+
+    def _run(self):
+        sock = zmq.Context.instance().socket(zmq.REP)
+        sock.setsockopt(zmq.LINGER, 0)
+        try:
+            sock.bind(self.address)
+        except zmq.ZMQError as e:
+            logger.error("Replay channel failed to bind %s: %s", self.address, e)
+            sock.close()
+            self._ready.set()
+            return
+        logger.info("Replay channel bound to %s", self.address)
+        self._ready.set()
+        try:
+            while not self._stop.is_set():
+                if not sock.poll(500):
+                    continue
+                frames = sock.recv_multipart()
+                try:
+                    reply = self.handle(decode_body(*frames))
+                    self.requests += 1
+                except Exception as e:
+                    self.errors += 1
+                    reply = {'error': str(e)}
+                sock.send_multipart(encode_body(reply, self.codec))
+        finally:
+            sock.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'address': self.address, 'requests': self.requests, 'errors': self.errors}
+
+
+# In-process taps on everything any publisher in this process publishes
+# (e.g. the WebSocket gateway), independent of the ZMQ send queue. Called as
+# fn(full_topic, payloads) on the producer's thread, so listeners must be
+# cheap and thread-safe.
+_local_listeners: List[Callable[[str, List[dict]], None]] = []
+
+
+def add_local_listener(fn: Callable[[str, List[dict]], None]):
+    if fn not in _local_listeners:
+        _local_listeners.append(fn)
+
+
+def remove_local_listener(fn: Callable[[str, List[dict]], None]):
+    try:
+        _local_listeners.remove(fn)
+    except ValueError:
+        pass
+
+
+def _notify_local(topic: str, payloads: List[Any]):
+    payloads = [p.value if isinstance(p, Encoded) else p for p in payloads]
+    for fn in list(_local_listeners):
+        try:
+            fn(topic, payloads)
+        except Exception:
+            logger.exception("Local publish listener failed")
+
+
 class ZmqPub:
     """Robust PUB socket wrapper with reconnection and metrics.
     
@@ -58,23 +341,53 @@ class ZmqPub:
     - Connection state tracking
     - Metrics collection
     - Graceful shutdown
+    - Priority send lanes (`SendLanes`): ticks (conflating), events and
+      logs are bounded and dropped independently
+    - Micro-batched sending: the sender thread flushes up to `send_batch`
+      queued messages per pass, waiting at most `send_linger_us` for a
+      batch to fill
+    - Subscription awareness: the socket is XPUB, so the publisher sees
+      which topic prefixes subscribers hold. With `skip_unsubscribed`
+      (default for bound publishers) a message on a topic nobody subscribes
+      to is still sequenced for replay, but is never queued or encoded.
     """
+
+    # send lane per topic; anything else goes to `default_lane`
+    topic_lanes: Dict[str, str] = {"tick": "control"}
+    default_lane = "event"
     
-    def __init__(self, address: Optional[str] = None, bind: bool = True, topic_prefix: str = ""):
+    def __init__(self, address: Optional[str] = None, bind: bool = True, topic_prefix: str = "",
+                 codec: Optional[str] = None, replay_addr: Optional[str] = None,
+                 skip_unsubscribed: Optional[bool] = None, send_batch: Optional[int] = None,
+                 send_linger_us: Optional[float] = None):
         self.address = address or (ZMQ_PUB_BIND_ADDR if bind else ZMQ_PUB_CLIENT_ADDR)
         self.bind = bind
         self.topic_prefix = topic_prefix
+        self.codec = get_codec(codec or WIRE_CODEC)
+        # a connecting publisher cannot tell whether its peer forwards subscriptions
+        self.skip_unsubscribed = (SKIP_UNSUBSCRIBED and bind) if skip_unsubscribed is None else skip_unsubscribed
+        # subscription prefix -> live subscriptions; replaced, never mutated, by the sender thread
+        self._subscriptions: Dict[str, int] = {}
+        # sequence numbers must follow queue order, so numbering and enqueueing share a lock
+        self._enqueue_lock = Lock()
+        self._replay_server: Optional[ReplayServer] = None
+        if replay_addr:
+            self._replay_server = ReplayServer(replay_addr, codec=self.codec)
+            self._replay_server.start()
         self._context: Optional[zmq.Context] = None
         self._socket: Optional[zmq.Socket] = None
         self._state = ConnectionState.DISCONNECTED
-        self._lock = Lock()
+        # re-entrant: the sender thread reconnects and reports errors while holding it
+        self._lock = RLock()
         self.metrics = PublisherMetrics()
         self._shutdown = False
         self._reconnect_delay = TICK_PUBLISHER_RECONNECT_DELAY
         self._last_reconnect_attempt = 0.0
         # queueing/backpressure
-        self._max_queue_size = 1000
-        self._send_queue: "queue.Queue" = queue.Queue(maxsize=self._max_queue_size)
+        self._lanes = SendLanes()
+        self.send_batch = max(1, int(SEND_BATCH if send_batch is None else send_batch))
+        self.send_linger_s = max(0.0, float(SEND_LINGER_US if send_linger_us is None else send_linger_us)) / 1e6
+        self._flushes = 0
         self._sender_thread: Optional[threading.Thread] = None
         self._sender_shutdown = threading.Event()
         self._start_sender()
@@ -100,8 +413,11 @@ class ZmqPub:
                 
                 # Create new socket
                 self._context = zmq.Context.instance()
-                self._socket = self._context.socket(zmq.PUB)
+                self._socket = self._context.socket(zmq.XPUB)
+                # report every (un)subscription, not just the first/last per prefix
+                self._socket.setsockopt(getattr(zmq, 'XPUB_VERBOSER', zmq.XPUB_VERBOSE), 1)
                 self._socket.setsockopt(zmq.SNDHWM, 1000)
+                self._subscriptions = {}
                 self._socket.setsockopt(zmq.LINGER, 1000)
                 
                 if self.bind:
@@ -126,7 +442,7 @@ class ZmqPub:
                 self.metrics.last_error_time = time.time()
                 return False
 
-    def _publish_impl(self, topic: str, payload: dict) -> bool:
+    def _publish_impl(self, topic: str, payload: dict, seq: Optional[int] = None) -> bool:
         """Internal publish implementation with error handling and reconnection."""
         if self._shutdown:
             logger.warning("Publisher is shutting down, message not sent")
@@ -139,9 +455,7 @@ class ZmqPub:
                 return False
         
         try:
-            topic_frame = (self.topic_prefix + topic).encode("utf-8")
-            json_frame = json.dumps(payload).encode("utf-8")
-            self._socket.send_multipart([topic_frame, json_frame])
+            self._socket.send_multipart(encode_frames(self.topic_prefix + topic, payload, self.codec, seq))
             
             # Update metrics on success
             self.metrics.messages_sent += 1
@@ -160,6 +474,45 @@ class ZmqPub:
             self._handle_publish_error(error_msg, e)
             return False
     
+    def _drain_subscriptions(self):
+        """Apply pending (un)subscription messages from the XPUB socket; call with `_lock` held."""
+        sock = self._socket
+        if sock is None or self._state != ConnectionState.CONNECTED:
+            return
+        subs = None
+        try:
+            # processes pending peer disconnects, which arrive as unsubscriptions
+            sock.getsockopt(zmq.EVENTS)
+            while True:
+                try:
+                    frame = sock.recv(zmq.NOBLOCK)
+                except zmq.Again:
+                    break
+                if not frame or frame[0] not in (0, 1):
+                    continue
+                if subs is None:
+                    subs = dict(self._subscriptions)
+                prefix = frame[1:].decode("utf-8", "replace")
+                count = subs.get(prefix, 0) + (1 if frame[0] == 1 else -1)
+                if count > 0:
+                    subs[prefix] = count
+                else:
+                    subs.pop(prefix, None)
+        except zmq.ZMQError as e:
+            logger.debug("Reading subscriptions failed: %s", e)
+        if subs is not None:
+            self._subscriptions = subs
+
+    def _subscriber_count(self, full_topic: str) -> int:
+        return sum(n for prefix, n in self._subscriptions.items() if full_topic.startswith(prefix))
+
+    def subscribers(self, topic: str) -> int:
+        """Live subscriptions matching `topic` (one per subscriber and matching prefix)."""
+        return self._subscriber_count(self.topic_prefix + topic)
+
+    def _wanted(self, topic: str) -> bool:
+        return not self.skip_unsubscribed or self.subscribers(topic) > 0
+
     def _should_reconnect(self) -> bool:
         """Determine if we should attempt to reconnect."""
         if self._shutdown:
@@ -188,11 +541,12 @@ class ZmqPub:
                 logger.warning("Error closing socket after error: %s", e)
     
     def publish(self, topic: str, payload: dict, max_retries: int = 2) -> bool:
-        """Publish a JSON payload under `topic` using a bounded send queue.
+        """Publish a payload under `topic` using a bounded send queue.
         
         Args:
             topic: The topic to publish to
-            payload: Dictionary payload to send (will be JSON-serialized)
+            payload: Dictionary payload to send (encoded with `self.codec`), or an
+                `Encoded` payload sent as-is
             max_retries: Maximum number of retry attempts
             
         Returns:
@@ -201,18 +555,58 @@ class ZmqPub:
         if self._shutdown:
             logger.warning("Publisher is shutting down, message not sent")
             return False
+        if _local_listeners:
+            _notify_local(self.topic_prefix + topic, [payload])
+        return self._enqueue(topic, [payload])
 
-        try:
-            # Non-blocking enqueue to avoid blocking producers under load.
-            self._send_queue.put_nowait((topic, payload))
+    def publish_many(self, topic: str, payloads: List[dict]) -> bool:
+        """Publish several payloads under `topic` as one send-queue entry.
+
+        The batch takes a single queue slot and is written to the socket in
+        order by the sender thread; it is accepted or dropped as a whole.
+        """
+        if self._shutdown:
+            logger.warning("Publisher is shutting down, message not sent")
+            return False
+        if not payloads:
             return True
-        except queue.Full:
-            # Queue full -> count as an error/drop. Caller can retry if desired.
-            self.metrics.message_errors += 1
-            self.metrics.last_error = "send_queue_full"
+        if _local_listeners:
+            _notify_local(self.topic_prefix + topic, list(payloads))
+        return self._enqueue(topic, list(payloads))
+
+    def lane_for(self, topic: str) -> str:
+        return self.topic_lanes.get(topic, self.default_lane)
+
+    def _enqueue(self, topic: str, payloads: List[Any]) -> bool:
+        """Non-blocking enqueue on the topic's lane, so producers never block under load."""
+        lane = self.lane_for(topic)
+        with self._enqueue_lock:
+            conflate = self._lanes.conflates(lane)
+            seq = None if conflate else _replay_log.append(self.topic_prefix + topic, payloads)
+            if not self._wanted(topic):
+                if conflate:
+                    # never sent, so never conflated: number and buffer it now so a
+                    # subscriber that was away sees the gap and can replay it
+                    _replay_log.append(self.topic_prefix + topic, payloads)
+                self.metrics.messages_skipped += len(payloads)
+                return True
+            accepted, dropped = self._lanes.put(lane, topic, _Batch(payloads, seq))
+        if dropped:
+            self.metrics.lane_drops[lane] += dropped
+        if dropped and not conflate:
+            # Lane full -> count as an error/drop. Caller can retry if desired.
+            self.metrics.message_errors += dropped
+            self.metrics.last_error = f"{lane}_lane_full"
             self.metrics.last_error_time = time.time()
-            logger.warning("Send queue full, dropping message for topic %s", topic)
-            return False
+            if accepted:
+                logger.warning("%s lane full, dropped %d oldest messages", lane, dropped)
+            else:
+                logger.warning("%s lane full, dropping %d messages for topic %s", lane, dropped, topic)
+        return accepted
+
+    def backlog(self) -> int:
+        """Send-queue entries not yet written to the socket, across all lanes."""
+        return self._lanes.qsize()
 
     def close(self):
         """Gracefully shut down the publisher."""
@@ -220,15 +614,18 @@ class ZmqPub:
         self._sender_shutdown.set()
         if self._sender_thread and self._sender_thread.is_alive():
             self._sender_thread.join(timeout=2.0)
+        if self._replay_server is not None:
+            self._replay_server.stop()
 
         with self._lock:
             self._shutdown = True
             try:
+                # close only our own sockets; the context is the process-wide
+                # instance other publishers and subscribers still use, and
+                # term() would block until every one of them is closed
                 if self._socket:
                     self._socket.setsockopt(zmq.LINGER, 100)
                     self._socket.close()
-                if self._context and not self._context.closed:
-                    self._context.term()
                 self._state = ConnectionState.DISCONNECTED
                 logger.info("Publisher closed successfully")
             except Exception as e:
@@ -237,57 +634,82 @@ class ZmqPub:
                 self._socket = None
                 self._context = None
 
+    def _flush(self, entries):
+        """Encode and send a micro-batch of lane entries under one lock hold."""
+        messages = []
+        for lane, topic, batch in entries:
+            if batch.seq is None and self._lanes.conflates(lane):
+                batch.seq = _replay_log.append(self.topic_prefix + topic, batch)
+            full_topic = self.topic_prefix + topic
+            for i, item in enumerate(batch):
+                seq = None if batch.seq is None else batch.seq + i
+                try:
+                    frames = encode_frames(full_topic, item, self.codec, seq)
+                except Exception as e:
+                    logger.error("Could not encode message for %s: %s", full_topic, e)
+                    frames = None
+                messages.append((topic, item, seq, frames))
+
+        sent = failed = 0
+        # attempt a best-effort send using existing impl
+        # if socket not connected, _publish_impl will attempt reconnect
+        # but protect with lock to avoid races.
+        with self._lock:
+            if self._state != ConnectionState.CONNECTED:
+                # attempt reconnect if allowed
+                if self._should_reconnect():
+                    self._connect()
+            for topic, item, seq, frames in messages:
+                if frames is None:
+                    failed += 1
+                    continue
+                try:
+                    # directly send via socket to minimize overhead
+                    if self._socket and self._state == ConnectionState.CONNECTED:
+                        self._socket.send_multipart(frames)
+                        sent += 1
+                        continue
+                except Exception:
+                    pass
+                # fallback to _publish_impl to trigger reconnection handling
+                try:
+                    ok = self._publish_impl(topic, item, seq)
+                except Exception:
+                    ok = False
+                if not ok:
+                    failed += 1
+        self._flushes += 1
+        if sent:
+            self.metrics.messages_sent += sent
+            self.metrics.last_success_time = time.time()
+        if failed:
+            # if we couldn't send, increment error and drop
+            self.metrics.message_errors += failed
+            self.metrics.last_error = "send_failed"
+            self.metrics.last_error_time = time.time()
+
     def _start_sender(self):
-        """Start background sender thread which drains the send queue."""
+        """Start background sender thread which drains the send lanes in micro-batches."""
         def loop():
             while not self._sender_shutdown.is_set():
+                with self._lock:
+                    self._drain_subscriptions()
                 try:
-                    topic, payload = self._send_queue.get(timeout=0.5)
+                    entries = self._lanes.get_batch(self.send_batch, self.send_linger_s, SUBSCRIPTION_POLL_S)
                 except queue.Empty:
                     continue
                 try:
-                    # attempt a best-effort send using existing impl
-                    # if socket not connected, _publish_impl will attempt reconnect
-                    # but protect with lock to avoid races.
-                    with self._lock:
-                        if self._state != ConnectionState.CONNECTED:
-                            # attempt reconnect if allowed
-                            if self._should_reconnect():
-                                self._connect()
-                        # if still not connected, re-enqueue or drop based on queue size
-                        sent = False
-                        try:
-                            # directly send via socket to minimize overhead
-                            if self._socket and self._state == ConnectionState.CONNECTED:
-                                topic_frame = (self.topic_prefix + topic).encode("utf-8")
-                                json_frame = json.dumps(payload).encode("utf-8")
-                                self._socket.send_multipart([topic_frame, json_frame])
-                                self.metrics.messages_sent += 1
-                                self.metrics.last_success_time = time.time()
-                                sent = True
-                        except Exception as e:
-                            # fallback to _publish_impl to trigger reconnection handling
-                            try:
-                                sent = self._publish_impl(topic, payload)
-                            except Exception:
-                                sent = False
-
-                        if not sent:
-                            # if we couldn't send, increment error and drop
-                            self.metrics.message_errors += 1
-                            self.metrics.last_error = "send_failed"
-                            self.metrics.last_error_time = time.time()
-                finally:
-                    try:
-                        self._send_queue.task_done()
-                    except Exception:
-                        pass
+                    self._flush(entries)
+                except Exception:
+                    logger.exception("Sender failed to flush %d entries", len(entries))
 
         self._sender_thread = threading.Thread(target=loop, daemon=True)
         self._sender_thread.start()
 
 
 class LogPublisher(ZmqPub):
+	default_lane = "log"
+
 	def __init__(self, address=None, bind=False):
 		super().__init__(address=address, bind=bind, topic_prefix="log:")
 
@@ -296,10 +718,16 @@ class LogPublisher(ZmqPub):
 
 
 class TickPublisher(ZmqPub):
-    """Publisher for system ticks and events with additional metrics."""
+    """Publisher for system ticks and events with additional metrics.
+
+    A bound publisher also serves the replay channel on `ZMQ_REPLAY_BIND_ADDR`
+    (set it empty to disable).
+    """
     
-    def __init__(self, address: Optional[str] = None, bind: bool = True):
-        super().__init__(address=address, bind=bind, topic_prefix="system:")
+    def __init__(self, address: Optional[str] = None, bind: bool = True, replay_addr: Optional[str] = None):
+        if replay_addr is None and bind:
+            replay_addr = ZMQ_REPLAY_BIND_ADDR
+        super().__init__(address=address, bind=bind, topic_prefix="system:", replay_addr=replay_addr)
         self._tick_count = 0
         self._start_time = time.time()
     
@@ -312,7 +740,16 @@ class TickPublisher(ZmqPub):
             'metrics': self.metrics.to_dict(),
             'address': self.address,
             'bind_mode': self.bind,
-            'topic_prefix': self.topic_prefix
+            'topic_prefix': self.topic_prefix,
+            'codec': self.codec.content_type,
+            'sequences': _replay_log.last_seqs(),
+            'lanes': self._lanes.depths(),
+            'send_batch': self.send_batch,
+            'flushes': self._flushes,
+            'subscriptions': dict(self._subscriptions),
+            'subscribers': {self.topic_prefix + t: self.subscribers(t) for t in ('tick', 'event')},
+            'skip_unsubscribed': self.skip_unsubscribed,
+            'replay': self._replay_server.get_stats() if self._replay_server else None
         }
         return stats
     
@@ -349,12 +786,39 @@ class TickPublisher(ZmqPub):
             logger.error("Event data must be a dictionary")
             return False
             
+        return self.publish("event", self._event_message(event_data), max_retries)
+
+    def publish_events(self, events: List[dict]) -> bool:
+        """Publish a batch of events, in order, as one send-queue entry.
+
+        Each event still goes out as its own `event` message, so subscribers
+        see exactly what `publish_event` would have produced.
+        """
+        messages = []
+        for event_data in events:
+            if not isinstance(event_data, dict):
+                logger.error("Event data must be a dictionary")
+                continue
+            messages.append(self._event_message(event_data))
+        return self.publish_many("event", messages)
+
+    def _event_message(self, event_data: dict):
         message = {
-            'event_id': f"evt_{int(time.time() * 1000)}_{hash(frozenset(event_data.items()))}",
+            'event_id': new_id(),
             'timestamp': time.time(),
             **event_data
         }
-        return self.publish("event", message, max_retries)
+        encoded = getattr(event_data, 'encoded', None)
+        if encoded is None or self.codec.content_type != JSON or not event_data or 'event_id' in event_data \
+                or not self._wanted('event'):
+            return message
+        # Splice the envelope onto the event's canonical JSON instead of
+        # re-encoding the whole event; subscribers decode the same object.
+        # (`new_id` output is [a-z0-9_], so it needs no escaping)
+        head = '{"event_id":"%s",' % message['event_id']
+        if 'timestamp' not in event_data:
+            head += '"timestamp":%r,' % message['timestamp']
+        return Encoded(message, head.encode('ascii') + encoded[1:])
 
 
 if __name__ == "__main__":
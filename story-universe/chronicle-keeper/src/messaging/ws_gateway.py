@@ -0,0 +1,231 @@
+"""WebSocket fan-out of the tick/event stream with per-client filters.
+
+`EventGateway` taps every publisher in the process (see
+`publisher.add_local_listener`), so WebSocket clients see the same `tick`
+and `event` messages as ZMQ subscribers. Each message is matched against
+each client's `SubscriptionFilter` on the event loop and serialized once.
+Matching clients get it in their own bounded `ClientChannel`.
+
+A slow client only ever fills its own buffer. When the buffer is full:
+
+- `drop_oldest` (default) discards the oldest pending message
+- `drop_newest` discards the incoming message
+- `coalesce` replaces a pending tick with the newer one, and otherwise
+  behaves like `drop_oldest`
+
+Wire format: one JSON text frame per message, `{"topic": ..., "data": ...}`.
+"""
+import asyncio
+import json
+import logging
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Union
+
+from src.db.queries import extract_participants
+from src.messaging.publisher import add_local_listener, remove_local_listener
+
+logger = logging.getLogger(__name__)
+
+WS_BUFFER_SIZE = int(os.environ.get("CHRONICLE_WS_BUFFER_SIZE", "256"))
+WS_BUFFER_POLICY = os.environ.get("CHRONICLE_WS_BUFFER_POLICY", "drop_oldest")
+WS_MAX_BUFFER_SIZE = 10000
+
+POLICIES = ("drop_oldest", "drop_newest", "coalesce")
+
+
+def _id_set(value: Union[None, str, Iterable[Any]]) -> FrozenSet[str]:
+    if value is None:
+        return frozenset()
+    if isinstance(value, str):
+        value = value.split(",")
+    return frozenset(str(v).strip() for v in value if str(v).strip())
+
+
+def _correlation_id(payload: Dict[str, Any]) -> Optional[str]:
+    # canonical events carry it in `metadata`; older producers put it at the top level
+    metadata = payload.get("metadata")
+    if isinstance(metadata, dict) and metadata.get("correlationId") is not None:
+        return metadata["correlationId"]
+    return payload.get("correlationId")
+
+
+@dataclass(frozen=True)
+class SubscriptionFilter:
+    """Server-side filter; empty fields match everything, set fields must all match."""
+    event_types: FrozenSet[str] = frozenset()
+    character_ids: FrozenSet[str] = frozenset()
+    location_ids: FrozenSet[str] = frozenset()
+    correlation_ids: FrozenSet[str] = frozenset()
+
+    @classmethod
+    def from_params(cls, event_type=None, character_id=None, location_id=None, correlation_id=None) -> "SubscriptionFilter":
+        """Build from comma-separated strings or lists (query params or a control message)."""
+        return cls(_id_set(event_type), _id_set(character_id), _id_set(location_id), _id_set(correlation_id))
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        return {
+            "event_type": sorted(self.event_types),
+            "character_id": sorted(self.character_ids),
+            "location_id": sorted(self.location_ids),
+            "correlation_id": sorted(self.correlation_ids),
+        }
+
+    def matches(self, payload: Dict[str, Any]) -> bool:
+        if self.event_types and str(payload.get("type")) not in self.event_types:
+            return False
+        if self.correlation_ids and str(_correlation_id(payload)) not in self.correlation_ids:
+            return False
+        if self.character_ids or self.location_ids:
+            named = extract_participants(payload)
+            if self.character_ids and not any(t == "character" and i in self.character_ids for t, i, _ in named):
+                return False
+            if self.location_ids and not any(t == "location" and i in self.location_ids for t, i, _ in named):
+                return False
+        return True
+
+
+class ClientChannel:
+    """Bounded per-connection outbox. Only touched from the event loop."""
+
+    def __init__(self, flt: SubscriptionFilter, policy: str = WS_BUFFER_POLICY, maxsize: int = WS_BUFFER_SIZE):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown buffer policy {policy!r}; expected one of {', '.join(POLICIES)}")
+        self.filter = flt
+        self.policy = policy
+        self.maxsize = max(1, min(int(maxsize), WS_MAX_BUFFER_SIZE))
+        self._buf: "OrderedDict[Any, str]" = OrderedDict()
+        self._seq = 0
+        self._ready = asyncio.Event()
+        self.stats = {"queued": 0, "sent": 0, "dropped": 0, "coalesced": 0}
+
+    def __len__(self):
+        return len(self._buf)
+
+    def offer(self, text: str, key: Optional[str] = None):
+        """Queue a serialized message; `key` marks messages that may coalesce."""
+        if self.policy == "coalesce" and key is not None and key in self._buf:
+            self._buf[key] = text
+            self._buf.move_to_end(key)
+            self.stats["coalesced"] += 1
+            return
+        if len(self._buf) >= self.maxsize:
+            self.stats["dropped"] += 1
+            if self.policy == "drop_newest":
+                return
+            self._buf.popitem(last=False)
+        if key is None or self.policy != "coalesce":
+            self._seq += 1
+            key = self._seq
+        self._buf[key] = text
+        self.stats["queued"] += 1
+        self._ready.set()
+
+    async def drain(self) -> List[str]:
+        """Wait for pending messages and take all of them, oldest first."""
+        await self._ready.wait()
+        self._ready.clear()
+        out = list(self._buf.values())
+        self._buf.clear()
+        return out
+
+
+class EventGateway:
+    def __init__(self, policy: str = WS_BUFFER_POLICY, maxsize: int = WS_BUFFER_SIZE):
+        self.policy = policy
+        self.maxsize = maxsize
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._channels: Set[ClientChannel] = set()
+        self.stats = {"received": 0, "delivered": 0, "connections": 0}
+
+    # ------------------------------------------------------------------
+    # Source side (any thread)
+    # ------------------------------------------------------------------
+    def attach(self, loop: asyncio.AbstractEventLoop):
+        """Start receiving published messages and dispatch them on `loop`."""
+        self._loop = loop
+        add_local_listener(self.on_publish)
+
+    def detach(self):
+        remove_local_listener(self.on_publish)
+        self._loop = None
+
+    def on_publish(self, topic: str, payloads: List[dict]):
+        loop = self._loop
+        if loop is None or not self._channels:
+            return
+        try:
+            loop.call_soon_threadsafe(self._dispatch, topic, payloads)
+        except RuntimeError:
+            # loop already closed (shutdown)
+            pass
+
+    # ------------------------------------------------------------------
+    # Event loop side
+    # ------------------------------------------------------------------
+    def _dispatch(self, topic: str, payloads: List[dict]):
+        key = "tick" if topic.endswith("tick") else None
+        for payload in payloads:
+            self.stats["received"] += 1
+            text = None
+            for channel in list(self._channels):
+                if not channel.filter.matches(payload):
+                    continue
+                if text is None:
+                    text = json.dumps({"topic": topic, "data": payload}, default=str)
+                channel.offer(text, key)
+                self.stats["delivered"] += 1
+
+    def open(self, flt: SubscriptionFilter, policy: Optional[str] = None, maxsize: Optional[int] = None) -> ClientChannel:
+        """Register a client; (re)attaches to the running loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self.attach(loop)
+        channel = ClientChannel(flt, policy or self.policy, maxsize or self.maxsize)
+        self._channels.add(channel)
+        self.stats["connections"] += 1
+        return channel
+
+    def close(self, channel: ClientChannel):
+        self._channels.discard(channel)
+
+    async def serve(self, websocket, channel: ClientChannel):
+        """Pump `channel` to an accepted websocket until it disconnects.
+
+        The first frame confirms the filter and buffer settings. Clients may send `{"subscribe": {event_type, character_id, location_id,
+        correlation_id}}` at any time to replace their filter.
+        """
+        async def pump():
+            while True:
+                for text in await channel.drain():
+                    await websocket.send_text(text)
+                    channel.stats["sent"] += 1
+
+        channel.offer(json.dumps({"topic": "control", "data": {
+            "subscribed": channel.filter.to_dict(), "policy": channel.policy, "buffer": channel.maxsize}}))
+        sender = asyncio.create_task(pump())
+        try:
+            while True:
+                raw = await websocket.receive_text()
+                try:
+                    spec = json.loads(raw).get("subscribe")
+                    channel.filter = SubscriptionFilter.from_params(**spec)
+                except Exception:
+                    channel.offer(json.dumps({"topic": "control", "data": {"error": "expected {\"subscribe\": {...}}"}}))
+                    continue
+                channel.offer(json.dumps({"topic": "control", "data": {"subscribed": channel.filter.to_dict()}}))
+        except Exception:
+            # WebSocketDisconnect or a transport error: either way this client is gone
+            pass
+        finally:
+            sender.cancel()
+            self.close(channel)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(
+            self.stats,
+            clients=len(self._channels),
+            dropped=sum(c.stats["dropped"] for c in self._channels),
+            coalesced=sum(c.stats["coalesced"] for c in self._channels),
+        )
@@ -1,5 +1,6 @@
 from typing import Optional, Dict, Any
 from pydantic import BaseModel, Field, validator
+import json
 import re
 
 
@@ -10,7 +11,7 @@ class EventMetadata(BaseModel):
 
 
 class CanonicalEvent(BaseModel):
-    id: str = Field(..., description="Event id, e.g. 'evt_<timestamp>_<random>'")
+    id: str = Field(..., description="Event id, e.g. 'evt_<unix ms>_<node><seq>' from src.ids.new_id")
     type: str = Field(..., description="Namespaced event type, e.g. 'character.move'")
     timestamp: int = Field(..., ge=0)
     source: Optional[str] = None
@@ -26,3 +27,27 @@ class CanonicalEvent(BaseModel):
 
     class Config:
         extra = 'allow'
+
+
+class EventRecord(dict):
+    """An accepted event dict carrying its canonical JSON encoding.
+
+    `encoded` is produced once at ingest and reused as-is for the `payload`
+    column, the ZMQ event message and `/world/events/recent?view=events`.
+    The dict must not be mutated after encoding.
+    """
+    __slots__ = ('encoded',)
+
+
+def encode_event(event: Dict[str, Any]) -> EventRecord:
+    record = EventRecord(event)
+    record.encoded = event_bytes(event)
+    return record
+
+
+def event_bytes(event: Dict[str, Any]) -> bytes:
+    """Canonical encoding of `event`: the cached buffer if it has one."""
+    encoded = getattr(event, 'encoded', None)
+    if encoded is not None:
+        return encoded
+    return json.dumps(event, separators=(',', ':'), default=str).encode('utf-8')
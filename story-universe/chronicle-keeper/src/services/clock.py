@@ -16,109 +16,404 @@ World Clock and Tick Broadcasting for Chronicle Keeper
 -----------------------------------------------------
 Maintains canonical world time, advances it on a schedule, logs ticks,
 and broadcasts to subscribers with enhanced reliability and metrics.
+
+World time is authoritative in memory. A tick is published first and
+persisted afterwards by a write-behind thread, which batches `world_ticks`
+rows and the `system_state` time into one commit every
+`CHRONICLE_CLOCK_FLUSH_INTERVAL_S`. Tick latency therefore no longer waits
+on an fsync.
+
+Crash safety comes from a lease. Every flush also stores `time_lease`, set
+`CHRONICLE_CLOCK_CHECKPOINT_TICKS` ticks ahead of the persisted time, and
+the clock never publishes past the stored lease without first flushing
+inline. On restart the clock resumes after the highest of `time`,
+`time_lease` and the tick log, so world time never repeats a published
+value. A crash skips at most one lease worth of ticks; a clean stop writes
+the exact time and skips none.
+
+Ticks are scheduled on a grid of `time.monotonic()` deadlines
+(`TickSchedule`), so sleep error and GC pauses never accumulate into drift.
+When the loop falls behind by whole intervals, `CHRONICLE_CLOCK_CATCH_UP`
+decides what happens:
+
+- `skip` (default): one tick now; missed deadlines are dropped
+- `burst`: every missed tick runs back to back, at most
+  `CHRONICLE_CLOCK_MAX_BURST` of them; any older ones are dropped
+- `coalesce`: a single tick advances world time by all missed ticks
+
+`run_accelerated(n)` advances n ticks as fast as downstream absorbs them,
+pausing while the publisher's send queue is backed up or consumers lag. It
+is used for soak tests, e.g. `CHRONICLE_CLOCK_ACCELERATE_TICKS` at startup,
+or `scripts/soak_clock.py`. Consumers ack at most every second or so, far
+slower than accelerated ticks, so this gate measures each consumer's lag
+as of its last ack (world time then minus its watermark), not against the
+current world time.
+
+Consumers report the last world time they finished processing
+(`POST /world/clock/ack`). `AdaptivePacer` turns these acks into a lag
+(world time minus the slowest live consumer's watermark). When the lag
+exceeds `CHRONICLE_CLOCK_LAG_TARGET_TICKS` it stretches the tick interval,
+up to `CHRONICLE_CLOCK_MAX_INTERVAL_S`. Once consumers catch up it relaxes
+the interval back down to `CHRONICLE_CLOCK_MIN_INTERVAL_S`. Without live
+consumers the nominal interval applies.
 """
 
+import os
 import threading
 import time
 import logging
+from collections import deque
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 from src.db.database import get_connection
 from src.messaging.publisher import TickPublisher, ConnectionState
+from src.services.tick_retention import record_tick, tick_time_at
 from src.config import TICK_PUBLISHER_RECONNECT_DELAY
 
 logger = logging.getLogger(__name__)
 
+CLOCK_CHECKPOINT_TICKS = int(os.environ.get("CHRONICLE_CLOCK_CHECKPOINT_TICKS", "12"))
+CLOCK_FLUSH_INTERVAL_S = float(os.environ.get("CHRONICLE_CLOCK_FLUSH_INTERVAL_S", "1.0"))
+
+CLOCK_CATCH_UP = os.environ.get("CHRONICLE_CLOCK_CATCH_UP", "skip")
+CLOCK_MAX_BURST = int(os.environ.get("CHRONICLE_CLOCK_MAX_BURST", "10"))
+CLOCK_ACCELERATE_TICKS = int(os.environ.get("CHRONICLE_CLOCK_ACCELERATE_TICKS", "0"))
+CLOCK_MAX_BACKLOG = int(os.environ.get("CHRONICLE_CLOCK_MAX_BACKLOG", "100"))
+
+# Empty bounds default to the nominal interval (min) and 4x it (max)
+CLOCK_MIN_INTERVAL_S = os.environ.get("CHRONICLE_CLOCK_MIN_INTERVAL_S", "")
+CLOCK_MAX_INTERVAL_S = os.environ.get("CHRONICLE_CLOCK_MAX_INTERVAL_S", "")
+CLOCK_LAG_TARGET_TICKS = int(os.environ.get("CHRONICLE_CLOCK_LAG_TARGET_TICKS", "2"))
+CLOCK_ACK_TTL_S = float(os.environ.get("CHRONICLE_CLOCK_ACK_TTL_S", "60"))
+
+CATCH_UP_POLICIES = ("skip", "burst", "coalesce")
+
+# Interval multipliers per adjustment: back off fast, recover gently
+PACER_SLOWDOWN = 1.5
+PACER_SPEEDUP = 0.9
+
+# Tick lateness samples (vs. the deadline) kept for the jitter stats in get_status()
+JITTER_WINDOW = 256
+
+
+class TickSchedule:
+    """Tick deadlines on a fixed `time.monotonic()` grid with a catch-up policy."""
+
+    def __init__(self, interval: float, policy: str = CLOCK_CATCH_UP, max_burst: int = CLOCK_MAX_BURST,
+                 start: Optional[float] = None):
+        if policy not in CATCH_UP_POLICIES:
+            raise ValueError(f"unknown catch-up policy {policy!r}; expected one of {', '.join(CATCH_UP_POLICIES)}")
+        self.interval = interval
+        self.policy = policy
+        self.max_burst = max(0, int(max_burst))
+        self.next_deadline = time.monotonic() if start is None else start
+        self.stats = {'late_ticks': 0, 'skipped': 0, 'coalesced': 0, 'burst': 0}
+
+    def reset(self, start: float):
+        self.next_deadline = start
+
+    def set_interval(self, interval: float):
+        """Change the spacing from the next deadline on."""
+        self.next_deadline += interval - self.interval
+        self.interval = interval
+
+    def wait_time(self, now: float) -> float:
+        return max(0.0, self.next_deadline - now)
+
+    def due(self, now: float) -> Tuple[int, float]:
+        """`(world ticks to advance now, lateness in seconds)`; no ticks before the deadline."""
+        if now < self.next_deadline:
+            return 0, 0.0
+        late = now - self.next_deadline
+        missed = int(late // self.interval) if self.interval > 0 else 0
+        steps = 1
+        if missed:
+            self.stats['late_ticks'] += 1
+            if self.policy == 'skip':
+                self.stats['skipped'] += missed
+            elif self.policy == 'coalesce':
+                self.stats['coalesced'] += missed
+                steps = missed + 1
+            else:
+                # burst: later calls find the next deadlines already due
+                dropped = max(0, missed - self.max_burst)
+                self.stats['skipped'] += dropped
+                self.stats['burst'] += 1
+                self.next_deadline += (dropped + 1) * self.interval
+                return steps, late
+        self.next_deadline += (missed + 1) * self.interval
+        return steps, late
+
+
+class AdaptivePacer:
+    """Tick interval driven by consumer lag, kept within `[min_interval, max_interval]`."""
+
+    def __init__(self, nominal: float, min_interval: Optional[float] = None, max_interval: Optional[float] = None,
+                 lag_target: int = CLOCK_LAG_TARGET_TICKS, ack_ttl: float = CLOCK_ACK_TTL_S):
+        self.nominal = nominal
+        self.min_interval = nominal if min_interval is None else min(float(min_interval), nominal)
+        self.max_interval = nominal * 4 if max_interval is None else max(float(max_interval), nominal)
+        self.lag_target = max(0, int(lag_target))
+        self.ack_ttl = ack_ttl
+        self.interval = nominal
+        self.last_lag: Optional[int] = None
+        self._acks: Dict[str, Tuple[int, float]] = {}  # consumer -> (world time, monotonic ack time)
+        self._ack_lags: Dict[str, int] = {}  # consumer -> lag when it last acked
+        self._lock = threading.Lock()
+        self.stats = {'acks': 0, 'slowdowns': 0, 'speedups': 0}
 
-import json
+    def ack(self, consumer: str, world_time: int, now: Optional[float] = None, clock_time: Optional[int] = None):
+        """Record `consumer`'s watermark; `clock_time` is the world time when the ack arrived."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            prev = self._acks.get(consumer)
+            # watermarks only move forward; a late duplicate still proves liveness
+            watermark = max(int(world_time), prev[0]) if prev else int(world_time)
+            self._acks[consumer] = (watermark, now)
+            if clock_time is not None:
+                self._ack_lags[consumer] = max(0, int(clock_time) - watermark)
+            self.stats['acks'] += 1
+
+    def _live(self, now: float) -> Dict[str, Tuple[int, float]]:
+        return {c: a for c, a in self._acks.items() if now - a[1] <= self.ack_ttl}
+
+    def lag(self, world_time: int, now: Optional[float] = None) -> Optional[int]:
+        """Ticks the slowest live consumer is behind; None without live consumers."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            live = self._live(now)
+        if not live:
+            return None
+        return max(0, int(world_time) - min(w for w, _ in live.values()))
+
+    def ack_lag(self, now: Optional[float] = None) -> Optional[int]:
+        """Largest lag any live consumer had when it last acked; None without one."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            lags = [self._ack_lags[c] for c in self._live(now) if c in self._ack_lags]
+        return max(lags) if lags else None
+
+    def update(self, world_time: int, now: Optional[float] = None) -> float:
+        """Adjust and return the interval for the next tick."""
+        lag = self.last_lag = self.lag(world_time, now)
+        if lag is None:
+            self.interval = self.nominal
+        elif lag > self.lag_target:
+            if self.interval < self.max_interval:
+                self.stats['slowdowns'] += 1
+            self.interval = min(self.max_interval, self.interval * PACER_SLOWDOWN)
+        else:
+            if self.interval > self.min_interval:
+                self.stats['speedups'] += 1
+            self.interval = max(self.min_interval, self.interval * PACER_SPEEDUP)
+        return self.interval
+
+    def consumers(self, world_time: Optional[int], now: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            acks = dict(self._acks)
+        return {
+            c: {'world_time': w, 'lag': None if world_time is None else max(0, world_time - w),
+                'age_s': round(now - t, 3), 'live': now - t <= self.ack_ttl}
+            for c, (w, t) in acks.items()
+        }
+
+
+def _interval_bound(value: str) -> Optional[float]:
+    return float(value) if value.strip() else None
 
 
 class WorldClock:
     """Manages the world clock and tick broadcasting."""
     
-    def __init__(self, tick_interval: float = 5.0):
+    def __init__(self, tick_interval: float = 5.0, checkpoint_ticks: int = CLOCK_CHECKPOINT_TICKS,
+                 flush_interval: float = CLOCK_FLUSH_INTERVAL_S, db_path: Optional[str] = None,
+                 publisher: Optional[TickPublisher] = None, catch_up: str = CLOCK_CATCH_UP,
+                 max_burst: int = CLOCK_MAX_BURST, accelerate_ticks: int = CLOCK_ACCELERATE_TICKS):
         """Initialize the world clock.
         
         Args:
             tick_interval: Time in seconds between ticks
+            checkpoint_ticks: How far ahead of the persisted time the clock may run
+            flush_interval: Seconds between write-behind flushes
+            db_path: Database file (defaults to the configured one)
+            publisher: Tick publisher (by default a bound `TickPublisher`, created on start)
+            catch_up: What to do with missed deadlines (`skip`, `burst` or `coalesce`)
+            max_burst: Most missed ticks replayed back to back under `burst`
+            accelerate_ticks: Ticks to fast-forward when the loop starts
         """
         self.tick_interval = tick_interval
-        self.publisher = TickPublisher()
+        self.checkpoint_ticks = max(1, int(checkpoint_ticks))
+        self.flush_interval = max(0.01, float(flush_interval))
+        self.db_path = db_path
+        self.publisher = publisher
+        self.schedule = TickSchedule(tick_interval, catch_up, max_burst)
+        self.pacer = AdaptivePacer(tick_interval, _interval_bound(CLOCK_MIN_INTERVAL_S), _interval_bound(CLOCK_MAX_INTERVAL_S))
+        self.accelerate_ticks = max(0, int(accelerate_ticks))
         self._shutdown = threading.Event()
         self._thread: Optional[threading.Thread] = None
+        self._writer: Optional[threading.Thread] = None
+        self._writer_stop = threading.Event()
+        self._pending: List[Tuple[int, int, int]] = []  # (world_time, timestamp, last_event_id)
+        self._pending_lock = threading.Lock()
+        self._persist_lock = threading.Lock()
+        self.world_time: Optional[int] = None
+        self._lease = 0
+        self._jitter = deque(maxlen=JITTER_WINDOW)
         self.metrics = {
             'ticks_processed': 0,
             'tick_errors': 0,
             'last_tick_time': None,
             'start_time': time.time(),
-            'last_error': None
+            'last_error': None,
+            'persisted_time': None,
+            'persist_batches': 0,
+            'persist_errors': 0,
+            'inline_flushes': 0,
+            'publish_ms_last': None,
+            'mode': 'realtime',
         }
 
+    def _open_publisher(self) -> TickPublisher:
+        """The tick publisher; the default one binds its ports here, not at construction."""
+        if self.publisher is None:
+            self.publisher = TickPublisher()
+        return self.publisher
+
+    def _connection(self):
+        return get_connection(self.db_path)
+
+    def load_time(self) -> int:
+        """Resume point: the highest persisted time, lease or logged tick."""
+        conn = self._connection()
+        try:
+            c = conn.cursor()
+            c.execute("SELECT value FROM system_state WHERE key IN ('time', 'time_lease')")
+            candidates = [int(r[0]) for r in c.fetchall() if r[0] is not None]
+            logged = tick_time_at(conn)
+            if logged is not None:
+                candidates.append(logged)
+        finally:
+            conn.close()
+        self.world_time = max(candidates, default=0)
+        self._lease = self.world_time
+        self.metrics['persisted_time'] = self.world_time
+        return self.world_time
+
+    def _last_event_id(self) -> int:
+        # a WAL read: never waits on the ingest writer
+        conn = self._connection()
+        try:
+            c = conn.cursor()
+            c.execute("SELECT COALESCE(MAX(id), 0) FROM events")
+            return c.fetchone()[0]
+        finally:
+            conn.close()
+
+    def flush(self, final: bool = False, renew: bool = False, min_lease: int = 0) -> int:
+        """Persist pending ticks and the lease in one transaction; returns ticks written.
+
+        `renew` writes the lease even with nothing pending, extended to at
+        least `min_lease`. `final` stores the exact time as the lease (clean shutdown).
+        """
+        with self._persist_lock:
+            with self._pending_lock:
+                batch, self._pending = self._pending, []
+            if not (batch or final or renew) or self.world_time is None:
+                return 0
+            persisted = batch[-1][0] if batch else self.metrics['persisted_time']
+            # leased from the in-memory time, which may already be ahead of the batch
+            lease = self.world_time if final else max(self.world_time + self.checkpoint_ticks, min_lease)
+            conn = self._connection()
+            try:
+                c = conn.cursor()
+                for world_time, ts, last_event_id in batch:
+                    record_tick(c, world_time, ts, last_event_id=last_event_id)
+                c.executemany(
+                    "REPLACE INTO system_state (key, value) VALUES (?, ?)",
+                    (("time", str(persisted)), ("time_lease", str(lease))),
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                with self._pending_lock:
+                    self._pending = batch + self._pending
+                self.metrics['persist_errors'] += 1
+                raise
+            finally:
+                conn.close()
+            self._lease = lease
+            self.metrics['persisted_time'] = persisted
+            self.metrics['persist_batches'] += 1
+            return len(batch)
+
+    def _writer_loop(self):
+        while not self._writer_stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to persist world ticks")
+
+    def _jitter_stats(self) -> Dict[str, Optional[float]]:
+        samples = sorted(self._jitter)
+        if not samples:
+            return {'samples': 0, 'last_ms': None, 'avg_ms': None, 'p99_ms': None, 'max_ms': None}
+        return {
+            'samples': len(samples),
+            'last_ms': self._jitter[-1] * 1000,
+            'avg_ms': sum(samples) / len(samples) * 1000,
+            'p99_ms': samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000,
+            'max_ms': samples[-1] * 1000,
+        }
 
-    def _process_tick(self) -> bool:
+    def _process_tick(self, steps: int = 1) -> bool:
         """Process a single tick of the world clock.
         
+        Args:
+            steps: World ticks to advance (more than one when coalescing)
+
         Returns:
             bool: True if the tick was processed successfully
         """
         try:
-            with get_connection() as conn:
-                c = conn.cursor()
-                
-                # Get current time from system_state
-                c.execute("SELECT value FROM system_state WHERE key='time'")
-                row = c.fetchone()
-                current_time = int(row[0]) if row else 0
-                new_time = current_time + 1
-
-                # Update time in database
-                c.execute(
-                    "REPLACE INTO system_state (key, value) VALUES (?, ?)",
-                    ("time", str(new_time))
-                )
-                
-                # Log tick event
-                tick_data = {
-                    'world_time': new_time,
-                    'previous_time': current_time,
-                    'tick_duration': self.tick_interval,
-                    'system_time': datetime.utcnow().isoformat()
-                }
-                
-                c.execute("""
-                    INSERT INTO events (
-                        timestamp, 
-                        type, 
-                        description, 
-                        involved_characters, 
-                        involved_locations, 
-                        metadata
-                    ) VALUES (?, ?, ?, ?, ?, ?)
-                """, (
-                    int(time.time()),
-                    "system_tick",
-                    f"World time advanced to {new_time}",
-                    "[]",
-                    "[]",
-                    json.dumps(tick_data)
-                ))
-                
-                conn.commit()
-                
-                # Broadcast tick to subscribers
-                success = self.publisher.publish_tick(tick_data)
-                if not success:
-                    logger.warning("Failed to publish tick %s", new_time)
-                
-                # Update metrics
-                self.metrics['ticks_processed'] += 1
-                self.metrics['last_tick_time'] = time.time()
-                
-                if self.metrics['ticks_processed'] % 10 == 0:
-                    self._log_metrics()
-                
-                return True
+            if self.world_time is None:
+                self.load_time()
+            current_time = self.world_time
+            new_time = current_time + steps
+            if new_time > self._lease:
+                # write-behind fell a lease behind: renew inline, never publish unleased time
+                self.metrics['inline_flushes'] += 1
+                self.flush(renew=True, min_lease=new_time)
+
+            tick_data = {
+                'world_time': new_time,
+                'previous_time': current_time,
+                'tick_duration': self.tick_interval,
+                'ticks': steps,
+                'system_time': datetime.utcnow().isoformat()
+            }
+            last_event_id = self._last_event_id()
+            
+            # Broadcast tick to subscribers first; persistence happens behind it
+            started = time.monotonic()
+            success = self.publisher.publish_tick(tick_data)
+            if not success:
+                logger.warning("Failed to publish tick %s", new_time)
+            self.metrics['publish_ms_last'] = (time.monotonic() - started) * 1000
+
+            self.world_time = new_time
+            with self._pending_lock:
+                self._pending.append((new_time, int(time.time()), last_event_id))
+            
+            # Update metrics
+            self.metrics['ticks_processed'] += 1
+            self.metrics['last_tick_time'] = time.time()
+            
+            if self.metrics['ticks_processed'] % 10 == 0:
+                self._log_metrics()
+            
+            return True
                 
         except Exception as e:
             error_msg = f"Error processing tick: {str(e)}"
@@ -132,15 +427,20 @@ class WorldClock:
         uptime = time.time() - self.metrics['start_time']
         ticks_per_second = self.metrics['ticks_processed'] / uptime if uptime > 0 else 0
         
+        jitter = self._jitter_stats()
         logger.info(
-            "Clock metrics: ticks=%d, errors=%d, tps=%.2f, uptime=%.1fs",
+            "Clock metrics: ticks=%d, errors=%d, tps=%.2f, uptime=%.1fs, jitter_p99=%.1fms, persisted=%s",
             self.metrics['ticks_processed'],
             self.metrics['tick_errors'],
             ticks_per_second,
-            uptime
+            uptime,
+            jitter['p99_ms'] or 0.0,
+            self.metrics['persisted_time']
         )
         
         # Log publisher stats if available
+        if self.publisher is None:
+            return
         try:
             pub_stats = self.publisher.get_stats()
             logger.debug(
@@ -153,22 +453,70 @@ class WorldClock:
         except Exception as e:
             logger.warning("Could not get publisher stats: %s", str(e))
     
+    def ack(self, consumer: str, world_time: int) -> Dict[str, Any]:
+        """Record that `consumer` finished processing ticks up to `world_time`."""
+        self.pacer.ack(consumer, world_time, clock_time=self.world_time)
+        return {'world_time': self.world_time, 'interval': self.schedule.interval,
+                'lag': None if self.world_time is None else self.pacer.lag(self.world_time)}
+
+    def downstream_ready(self, max_backlog: int = CLOCK_MAX_BACKLOG) -> bool:
+        """False while the publisher has `max_backlog` messages queued or consumers lag.
+
+        Lag is taken as of each consumer's last ack, so ticks published since
+        then (at most one ack interval's worth) do not count against it.
+        """
+        backlog = getattr(self.publisher, 'backlog', None)
+        if backlog is not None and backlog() >= max_backlog:
+            return False
+        lag = self.pacer.ack_lag()
+        return lag is None or lag <= self.pacer.lag_target
+
+    def run_accelerated(self, ticks: int, max_backlog: int = CLOCK_MAX_BACKLOG) -> Dict[str, float]:
+        """Advance `ticks` ticks back to back, pausing while downstream is backed up."""
+        self._open_publisher()
+        self.metrics['mode'] = 'accelerated'
+        started = time.monotonic()
+        done = stalls = 0
+        try:
+            while done < ticks and not self._shutdown.is_set():
+                if not self.downstream_ready(max_backlog):
+                    stalls += 1
+                    self._shutdown.wait(0.001)
+                    continue
+                if self._process_tick():
+                    done += 1
+                else:
+                    self._shutdown.wait(min(1.0, self.tick_interval))
+        finally:
+            self.metrics['mode'] = 'realtime'
+        self.flush()
+        elapsed = time.monotonic() - started
+        stats = {'ticks': done, 'seconds': elapsed, 'ticks_per_s': done / elapsed if elapsed > 0 else 0.0,
+                 'stalls': stalls}
+        logger.info("Accelerated %d ticks in %.1fs (%.0f ticks/s, %d stalls)", done, elapsed,
+                    stats['ticks_per_s'], stalls)
+        return stats
+
     def _run_loop(self):
-        """Main clock loop."""
-        logger.info("Starting world clock loop (interval=%.1fs)", self.tick_interval)
+        """Main clock loop: one tick per monotonic deadline."""
+        logger.info("Starting world clock loop (interval=%.1fs, catch_up=%s)", self.tick_interval, self.schedule.policy)
+        if self.accelerate_ticks:
+            self.run_accelerated(self.accelerate_ticks)
+        self.schedule.reset(time.monotonic())
         
         while not self._shutdown.is_set():
-            start_time = time.time()
-            
-            if not self._process_tick():
+            steps, late = self.schedule.due(time.monotonic())
+            if not steps:
+                self._shutdown.wait(self.schedule.wait_time(time.monotonic()))
+                continue
+            self._jitter.append(late)
+            if not self._process_tick(steps):
                 # On error, wait a bit before retrying
-                time.sleep(min(1.0, self.tick_interval))
-            
-            # Sleep for remaining time in the tick interval
-            elapsed = time.time() - start_time
-            sleep_time = max(0, self.tick_interval - elapsed)
-            if sleep_time > 0:
-                self._shutdown.wait(sleep_time)
+                self._shutdown.wait(min(1.0, self.tick_interval))
+                continue
+            interval = self.pacer.update(self.world_time)
+            if interval != self.schedule.interval:
+                self.schedule.set_interval(interval)
         
         logger.info("World clock loop stopped")
     
@@ -178,7 +526,11 @@ class WorldClock:
             logger.warning("World clock is already running")
             return False
             
+        self._open_publisher()
         self._shutdown.clear()
+        self._writer_stop.clear()
+        self._writer = threading.Thread(target=self._writer_loop, name="WorldClockWriter", daemon=True)
+        self._writer.start()
         self._thread = threading.Thread(target=self._run_loop, daemon=True)
         self._thread.start()
         logger.info("World clock started")
@@ -189,12 +541,20 @@ class WorldClock:
         self._shutdown.set()
         if self._thread and self._thread.is_alive():
             self._thread.join(timeout=self.tick_interval * 2)
+        self._writer_stop.set()
+        if self._writer and self._writer.is_alive():
+            self._writer.join(timeout=self.flush_interval * 2)
+        try:
+            self.flush(final=True)
+        except Exception:
+            logger.exception("Failed to persist world time on shutdown")
         
         # Close the publisher
-        try:
-            self.publisher.close()
-        except Exception as e:
-            logger.exception("Error closing publisher: %s", e)
+        if self.publisher is not None:
+            try:
+                self.publisher.close()
+            except Exception as e:
+                logger.exception("Error closing publisher: %s", e)
         
         logger.info("World clock stopped")
     
@@ -203,12 +563,23 @@ class WorldClock:
         return {
             'running': self._thread.is_alive() if self._thread else False,
             'tick_interval': self.tick_interval,
+            'world_time': self.world_time,
+            'ticks_pending': len(self._pending),
+            'lease': self._lease,
+            'jitter': self._jitter_stats(),
+            'catch_up': self.schedule.policy,
+            'schedule': dict(self.schedule.stats),
+            'interval': self.schedule.interval,
+            'lag': self.pacer.last_lag,
+            'pacer': dict(self.pacer.stats, min_interval=self.pacer.min_interval,
+                          max_interval=self.pacer.max_interval, lag_target=self.pacer.lag_target),
+            'consumers': self.pacer.consumers(self.world_time),
             'metrics': self.metrics.copy(),
-            'publisher_status': self.publisher.get_stats() if hasattr(self, 'publisher') else {}
+            'publisher_status': self.publisher.get_stats() if self.publisher is not None else {}
         }
 
 
-# Global instance for backward compatibility
+# Global instance for backward compatibility; it binds nothing until started
 _world_clock = WorldClock()
 
 
@@ -222,6 +593,10 @@ def start_world_clock(tick_interval: float = 5.0) -> bool:
         bool: True if the clock started successfully
     """
     global _world_clock
+    if _world_clock.get_status()['running']:
+        # a second clock would bind the tick and replay ports again
+        logger.warning("World clock is already running")
+        return False
     _world_clock = WorldClock(tick_interval)
     return _world_clock.start()
 
@@ -237,3 +612,13 @@ def get_clock_status() -> Dict[str, Any]:
     global _world_clock
     return _world_clock.get_status() if hasattr(_world_clock, 'get_status') else {}
 
+
+
+def get_world_time() -> Optional[int]:
+    """The running clock's in-memory world time (None before it has loaded)."""
+    return getattr(_world_clock, 'world_time', None)
+
+
+def ack_tick(consumer: str, world_time: int) -> Dict[str, Any]:
+    """Record a consumer's processed-tick watermark on the running clock."""
+    return _world_clock.ack(consumer, world_time)
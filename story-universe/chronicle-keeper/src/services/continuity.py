@@ -28,21 +28,33 @@ PERSONA_COOLDOWN_SECONDS = 60 * 60
 
 
 
+from src.db.queries import event_exists
+from src.services.world_cache import WorldStateCache
+
+
 class ContinuityValidator:
     def __init__(self, world_state=None, db_conn_getter=None):
         """If `db_conn_getter` is provided (callable returning a DB connection),
-        the validator will load canonical state from the DB on each validation.
+        the validator keeps a resident `WorldStateCache` loaded from the DB on
+        first use and patched as events are applied.
         Otherwise `world_state` (a dict) will be used (keeps tests working).
         """
         self._provided_world_state = world_state
         self._db_conn_getter = db_conn_getter
         self.world_state = world_state if db_conn_getter is None else {}
+        self.cache = WorldStateCache(db_conn_getter, fallback_state=world_state) if db_conn_getter else None
+
+    def reload_state(self):
+        """Force the cached world state to be re-read from the DB."""
+        if self.cache is not None:
+            self.world_state = self.cache.reload()
+        return self.world_state
 
     def validate_event(self, event):
-        # Refresh world state from DB if configured
-        if self._db_conn_getter:
+        # Use the resident world state if configured
+        if self.cache is not None:
             try:
-                self.world_state = self._load_state_from_db()
+                self.world_state = self.cache.get()
             except Exception:
                 # Fall back to provided state if DB read fails
                 if self._provided_world_state is not None:
@@ -93,11 +105,10 @@ class ContinuityValidator:
             if char.get("status") == "dead":
                 return False, "Character is dead and cannot act"
 
-        # 5. Duplicate event
+        # 5. Duplicate event (full history via the unique canonical_id index)
         if event.get("id") is not None:
-            for e in self.world_state.get("recent_events", []):
-                if e.get("id") == event["id"]:
-                    return False, "Duplicate event ID"
+            if self._event_exists(event["id"]):
+                return False, "Duplicate event ID"
 
         # 5b. Causation / correlation validation
         ok, reason = self._validate_causation_chain(event)
@@ -133,33 +144,8 @@ class ContinuityValidator:
             except Exception:
                 rel_rev = None
 
-            # fetch explicit relationship row and faction cooldowns from DB (if available)
-            rel_row = None
-            cooldowns = {}
-            try:
-                if self._db_conn_getter:
-                    conn = self._db_conn_getter()
-                    opened_here = False
-                else:
-                    from src.db.database import get_connection
-                    conn = get_connection()
-                    opened_here = True
-                cur = conn.cursor()
-                cur.execute('SELECT relationship_type, strength, cooldown_until FROM faction_relationships WHERE source_faction_id = ? AND target_faction_id = ?', (src, tgt))
-                rrow = cur.fetchone()
-                if rrow:
-                    rel_row = {'relationship_type': rrow[0], 'strength': float(rrow[1] or 0.0), 'cooldown_until': int(rrow[2] or 0)}
-                cur.execute('SELECT cooldown_key, until_ts FROM faction_cooldowns WHERE faction_id = ?', (src,))
-                cooldowns = {row[0]: int(row[1]) for row in cur.fetchall()}
-            except Exception:
-                rel_row = None
-                cooldowns = {}
-            finally:
-                try:
-                    if 'opened_here' in locals() and opened_here:
-                        conn.close()
-                except Exception:
-                    pass
+            # explicit relationship row and faction cooldowns (resident state)
+            rel_row, cooldowns = self._faction_links(src, tgt)
 
             # basic relationship-type constraints
             if action == "attack" and rel == "ally":
@@ -273,46 +259,6 @@ class ContinuityValidator:
             # apply trust-based attack gating unless hostile_override is true
             if action == 'attack' and (not hostile_override) and src_trust < attack_threshold:
                 return False, f"Faction {src} trust too low to justify coordinated attack (threshold {attack_threshold})"
-            # Enforce explicit relationship rows and cooldowns from DB if available
-            try:
-                # prefer injected DB connection for testability
-                if self._db_conn_getter:
-                    conn = self._db_conn_getter()
-                    opened_here = False
-                else:
-                    from src.db.database import get_connection
-                    conn = get_connection()
-                    opened_here = True
-                cur = conn.cursor()
-                # fetch explicit relationship from source->target
-                cur.execute('SELECT relationship_type, strength, cooldown_until FROM faction_relationships WHERE source_faction_id = ? AND target_faction_id = ?', (src, tgt))
-                rrow = cur.fetchone()
-                rel_row = None
-                if rrow:
-                    rel_row = {'relationship_type': rrow[0], 'strength': float(rrow[1] or 0.0), 'cooldown_until': int(rrow[2] or 0)}
-
-                # check per-faction cooldowns that might apply to action keys
-                cur.execute('SELECT cooldown_key, until_ts FROM faction_cooldowns WHERE faction_id = ?', (src,))
-                cooldowns = {row[0]: int(row[1]) for row in cur.fetchall()}
-
-                import time
-                now = int(time.time())
-                # if there is an explicit relationship and it has an active cooldown, block related actions
-                if rel_row and rel_row.get('cooldown_until', 0) > now and action in {'attack', 'declare_war', 'betray'}:
-                    return False, f"Relationship cooldown active until {rel_row['cooldown_until']}"
-                # check faction-level cooldowns for any matching action key
-                for key, until in cooldowns.items():
-                    if until > now and (key == action or key in action or action.startswith(key)):
-                        return False, f"Faction {src} cooldown '{key}' active until {until}"
-            except Exception:
-                # If DB access fails, ignore and fall back to in-memory relationships
-                pass
-            finally:
-                try:
-                    if 'opened_here' in locals() and opened_here:
-                        conn.close()
-                except Exception:
-                    pass
 
         # 7. Timeline consistency
         if event_type == "character_action" and event.get("timestamp") is not None:
@@ -372,7 +318,7 @@ class ContinuityValidator:
             # ensure no duplicate name or suspicious resurrection
             name = event.get("name") or event.get("character_name")
             if name:
-                for cid, c in self.world_state.get("characters", {}).items():
+                for cid, c in list(self.world_state.get("characters", {}).items()):
                     if c.get("name") == name and event.get("character_id") and str(event.get("character_id")) != str(cid):
                         # name clash: possible duplicate identity
                         return False, f"Identity conflict: name {name} already exists as id {cid}"
@@ -381,119 +327,30 @@ class ContinuityValidator:
 
     def _load_state_from_db(self):
         """Read canonical state from the SQLite DB and return a dict similar
-        to the shape expected by the validator tests.
+        to the shape expected by the validator tests (bypasses the cache).
         """
-        state = {"characters": {}, "locations": {}, "factions": {}, "recent_events": []}
+        cache = self.cache or WorldStateCache(self._db_conn_getter or _default_conn_getter)
+        return cache.load_from_db()
+
+    def _faction_links(self, src, tgt):
+        """Return (relationship row src->tgt or None, {cooldown_key: until_ts}) for `src`."""
+        faction = self.world_state.get("factions", {}).get(str(src)) or {}
+        rel_row = (faction.get("outgoing_relationships") or {}).get(str(tgt))
+        cooldowns = dict(faction.get("cooldowns") or {})
+        return rel_row, cooldowns
+
+    def _refresh_cache(self, conn, characters=(), factions=()):
+        """Re-read the rows touched by an applied event into the resident state."""
+        if self.cache is None:
+            return
         try:
-            # Prefer an injected DB connection getter (useful for tests). If not provided,
-            # fall back to the package-level get_connection helper.
-            if self._db_conn_getter:
-                conn = self._db_conn_getter()
-                opened_here = False
-            else:
-                from src.db.database import get_connection
-                conn = get_connection()
-                opened_here = True
-            c = conn.cursor()
-            # load characters
-            try:
-                c.execute('SELECT id, name, status, traits, location_id FROM characters')
-                rows = c.fetchall()
-                for r in rows:
-                    cid = str(r[0])
-                    state["characters"][cid] = {"name": r[1], "status": r[2], "traits": []}
-                    try:
-                        import json
-                        state["characters"][cid]["traits"] = json.loads(r[3]) if r[3] else []
-                    except Exception:
-                        state["characters"][cid]["traits"] = []
-                    state["characters"][cid]["location_id"] = r[4]
-            except Exception:
-                pass
-
-            # load locations
-            try:
-                c.execute('SELECT id, name, description, forbidden, locked, political_status, metadata FROM locations')
-                rows = c.fetchall()
-                for r in rows:
-                    lid = str(r[0])
-                    state["locations"][lid] = {"name": r[1], "description": r[2], "forbidden": bool(r[3]), "locked": bool(r[4]), "political_status": r[5]}
-            except Exception:
-                pass
-
-            # load factions
-            try:
-                # include personality_traits column so persona modifiers are available
-                c.execute('SELECT id, name, ideology, relationships, personality_traits FROM factions')
-                rows = c.fetchall()
-                for r in rows:
-                    fid = str(r[0])
-                    try:
-                        import json
-                        rels = json.loads(r[3]) if r[3] else {}
-                        ptraits = json.loads(r[4]) if len(r) > 4 and r[4] else {}
-                    except Exception:
-                        rels = {}
-                        ptraits = {}
-                    # initialize faction entry; metrics & personality filled later if present
-                    state["factions"][fid] = {"name": r[1], "ideology": r[2], "relationships": rels, "personality_traits": ptraits, "metrics": {}}
-                # load faction metrics if available
-                try:
-                    c.execute('SELECT faction_id, trust, power, resources, influence FROM faction_metrics')
-                    fm_rows = c.fetchall()
-                    for fr in fm_rows:
-                        fid = str(fr[0])
-                        if fid not in state["factions"]:
-                            state["factions"][fid] = {"name": None, "ideology": None, "relationships": {}, "metrics": {}}
-                        state["factions"][fid]["metrics"] = {"trust": float(fr[1]) if fr[1] is not None else 0.5, "power": int(fr[2] or 0), "resources": int(fr[3] or 0), "influence": int(fr[4] or 0)}
-                except Exception:
-                    # If faction_metrics table missing, leave default metrics empty
-                    pass
-            except Exception:
-                pass
-
-            # load recent events (limit 100)
-            try:
-                c.execute('SELECT id, timestamp, type, description, involved_characters, involved_locations, metadata FROM events ORDER BY timestamp DESC LIMIT 100')
-                rows = c.fetchall()
-                for r in rows:
-                    e = {"id": r[0], "timestamp": r[1]}
-                    # try to parse involved_characters if present
-                    try:
-                        import ast
-                        ic = ast.literal_eval(r[4]) if r[4] else []
-                    except Exception:
-                        ic = []
-                    try:
-                        import ast
-                        il = ast.literal_eval(r[5]) if r[5] else []
-                    except Exception:
-                        il = []
-                    e["involved_characters"] = ic
-                    e["involved_locations"] = il
-                    state["recent_events"].append(e)
-            except Exception:
-                pass
-
-            # Only close if we opened the connection here; injected connections are
-            # owned by the caller (e.g., tests) and should not be closed.
-            try:
-                if opened_here:
-                    conn.close()
-            except Exception:
-                pass
+            for cid in characters:
+                self.cache.refresh_character(cid, conn=conn)
+            for fid in factions:
+                self.cache.refresh_faction(fid, conn=conn)
         except Exception:
-            # If DB access fails, return minimal empty state
-            return state
-
-        # If DB has no characters/locations (test DB), fall back to provided world_state or a minimal default
-        if not state.get("characters"):
-            if self._provided_world_state:
-                return self._provided_world_state
-            # minimal default to keep legacy behavior/tests working
-            return {"characters": {"1": {"name": "Alice", "status": "alive"}}, "locations": {"100": {"name": "Town"}}, "factions": {}, "recent_events": []}
-
-        return state
+            # a failed patch must not leave stale state behind
+            self.cache.invalidate()
 
     def _validate_causation_chain(self, event):
         """Return (True, '') if causation/correlation checks pass.
@@ -507,31 +364,46 @@ class ContinuityValidator:
         if not causation:
             return True, ''
 
-        # check in-memory recent events first
-        for e in self.world_state.get('recent_events', []):
-            if e.get('id') == causation:
-                return True, ''
-
-        # if we have DB access, check events table
+        found = self._event_exists(causation)
+        if found:
+            return True, ''
+        if found is False:
+            return False, f'Causation event {causation} not found'
         if self._db_conn_getter:
-            try:
-                conn = self._db_conn_getter()
-                cur = conn.cursor()
-                cur.execute('SELECT id FROM events WHERE id = ?', (causation,))
-                if cur.fetchone():
-                    return True, ''
-                return False, f'Causation event {causation} not found'
-            except Exception:
-                # fall back to rejecting if we cannot verify
-                return False, f'Failed to validate causation {causation}'
-
+            # fall back to rejecting if we cannot verify
+            return False, f'Failed to validate causation {causation}'
         return False, f'Causation event {causation} not present in recent events'
 
-    def apply_event_consequences(self, event, db_conn=None):
+    def _event_exists(self, event_id):
+        """True/False if the canonical id is known, None if it cannot be checked.
+
+        The in-memory recent window answers most lookups; otherwise this is a
+        single probe of the unique `events.canonical_id` index.
+        """
+        for e in self.world_state.get('recent_events', []):
+            if e.get('id') == event_id:
+                return True
+        if not self._db_conn_getter:
+            return None
+        try:
+            # the getter may hand out a caller-owned connection, so it is not
+            # closed here; a pooled one is released when dropped, and a nested
+            # release never rolls back the ingest writer's open batch
+            return event_exists(self._db_conn_getter(), event_id)
+        except Exception:
+            return None
+
+    def apply_event_consequences(self, event, db_conn=None, commit=True, applied_at=None):
         """Apply state updates for an accepted event.
         If `db_conn` provided or `db_conn_getter` is configured, write changes to DB.
+        Pass `commit=False` to leave the writes in the caller's open transaction
+        (the group-commit ingest writer commits a whole batch at once).
+        `applied_at` (unix seconds, default now) anchors cooldown deadlines; the
+        ingest writer stores it with the event so replay reproduces them exactly.
         This function is intentionally lightweight; concrete rules are in docs/EVENT_CONSEQUENCES.md.
         """
+        import time
+        applied_ts = int(time.time()) if applied_at is None else int(applied_at)
         try:
             conn = None
             opened_here = False
@@ -543,6 +415,10 @@ class ContinuityValidator:
             else:
                 conn = None
 
+            def commit_now():
+                if commit:
+                    conn.commit()
+
             typ = event.get('type')
             # ----------------------
             # Character actions
@@ -553,7 +429,8 @@ class ContinuityValidator:
                 if conn:
                     cur = conn.cursor()
                     cur.execute('UPDATE characters SET location_id = ? WHERE id = ?', (loc, cid))
-                    conn.commit()
+                    commit_now()
+                    self._refresh_cache(conn, characters=[cid])
                 else:
                     if cid in self.world_state.get('characters', {}):
                         self.world_state['characters'][cid]['location_id'] = loc
@@ -564,7 +441,8 @@ class ContinuityValidator:
                 if conn:
                     cur = conn.cursor()
                     cur.execute('UPDATE characters SET status = ? WHERE id = ?', (new, cid))
-                    conn.commit()
+                    commit_now()
+                    self._refresh_cache(conn, characters=[cid])
                 else:
                     if cid in self.world_state.get('characters', {}):
                         self.world_state['characters'][cid]['status'] = new
@@ -601,9 +479,9 @@ class ContinuityValidator:
                         cur.execute('INSERT OR REPLACE INTO faction_relationships (source_faction_id,target_faction_id,relationship_type,strength,cooldown_until) VALUES (?,?,?,?,?)', (src, tgt, 'ally', init_strength, 0))
                         # set a cooldown entry to prevent immediate repeat alliances; longer stability -> longer cooldown (durable alliance)
                         import time
-                        until = int(time.time()) + int(PERSONA_COOLDOWN_SECONDS * (1.0 + (1.0 - float(stability))))
+                        until = applied_ts + int(PERSONA_COOLDOWN_SECONDS * (1.0 + (1.0 - float(stability))))
                         cur.execute('INSERT OR REPLACE INTO faction_cooldowns (faction_id,cooldown_key,until_ts) VALUES (?,?,?)', (src, 'form_alliance', until))
-                        conn.commit()
+                        commit_now()
 
                     if action == 'attack':
                         # lower relationship strength if exists, or create hostile row
@@ -616,7 +494,7 @@ class ContinuityValidator:
                         else:
                             delta = 0.2 * (1.0 + float(severity))
                             cur.execute('INSERT INTO faction_relationships (source_faction_id,target_faction_id,relationship_type,strength,cooldown_until) VALUES (?,?,?,?,?)', (src, tgt, 'hostile', -delta, 0))
-                        conn.commit()
+                        commit_now()
 
                         # Adjust faction metrics (trust) proportional to severity
                         try:
@@ -632,10 +510,10 @@ class ContinuityValidator:
                                 cur.execute('UPDATE faction_metrics SET trust = ? WHERE faction_id = ?', (new_s, src))
                             # set relationship cooldown proportional to severity
                             import time
-                            now_ts = int(time.time())
+                            now_ts = applied_ts
                             rel_cool = now_ts + int(PERSONA_COOLDOWN_SECONDS * (1.0 + float(severity)))
                             cur.execute('UPDATE faction_relationships SET cooldown_until = ? WHERE source_faction_id = ? AND target_faction_id = ?', (rel_cool, src, tgt))
-                            conn.commit()
+                            commit_now()
                         except Exception:
                             pass
 
@@ -649,7 +527,7 @@ class ContinuityValidator:
                                 cur.execute('UPDATE faction_relationships SET strength = ? WHERE source_faction_id = ? AND target_faction_id = ?', (new_strength, src, tgt))
                             else:
                                 cur.execute('INSERT INTO faction_relationships (source_faction_id,target_faction_id,relationship_type,strength,cooldown_until) VALUES (?,?,?,?,?)', (src, tgt, 'hostile', -0.3 * (1.0 + float(severity)), 0))
-                            conn.commit()
+                            commit_now()
                         except Exception:
                             pass
 
@@ -671,7 +549,7 @@ class ContinuityValidator:
                                 inertia = 0.0
                             if inertia >= 1.0:
                                 inertia = 0.99
-                            now = int(time.time())
+                            now = applied_ts
                             cooldown_key = 'persona_drift'
                             cur.execute('SELECT until_ts FROM faction_cooldowns WHERE faction_id = ? AND cooldown_key = ?', (src, cooldown_key))
                             crow = cur.fetchone()
@@ -690,10 +568,12 @@ class ContinuityValidator:
                                     cur.execute('UPDATE factions SET personality_traits = ? WHERE id = ?', (json.dumps(ptraits), src))
                                     until = now + PERSONA_COOLDOWN_SECONDS
                                     cur.execute('INSERT OR REPLACE INTO faction_cooldowns (faction_id,cooldown_key,until_ts) VALUES (?,?,?)', (src, cooldown_key, until))
-                                    conn.commit()
+                                    commit_now()
                     except Exception:
                         pass
 
+                    self._refresh_cache(conn, factions=[f for f in (src, tgt) if f is not None])
+
                 else:
                     # No DB: apply scaled personality drift to in-memory world_state
                     try:
@@ -707,7 +587,7 @@ class ContinuityValidator:
                             ptraits = f.get('personality_traits') or {}
                             inertia = float(ptraits.get('inertia', PERSONA_INERTIA_DEFAULT)) if isinstance(ptraits, dict) else PERSONA_INERTIA_DEFAULT
                             inertia = max(0.0, min(0.99, inertia))
-                            now = int(time.time())
+                            now = applied_ts
                             fc = self.world_state.setdefault('faction_cooldowns', {})
                             fcd = fc.get(fid, {})
                             cooldown_until = int(fcd.get('persona_drift', 0) or 0)
@@ -729,6 +609,9 @@ class ContinuityValidator:
                     except Exception:
                         pass
 
+            if self.cache is not None:
+                self.cache.record_event(event)
+
         finally:
             try:
                 if 'opened_here' in locals() and opened_here and conn:
@@ -736,3 +619,7 @@ class ContinuityValidator:
             except Exception:
                 pass
 
+
+def _default_conn_getter():
+    from src.db.database import get_connection
+    return get_connection()
@@ -0,0 +1,315 @@
+"""Snapshots of canonical state plus deterministic event replay.
+
+Canonical tables are still updated in place on ingest. This module makes
+them reproducible from the event log:
+
+- every event row stores its full JSON (`events.payload`) and the time its
+  consequences were applied (`events.applied_at`)
+- `take_snapshot` stores a compact, zlib-compressed copy of the canonical
+  tables in `state_snapshots`, tagged with the last event id it reflects
+- `rebuild` restores the newest snapshot at or before a target event and
+  replays only the events after it, through the same
+  `ContinuityValidator.apply_event_consequences` rules used on ingest
+
+Recovery time is therefore proportional to the tail since the last
+snapshot. `SnapshotScheduler` takes snapshots periodically, and right after
+out-of-band writes (CRUD endpoints, imports) that the log cannot replay.
+Legacy rows without a payload are skipped and counted. World time comes
+from the clock's `world_ticks` log; legacy `system_tick` rows still in
+`events` are replayed from their metadata.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from src.services.continuity import ContinuityValidator
+from src.services.tick_retention import tick_time_at
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_EVERY_EVENTS = int(os.environ.get("CHRONICLE_SNAPSHOT_EVERY_EVENTS", "10000"))
+SNAPSHOT_INTERVAL_S = float(os.environ.get("CHRONICLE_SNAPSHOT_INTERVAL_S", "60"))
+SNAPSHOTS_KEEP = int(os.environ.get("CHRONICLE_SNAPSHOTS_KEEP", "24"))
+
+# Tables that make up canonical world state, in restore order
+SNAPSHOT_TABLES = (
+    "characters",
+    "locations",
+    "factions",
+    "faction_relationships",
+    "faction_cooldowns",
+    "faction_metrics",
+    "character_state",
+    "system_state",
+)
+
+# Only these event types have consequences; everything else is skipped by the query
+REPLAYED_TYPES = ("character_action", "character_state_change", "faction_event", "system_tick")
+
+REPLAY_FETCH_SIZE = 5000
+
+
+def _table_columns(cur, table: str):
+    cur.execute(f"PRAGMA table_info({table})")
+    return [r[1] for r in cur.fetchall()]
+
+
+def capture_state(cur) -> Dict[str, Dict[str, Any]]:
+    """Read every canonical table as `{table: {"columns": [...], "rows": [[...], ...]}}`."""
+    state = {}
+    for table in SNAPSHOT_TABLES:
+        columns = _table_columns(cur, table)
+        if not columns:
+            continue
+        cur.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY rowid")
+        state[table] = {"columns": columns, "rows": [list(r) for r in cur.fetchall()]}
+    return state
+
+
+def encode_state(state: Dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(state, separators=(",", ":")).encode("utf-8"), 6)
+
+
+def decode_state(blob: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+def restore_state(cur, state: Dict[str, Any]):
+    """Replace the canonical tables with a captured state (inside the caller's transaction).
+
+    Only columns present on both sides are copied, so a snapshot taken before
+    a column was added still restores.
+    """
+    for table in SNAPSHOT_TABLES:
+        data = state.get(table)
+        target = _table_columns(cur, table)
+        if data is None or not target:
+            continue
+        keep = [i for i, col in enumerate(data["columns"]) if col in target]
+        cols = [data["columns"][i] for i in keep]
+        cur.execute(f"DELETE FROM {table}")
+        if data["rows"] and cols:
+            cur.executemany(
+                f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})",
+                ([row[i] for i in keep] for row in data["rows"]),
+            )
+
+
+def _world_time(cur) -> Optional[int]:
+    try:
+        cur.execute("SELECT value FROM system_state WHERE key = 'time'")
+        row = cur.fetchone()
+        return int(row[0]) if row else None
+    except Exception:
+        return None
+
+
+def take_snapshot(conn) -> int:
+    """Snapshot canonical state under the write lock; returns the snapshot id."""
+    cur = conn.cursor()
+    # IMMEDIATE: no commit can land between reading MAX(id) and the tables
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        cur.execute("SELECT COALESCE(MAX(id), 0) FROM events")
+        last_event_id = int(cur.fetchone()[0])
+        blob = encode_state(capture_state(cur))
+        cur.execute(
+            "INSERT INTO state_snapshots (last_event_id, world_time, created_at, state) VALUES (?, ?, ?, ?)",
+            (last_event_id, _world_time(cur), int(time.time()), blob),
+        )
+        snapshot_id = cur.lastrowid
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return snapshot_id
+
+
+def _select_snapshot(conn, columns: str, at_or_before_event: Optional[int]):
+    cur = conn.cursor()
+    sql = f"SELECT {columns} FROM state_snapshots"
+    params: Tuple = ()
+    if at_or_before_event is not None:
+        sql += " WHERE last_event_id <= ?"
+        params = (int(at_or_before_event),)
+    cur.execute(sql + " ORDER BY last_event_id DESC, id DESC LIMIT 1", params)
+    return cur.fetchone()
+
+
+def find_snapshot(conn, at_or_before_event: Optional[int] = None) -> Optional[Tuple[int, int]]:
+    """`(id, last_event_id)` of the snapshot `load_snapshot` would pick, without decoding it."""
+    return _select_snapshot(conn, "id, last_event_id", at_or_before_event)
+
+
+def load_snapshot(conn, at_or_before_event: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Newest snapshot reflecting no events after `at_or_before_event` (any, if None)."""
+    row = _select_snapshot(conn, "id, last_event_id, world_time, created_at, state", at_or_before_event)
+    if row is None:
+        return None
+    return {"id": row[0], "last_event_id": row[1], "world_time": row[2], "created_at": row[3], "state": decode_state(row[4])}
+
+
+def prune_snapshots(conn, keep: int = SNAPSHOTS_KEEP) -> int:
+    cur = conn.cursor()
+    cur.execute(
+        "DELETE FROM state_snapshots WHERE id NOT IN (SELECT id FROM state_snapshots ORDER BY last_event_id DESC, id DESC LIMIT ?)",
+        (max(1, int(keep)),),
+    )
+    conn.commit()
+    return cur.rowcount or 0
+
+
+def _row_event(typ, payload, metadata) -> Optional[Dict[str, Any]]:
+    if payload:
+        return json.loads(payload)
+    if typ == "system_tick" and metadata:
+        # written by the clock directly; its metadata is the tick JSON
+        try:
+            return {"type": "system_tick", "metadata": json.loads(metadata)}
+        except ValueError:
+            return None
+    return None
+
+
+def iter_events(cur, after_event_id: int, until_event_id: Optional[int] = None) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[int]]]:
+    """Yield `(row_id, event or None, applied_at)` for replayable rows in commit order."""
+    sql = (f"SELECT id, type, payload, metadata, applied_at FROM events WHERE id > ?"
+           f" AND type IN ({', '.join('?' * len(REPLAYED_TYPES))})")
+    params = [int(after_event_id), *REPLAYED_TYPES]
+    if until_event_id is not None:
+        sql += " AND id <= ?"
+        params.append(int(until_event_id))
+    cur.execute(sql + " ORDER BY id", params)
+    while True:
+        rows = cur.fetchmany(REPLAY_FETCH_SIZE)
+        if not rows:
+            return
+        for row_id, typ, payload, metadata, applied_at in rows:
+            yield row_id, _row_event(typ, payload, metadata), applied_at
+
+
+class ReplayEngine:
+    """Applies logged events to a connection with the ingest-time rules."""
+
+    def __init__(self):
+        # no conn getter: no resident cache, consequences go to the conn we pass
+        self.validator = ContinuityValidator(world_state={})
+
+    def apply(self, conn, event: Dict[str, Any], applied_at: Optional[int]):
+        if event.get("type") == "system_tick":
+            world_time = (event.get("metadata") or {}).get("world_time")
+            if world_time is not None:
+                conn.execute("REPLACE INTO system_state (key, value) VALUES ('time', ?)", (str(world_time),))
+            return
+        self.validator.apply_event_consequences(event, db_conn=conn, commit=False, applied_at=applied_at)
+
+    def replay(self, source_conn, target_conn, after_event_id: int, until_event_id: Optional[int] = None) -> Dict[str, int]:
+        stats = {"applied": 0, "skipped": 0, "last_event_id": int(after_event_id)}
+        for row_id, event, applied_at in iter_events(source_conn.cursor(), after_event_id, until_event_id):
+            stats["last_event_id"] = row_id
+            if event is None:
+                stats["skipped"] += 1
+                continue
+            self.apply(target_conn, event, applied_at)
+            stats["applied"] += 1
+        return stats
+
+
+def rebuild(source_conn, target_conn=None, until_event_id: Optional[int] = None, commit: bool = True,
+            world_time: Optional[int] = None) -> Dict[str, Any]:
+    """Restore the newest usable snapshot into `target_conn` and replay the tail.
+
+    `target_conn` defaults to `source_conn` (in-place recovery). World time
+    is set to `world_time`, or else to the last tick logged before any event
+    after `until_event_id`. Raises `LookupError` when no snapshot is old enough.
+    """
+    target_conn = target_conn if target_conn is not None else source_conn
+    snap = load_snapshot(source_conn, until_event_id)
+    if snap is None:
+        raise LookupError("no snapshot" if until_event_id is None else f"no snapshot at or before event {until_event_id}")
+    started = time.perf_counter()
+    cur = target_conn.cursor()
+    if not target_conn.in_transaction:
+        cur.execute("BEGIN")
+    try:
+        restore_state(cur, snap["state"])
+        stats = ReplayEngine().replay(source_conn, target_conn, snap["last_event_id"], until_event_id)
+        if world_time is None:
+            world_time = tick_time_at(source_conn, until_event_id)
+        if world_time is not None:
+            cur.execute("REPLACE INTO system_state (key, value) VALUES ('time', ?)", (str(world_time),))
+        if commit:
+            target_conn.commit()
+    except Exception:
+        target_conn.rollback()
+        raise
+    stats.update(snapshot_id=snap["id"], snapshot_event_id=snap["last_event_id"],
+                 seconds=time.perf_counter() - started)
+    return stats
+
+
+class SnapshotScheduler:
+    """Background thread taking a snapshot every `every_events` events (checked each `interval_s`)."""
+
+    def __init__(self, conn_getter, every_events: int = SNAPSHOT_EVERY_EVENTS,
+                 interval_s: float = SNAPSHOT_INTERVAL_S, keep: int = SNAPSHOTS_KEEP):
+        self._conn_getter = conn_getter
+        self.every_events = max(1, int(every_events))
+        self.interval_s = max(0.01, float(interval_s))
+        self.keep = keep
+        self._dirty = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"snapshots": 0, "errors": 0, "last_snapshot_id": None}
+
+    def note_out_of_band_write(self):
+        """A write the event log cannot replay happened; snapshot on the next pass."""
+        self._dirty = True
+
+    def maybe_snapshot(self) -> Optional[int]:
+        conn = self._conn_getter()
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT COALESCE(MAX(id), 0) FROM events")
+            last_event_id = cur.fetchone()[0]
+            cur.execute("SELECT MAX(last_event_id) FROM state_snapshots")
+            snapped = cur.fetchone()[0]
+            due = snapped is None or self._dirty or last_event_id - snapped >= self.every_events
+            if not due:
+                return None
+            self._dirty = False
+            snapshot_id = take_snapshot(conn)
+            prune_snapshots(conn, self.keep)
+            self.stats["snapshots"] += 1
+            self.stats["last_snapshot_id"] = snapshot_id
+            return snapshot_id
+        finally:
+            conn.close()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="SnapshotScheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        # first pass right away so a fresh DB gets its base snapshot
+        while True:
+            try:
+                self.maybe_snapshot()
+            except Exception:
+                self.stats["errors"] += 1
+                logger.exception("Snapshot failed")
+            if self._stop.wait(self.interval_s):
+                break
@@ -0,0 +1,203 @@
+"""Group-commit write-behind queue for event ingestion.
+
+A single writer thread drains a bounded queue of schema-valid events and
+handles them in micro-batches: each event is validated against the resident
+world state, inserted and has its consequences applied inside one shared
+transaction, and the batch is committed once. A submitter's future resolves
+only after the commit covering its event, so an "accepted" reply is durable.
+
+Validation runs on the writer thread too. Events are therefore checked in
+commit order, and an event always sees the consequences of earlier events,
+including ones still waiting in the same batch. `submit_batch` queues a
+client-side batch as a single entry, so its events are validated in order
+and always land in the same transaction.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.db.queries import insert_event
+
+logger = logging.getLogger(__name__)
+
+INGEST_BATCH_SIZE = int(os.environ.get("CHRONICLE_INGEST_BATCH_SIZE", "64"))
+INGEST_FLUSH_MS = float(os.environ.get("CHRONICLE_INGEST_FLUSH_MS", "5"))
+INGEST_QUEUE_SIZE = int(os.environ.get("CHRONICLE_INGEST_QUEUE_SIZE", "1024"))
+
+
+class IngestQueueFull(Exception):
+    """Raised when an event cannot be queued because the writer is saturated."""
+
+
+class IngestWriter:
+    """Single writer thread committing validated events in micro-batches."""
+
+    def __init__(
+        self,
+        validator,
+        conn_getter: Callable[[], Any],
+        batch_size: int = INGEST_BATCH_SIZE,
+        flush_ms: float = INGEST_FLUSH_MS,
+        max_queue: int = INGEST_QUEUE_SIZE,
+    ):
+        self.validator = validator
+        self._conn_getter = conn_getter
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = max(0.0, float(flush_ms)) / 1000.0
+        self._queue: "queue.Queue[Tuple[Any, Future]]" = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self.stats = {"events": 0, "accepted": 0, "rejected": 0, "batches": 0, "commit_errors": 0, "max_batch": 0}
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self):
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="IngestWriter", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the writer after flushing everything already queued."""
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            thread.join(timeout)
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+    def submit(self, event: Dict[str, Any], block: bool = False, timeout: Optional[float] = None) -> Future:
+        """Queue an event; the future resolves to the ingest result dict after commit.
+
+        Non-blocking by default so an async caller never stalls its loop on a
+        full queue; it gets `IngestQueueFull` and can shed load instead.
+        """
+        return self._put(event, block, timeout)
+
+    def submit_batch(self, events: List[Dict[str, Any]], block: bool = False, timeout: Optional[float] = None) -> Future:
+        """Queue events that must commit together; resolves to a list of results in order."""
+        return self._put(list(events), block, timeout)
+
+    def _put(self, item, block: bool, timeout: Optional[float]) -> Future:
+        if not self._running:
+            self.start()
+        fut: Future = Future()
+        try:
+            self._queue.put((item, fut), block=block, timeout=timeout)
+        except queue.Full:
+            raise IngestQueueFull(f"ingest queue full ({self._queue.maxsize} pending)")
+        return fut
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats, queued=self._queue.qsize(), batch_size=self.batch_size, flush_ms=self.flush_interval * 1000.0)
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+    def _collect(self) -> List[Tuple[Any, Future]]:
+        """Block for the first item, then gather more until the batch is full or the flush window closes."""
+        try:
+            batch = [self._queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch:
+                self._process(batch)
+            elif not self._running:
+                break
+
+    def _process(self, batch: List[Tuple[Any, Future]]):
+        results: List[Tuple[Future, Any]] = []
+        conn = None
+        try:
+            conn = self._conn_getter()
+            c = conn.cursor()
+            c.execute("BEGIN")
+            for item, fut in batch:
+                if isinstance(item, list):
+                    results.append((fut, [self._apply(conn, c, event) for event in item]))
+                else:
+                    results.append((fut, self._apply(conn, c, item)))
+            conn.commit()
+        except Exception as e:
+            logger.exception("Ingest batch of %d entries failed to commit", len(batch))
+            self.stats["commit_errors"] += 1
+            try:
+                if conn is not None:
+                    conn.rollback()
+            except Exception:
+                pass
+            # consequences were already patched into the resident state
+            cache = getattr(self.validator, "cache", None)
+            if cache is not None:
+                cache.invalidate()
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        finally:
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+        count = 0
+        for fut, result in results:
+            for r in (result if isinstance(result, list) else (result,)):
+                self.stats["accepted" if r["status"] == "accepted" else "rejected"] += 1
+                count += 1
+            fut.set_result(result)
+        self.stats["batches"] += 1
+        self.stats["events"] += count
+        self.stats["max_batch"] = max(self.stats["max_batch"], count)
+
+    def _apply(self, conn, c, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate and write one event inside the batch transaction."""
+        is_valid, reason = self.validator.validate_event(event)
+        if not is_valid:
+            return {"status": "rejected", "reason": reason}
+        applied_at = int(time.time())
+        # a savepoint per event keeps one bad row from failing the whole batch
+        c.execute("SAVEPOINT ingest_event")
+        try:
+            insert_event(c, event, applied_at=applied_at)
+        except Exception as e:
+            c.execute("ROLLBACK TO ingest_event")
+            c.execute("RELEASE ingest_event")
+            logger.warning("Failed to store event %s: %s", event.get("id"), e)
+            return {"status": "rejected", "reason": f"storage error: {e}"}
+        c.execute("RELEASE ingest_event")
+        try:
+            self.validator.apply_event_consequences(event, db_conn=conn, commit=False, applied_at=applied_at)
+        except Exception:
+            # Non-fatal: log and continue
+            logger.exception("Failed to apply consequences for event %s", event.get("id"))
+        return {"status": "accepted", "id": event.get("id")}
@@ -0,0 +1,232 @@
+"""Compact tick storage, hourly rollups and incremental vacuum.
+
+The clock used to log a full `system_tick` row in `events` every tick
+(~17k rows a day). Those rows crowded `/world/events/recent`, the
+validator's recent-events window and the database file. Ticks now live in
+`world_ticks`: world time, wall time, and the last event id logged before
+the tick. The last of these places each tick in the event log for replay
+and `/world/state?as_of=`.
+
+`TickRetention` runs off the hot path and on each pass:
+
+1. moves legacy `system_tick` rows out of `events`
+2. folds raw ticks older than `CHRONICLE_TICK_KEEP_HOURS` into one
+   `tick_rollups` row per wall-clock hour
+3. releases free pages with `PRAGMA incremental_vacuum`. This only happens
+   if the database uses `auto_vacuum=INCREMENTAL`: new databases do, and
+   existing ones can be converted with
+   `scripts/compact_ticks.py --enable-auto-vacuum`.
+
+Point-in-time reads are exact per tick inside the window and per hour before it.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TICK_KEEP_HOURS = float(os.environ.get("CHRONICLE_TICK_KEEP_HOURS", "24"))
+TICK_RETENTION_INTERVAL_S = float(os.environ.get("CHRONICLE_TICK_RETENTION_INTERVAL_S", "600"))
+VACUUM_PAGES = int(os.environ.get("CHRONICLE_VACUUM_PAGES", "2048"))
+
+RETENTION_BATCH = 5000
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+def record_tick(cur, world_time: int, timestamp: Optional[float] = None, last_event_id: Optional[int] = None):
+    """Log a tick inside the caller's transaction.
+
+    `last_event_id` defaults to the newest event now; pass the value seen at
+    tick time when the write is deferred.
+    """
+    if last_event_id is None:
+        cur.execute("SELECT COALESCE(MAX(id), 0) FROM events")
+        last_event_id = cur.fetchone()[0]
+    cur.execute(
+        "INSERT OR REPLACE INTO world_ticks (world_time, timestamp, last_event_id) VALUES (?, ?, ?)",
+        (int(world_time), int(time.time() if timestamp is None else timestamp), last_event_id),
+    )
+
+
+def tick_position(conn, world_time: int) -> Optional[Tuple[int, int]]:
+    """`(last event id, world time)` of the state as of `world_time`.
+
+    The state as of T reflects every event logged before the first tick
+    past T. Inside a rolled-up hour only the hour's first tick is placed
+    exactly, so the returned world time may be earlier than asked. Returns
+    None when the clock has not passed `world_time` yet.
+    """
+    wt = int(world_time)
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT first_world_time, first_event_id FROM tick_rollups WHERE last_world_time > ?"
+        " ORDER BY hour_start LIMIT 1",
+        (wt,),
+    )
+    row = cur.fetchone()
+    if row is None:
+        cur.execute("SELECT world_time, last_event_id FROM world_ticks WHERE world_time > ? ORDER BY world_time LIMIT 1", (wt,))
+        row = cur.fetchone()
+    if row is None:
+        return None
+    first_after, last_event_id = row
+    return last_event_id, min(wt, first_after - 1)
+
+
+def tick_time_at(conn, until_event_id: Optional[int] = None) -> Optional[int]:
+    """Latest world time ticked before any event after `until_event_id` (latest overall if None)."""
+    cur = conn.cursor()
+    try:
+        for table, column in (("world_ticks", "world_time"), ("tick_rollups", "last_world_time")):
+            if until_event_id is None:
+                cur.execute(f"SELECT MAX({column}) FROM {table}")
+            else:
+                cur.execute(f"SELECT MAX({column}) FROM {table} WHERE last_event_id <= ?", (int(until_event_id),))
+            found = cur.fetchone()[0]
+            if found is not None:
+                return int(found)
+    except sqlite3.OperationalError:
+        # tick tables not migrated yet
+        pass
+    return None
+
+
+def migrate_legacy_ticks(conn, batch: int = RETENTION_BATCH) -> int:
+    """Move up to `batch` `system_tick` rows from `events` to `world_ticks`; returns rows removed."""
+    cur = conn.cursor()
+    cur.execute("SELECT id, timestamp, metadata FROM events WHERE type = 'system_tick' ORDER BY id LIMIT ?", (int(batch),))
+    rows = cur.fetchall()
+    if not rows:
+        return 0
+    ticks = []
+    for row_id, ts, metadata in rows:
+        try:
+            world_time = json.loads(metadata or "{}").get("world_time")
+        except (ValueError, AttributeError):
+            world_time = None
+        if world_time is not None:
+            ticks.append((int(world_time), int(ts or 0), row_id - 1))
+    try:
+        cur.executemany("INSERT OR IGNORE INTO world_ticks (world_time, timestamp, last_event_id) VALUES (?, ?, ?)", ticks)
+        cur.executemany("DELETE FROM events WHERE id = ?", ((r[0],) for r in rows))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return len(rows)
+
+
+def rollup_ticks(conn, keep_hours: float = TICK_KEEP_HOURS, now: Optional[float] = None) -> int:
+    """Fold raw ticks older than `keep_hours` into hourly rows; returns raw rows removed."""
+    now = time.time() if now is None else now
+    # whole hours only, so an hour is never split between raw and rolled-up rows
+    cutoff = int(now - keep_hours * 3600) // 3600 * 3600
+    cur = conn.cursor()
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        cur.execute(
+            """
+            INSERT INTO tick_rollups (hour_start, ticks, first_world_time, last_world_time, first_event_id, last_event_id)
+            SELECT timestamp / 3600 * 3600, COUNT(*), MIN(world_time), MAX(world_time), MIN(last_event_id), MAX(last_event_id)
+            FROM world_ticks WHERE timestamp < ? GROUP BY timestamp / 3600
+            ON CONFLICT(hour_start) DO UPDATE SET
+                ticks = ticks + excluded.ticks,
+                first_world_time = MIN(first_world_time, excluded.first_world_time),
+                last_world_time = MAX(last_world_time, excluded.last_world_time),
+                first_event_id = MIN(first_event_id, excluded.first_event_id),
+                last_event_id = MAX(last_event_id, excluded.last_event_id)
+            """,
+            (cutoff,),
+        )
+        cur.execute("DELETE FROM world_ticks WHERE timestamp < ?", (cutoff,))
+        removed = cur.rowcount or 0
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return removed
+
+
+def incremental_vacuum(conn, pages: int = VACUUM_PAGES) -> int:
+    """Return up to `pages` free pages to the filesystem; returns pages released."""
+    cur = conn.cursor()
+    cur.execute("PRAGMA auto_vacuum")
+    if cur.fetchone()[0] != AUTO_VACUUM_INCREMENTAL:
+        return 0
+    cur.execute("PRAGMA freelist_count")
+    before = cur.fetchone()[0]
+    # the pragma frees one page per step; executescript steps it to completion
+    conn.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+    cur.execute("PRAGMA freelist_count")
+    return before - cur.fetchone()[0]
+
+
+def enable_incremental_vacuum(conn):
+    """Switch an existing database to `auto_vacuum=INCREMENTAL` (rewrites the whole file)."""
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    conn.execute("VACUUM")
+
+
+class TickRetention:
+    """Background thread applying tick retention every `interval_s`."""
+
+    def __init__(self, conn_getter, keep_hours: float = TICK_KEEP_HOURS,
+                 interval_s: float = TICK_RETENTION_INTERVAL_S, vacuum_pages: int = VACUUM_PAGES):
+        self._conn_getter = conn_getter
+        self.keep_hours = max(0.0, float(keep_hours))
+        self.interval_s = max(0.01, float(interval_s))
+        self.vacuum_pages = max(0, int(vacuum_pages))
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"passes": 0, "errors": 0, "legacy_moved": 0, "rolled_up": 0, "pages_freed": 0}
+
+    def run_once(self, now: Optional[float] = None) -> Dict[str, int]:
+        conn = self._conn_getter()
+        try:
+            moved = 0
+            while True:
+                n = migrate_legacy_ticks(conn)
+                moved += n
+                if n < RETENTION_BATCH:
+                    break
+            rolled = rollup_ticks(conn, self.keep_hours, now)
+            freed = incremental_vacuum(conn, self.vacuum_pages) if self.vacuum_pages else 0
+        finally:
+            conn.close()
+        result = {"legacy_moved": moved, "rolled_up": rolled, "pages_freed": freed}
+        self.stats["passes"] += 1
+        for key, value in result.items():
+            self.stats[key] += value
+        if moved or rolled or freed:
+            logger.info("Tick retention: moved %d legacy tick rows, rolled up %d ticks, freed %d pages",
+                        moved, rolled, freed)
+        return result
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="TickRetention", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while True:
+            try:
+                self.run_once()
+            except Exception:
+                self.stats["errors"] += 1
+                logger.exception("Tick retention failed")
+            if self._stop.wait(self.interval_s):
+                break
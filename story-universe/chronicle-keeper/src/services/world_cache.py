@@ -0,0 +1,305 @@
+"""Resident canonical world state for the ContinuityValidator.
+
+The cache is loaded from the DB once and then kept current by row-level
+refreshes: whoever mutates a character, location or faction calls the
+matching `refresh_*` method with the connection it wrote on, so the cache
+re-reads only the touched rows. Every change bumps `version`. Call
+`reload()` after out-of-band writes (import scripts, manual SQL).
+"""
+import ast
+import json
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+RECENT_EVENTS_LIMIT = 100
+
+
+def _json_or(value, default):
+    try:
+        return json.loads(value) if value else default
+    except Exception:
+        return default
+
+
+class WorldStateCache:
+    def __init__(self, db_conn_getter: Callable[[], Any], fallback_state: Optional[Dict[str, Any]] = None):
+        self._db_conn_getter = db_conn_getter
+        self._fallback_state = fallback_state
+        self._lock = threading.RLock()
+        self._state: Optional[Dict[str, Any]] = None
+        self._using_fallback = False
+        self.version = 0
+        self.loads = 0
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    @property
+    def loaded(self) -> bool:
+        return self._state is not None
+
+    def get(self) -> Dict[str, Any]:
+        """Return the cached state, loading it on first use."""
+        state = self._state
+        if state is None:
+            with self._lock:
+                if self._state is None:
+                    self._install(self.load_from_db())
+                state = self._state
+        return state
+
+    def reload(self) -> Dict[str, Any]:
+        """Force a full reload from the DB."""
+        with self._lock:
+            self._install(self.load_from_db())
+            return self._state
+
+    def invalidate(self):
+        """Drop the cached state; the next `get()` reloads it."""
+        with self._lock:
+            self._state = None
+            self.version += 1
+
+    def _install(self, state: Dict[str, Any]):
+        self._using_fallback = not state.get("characters")
+        if self._using_fallback:
+            # If DB has no characters/locations (test DB), fall back to provided world_state or a minimal default
+            if self._fallback_state:
+                state = self._fallback_state
+            else:
+                # minimal default to keep legacy behavior/tests working
+                state = {"characters": {"1": {"name": "Alice", "status": "alive"}}, "locations": {"100": {"name": "Town"}}, "factions": {}, "recent_events": []}
+        self._state = state
+        self.version += 1
+        self.loads += 1
+
+    def _conn(self, conn=None):
+        return conn if conn is not None else self._db_conn_getter()
+
+    def load_from_db(self, conn=None) -> Dict[str, Any]:
+        """Read canonical state from the SQLite DB (full scan)."""
+        state = {"characters": {}, "locations": {}, "factions": {}, "recent_events": []}
+        try:
+            conn = self._conn(conn)
+            c = conn.cursor()
+        except Exception:
+            # If DB access fails, return minimal empty state
+            return state
+
+        # load characters
+        try:
+            c.execute('SELECT id, name, status, traits, location_id FROM characters')
+            for r in c.fetchall():
+                state["characters"][str(r[0])] = self._character_from_row(r)
+        except Exception:
+            pass
+
+        # load locations
+        try:
+            c.execute('SELECT id, name, description, forbidden, locked, political_status, metadata FROM locations')
+            for r in c.fetchall():
+                state["locations"][str(r[0])] = self._location_from_row(r)
+        except Exception:
+            pass
+
+        # load factions (+ metrics, explicit relationship rows and cooldowns)
+        try:
+            c.execute('SELECT id, name, ideology, relationships, personality_traits FROM factions')
+            for r in c.fetchall():
+                state["factions"][str(r[0])] = self._faction_from_row(r)
+        except Exception:
+            pass
+        factions = state["factions"]
+        try:
+            c.execute('SELECT faction_id, trust, power, resources, influence FROM faction_metrics')
+            for fr in c.fetchall():
+                self._faction_entry(factions, fr[0])["metrics"] = self._metrics_from_row(fr)
+        except Exception:
+            # If faction_metrics table missing, leave default metrics empty
+            pass
+        try:
+            c.execute('SELECT source_faction_id, target_faction_id, relationship_type, strength, cooldown_until FROM faction_relationships')
+            for rr in c.fetchall():
+                self._faction_entry(factions, rr[0])["outgoing_relationships"][str(rr[1])] = self._relationship_from_row(rr[2:])
+        except Exception:
+            pass
+        try:
+            c.execute('SELECT faction_id, cooldown_key, until_ts FROM faction_cooldowns')
+            for cr in c.fetchall():
+                self._faction_entry(factions, cr[0])["cooldowns"][cr[1]] = int(cr[2])
+        except Exception:
+            pass
+
+        # load recent events (limit 100)
+        try:
+            try:
+                c.execute('SELECT COALESCE(canonical_id, id), timestamp, type, description, involved_characters, involved_locations, metadata FROM events ORDER BY timestamp DESC LIMIT ?', (RECENT_EVENTS_LIMIT,))
+            except Exception:
+                # events table predates the canonical_id migration
+                c.execute('SELECT id, timestamp, type, description, involved_characters, involved_locations, metadata FROM events ORDER BY timestamp DESC LIMIT ?', (RECENT_EVENTS_LIMIT,))
+            for r in c.fetchall():
+                e = {"id": r[0], "timestamp": r[1]}
+                # try to parse involved_characters if present
+                try:
+                    e["involved_characters"] = ast.literal_eval(r[4]) if r[4] else []
+                except Exception:
+                    e["involved_characters"] = []
+                try:
+                    e["involved_locations"] = ast.literal_eval(r[5]) if r[5] else []
+                except Exception:
+                    e["involved_locations"] = []
+                state["recent_events"].append(e)
+        except Exception:
+            pass
+        return state
+
+    # ------------------------------------------------------------------
+    # Row -> cache entry helpers (shared by full load and row refresh)
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _character_from_row(r) -> Dict[str, Any]:
+        return {"name": r[1], "status": r[2], "traits": _json_or(r[3], []), "location_id": r[4]}
+
+    @staticmethod
+    def _location_from_row(r) -> Dict[str, Any]:
+        return {"name": r[1], "description": r[2], "forbidden": bool(r[3]), "locked": bool(r[4]), "political_status": r[5]}
+
+    @staticmethod
+    def _faction_from_row(r) -> Dict[str, Any]:
+        try:
+            rels = json.loads(r[3]) if r[3] else {}
+            ptraits = json.loads(r[4]) if len(r) > 4 and r[4] else {}
+        except Exception:
+            rels = {}
+            ptraits = {}
+        return {"name": r[1], "ideology": r[2], "relationships": rels, "personality_traits": ptraits,
+                "metrics": {}, "outgoing_relationships": {}, "cooldowns": {}}
+
+    @staticmethod
+    def _metrics_from_row(fr) -> Dict[str, Any]:
+        return {"trust": float(fr[1]) if fr[1] is not None else 0.5, "power": int(fr[2] or 0), "resources": int(fr[3] or 0), "influence": int(fr[4] or 0)}
+
+    @staticmethod
+    def _relationship_from_row(rr) -> Dict[str, Any]:
+        return {"relationship_type": rr[0], "strength": float(rr[1] or 0.0), "cooldown_until": int(rr[2] or 0)}
+
+    @staticmethod
+    def _faction_entry(factions: Dict[str, Any], fid) -> Dict[str, Any]:
+        entry = factions.get(str(fid))
+        if entry is None:
+            entry = {"name": None, "ideology": None, "relationships": {}, "metrics": {}}
+            factions[str(fid)] = entry
+        entry.setdefault("outgoing_relationships", {})
+        entry.setdefault("cooldowns", {})
+        return entry
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+    def _mutable_state(self) -> Optional[Dict[str, Any]]:
+        """State to patch in place, or None when a patch is unnecessary."""
+        if self._state is None:
+            # not loaded yet: the first get() will read current rows anyway
+            return None
+        if self._using_fallback:
+            # a real row replaces the synthetic fallback world; reload lazily
+            self._state = None
+            self.version += 1
+            return None
+        return self._state
+
+    def refresh_character(self, character_id, conn=None):
+        with self._lock:
+            state = self._mutable_state()
+            if state is None:
+                return
+            c = self._conn(conn).cursor()
+            c.execute('SELECT id, name, status, traits, location_id FROM characters WHERE id = ?', (character_id,))
+            r = c.fetchone()
+            if r:
+                state["characters"][str(character_id)] = self._character_from_row(r)
+            else:
+                state["characters"].pop(str(character_id), None)
+            self.version += 1
+
+    def refresh_location(self, location_id, conn=None):
+        with self._lock:
+            state = self._mutable_state()
+            if state is None:
+                return
+            c = self._conn(conn).cursor()
+            c.execute('SELECT id, name, description, forbidden, locked, political_status, metadata FROM locations WHERE id = ?', (location_id,))
+            r = c.fetchone()
+            if r:
+                state["locations"][str(location_id)] = self._location_from_row(r)
+            else:
+                state["locations"].pop(str(location_id), None)
+            self.version += 1
+
+    def refresh_faction(self, faction_id, conn=None):
+        """Re-read one faction with its metrics, outgoing relationship rows and cooldowns."""
+        if faction_id is None:
+            return
+        with self._lock:
+            state = self._mutable_state()
+            if state is None:
+                return
+            factions = state.setdefault("factions", {})
+            fid = str(faction_id)
+            c = self._conn(conn).cursor()
+            entry = None
+            try:
+                c.execute('SELECT id, name, ideology, relationships, personality_traits FROM factions WHERE id = ?', (faction_id,))
+                r = c.fetchone()
+                if r:
+                    entry = self._faction_from_row(r)
+            except Exception:
+                pass
+            try:
+                c.execute('SELECT faction_id, trust, power, resources, influence FROM faction_metrics WHERE faction_id = ?', (faction_id,))
+                fr = c.fetchone()
+                if fr:
+                    if entry is None:
+                        entry = self._faction_entry({}, fid)
+                    entry["metrics"] = self._metrics_from_row(fr)
+            except Exception:
+                pass
+            try:
+                c.execute('SELECT target_faction_id, relationship_type, strength, cooldown_until FROM faction_relationships WHERE source_faction_id = ?', (faction_id,))
+                rows = c.fetchall()
+                if rows and entry is None:
+                    entry = self._faction_entry({}, fid)
+                for rr in rows:
+                    entry["outgoing_relationships"][str(rr[0])] = self._relationship_from_row(rr[1:])
+            except Exception:
+                pass
+            try:
+                c.execute('SELECT cooldown_key, until_ts FROM faction_cooldowns WHERE faction_id = ?', (faction_id,))
+                rows = c.fetchall()
+                if rows and entry is None:
+                    entry = self._faction_entry({}, fid)
+                for cr in rows:
+                    entry["cooldowns"][cr[0]] = int(cr[1])
+            except Exception:
+                pass
+            if entry is None:
+                factions.pop(fid, None)
+            else:
+                factions[fid] = entry
+            self.version += 1
+
+    def record_event(self, event: Dict[str, Any]):
+        """Add an accepted event to the recent-events window (newest first)."""
+        with self._lock:
+            state = self._state
+            if state is None or self._using_fallback:
+                return
+            recent: List[Dict[str, Any]] = state.setdefault("recent_events", [])
+            recent.insert(0, {
+                "id": event.get("id"),
+                "timestamp": event.get("timestamp"),
+                "involved_characters": list(event.get("involved_characters") or []),
+                "involved_locations": list(event.get("involved_locations") or []),
+            })
+            del recent[RECENT_EVENTS_LIMIT:]
+            self.version += 1
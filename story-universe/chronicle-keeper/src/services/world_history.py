@@ -0,0 +1,107 @@
+"""Point-in-time world state ("as of world time T").
+
+World time advances with clock ticks, and every tick records the last
+event logged before it (`tick_retention.tick_position`). The state as of T
+therefore reflects every event logged before the first tick past T.
+`WorldHistory` materializes that state in a private in-memory SQLite
+database:
+
+1. restore the newest snapshot at or before that event
+2. replay the bounded tail with `event_store.rebuild`
+3. serialize it with the same builder as `/world/state`
+
+Results are kept in an LRU cache keyed by `(snapshot id, last event id,
+world time)`.
+History before the newest snapshot never changes, so cached entries stay
+valid. Repeated queries for nearby times are served from memory.
+"""
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.services.event_store import SNAPSHOT_TABLES, find_snapshot, rebuild
+from src.services.tick_retention import tick_position
+from src.services.world_state import build_world_state, serialize_state
+
+logger = logging.getLogger(__name__)
+
+AS_OF_CACHE_SIZE = int(os.environ.get("CHRONICLE_AS_OF_CACHE_SIZE", "32"))
+
+
+class HistoryUnavailable(LookupError):
+    """No snapshot is old enough to reconstruct the requested time."""
+
+
+class WorldHistory:
+    def __init__(self, conn_getter, cache_size: int = AS_OF_CACHE_SIZE):
+        self._conn_getter = conn_getter
+        self.cache_size = max(1, int(cache_size))
+        self._cache: "OrderedDict[Tuple[int, int, int], Tuple[Dict[str, Any], bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._schema: Optional[List[str]] = None
+        self.stats = {"hits": 0, "misses": 0, "replayed": 0}
+
+    def state_as_of(self, world_time: int) -> Optional[Tuple[Dict[str, Any], bytes]]:
+        """Return `(info, body)` for world time `world_time`.
+
+        Returns None when no tick has passed `world_time` yet (the live state
+        is the answer). Raises `HistoryUnavailable` when no snapshot covers it.
+        """
+        conn = self._conn_getter()
+        try:
+            position = tick_position(conn, world_time)
+            if position is None:
+                return None
+            cutoff, effective_time = position
+            snap = find_snapshot(conn, cutoff)
+            if snap is None:
+                raise HistoryUnavailable(f"no snapshot covers world time {world_time}")
+            key = (snap[0], cutoff, effective_time)
+            with self._lock:
+                hit = self._cache.get(key)
+                if hit is not None:
+                    self._cache.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return hit
+            info, body = self._materialize(conn, cutoff, effective_time)
+        finally:
+            conn.close()
+        with self._lock:
+            self.stats["misses"] += 1
+            self.stats["replayed"] += info["replayed"]
+            self._cache[key] = (info, body)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return info, body
+
+    def _table_schema(self, conn) -> List[str]:
+        if self._schema is None:
+            names = ", ".join("?" * len(SNAPSHOT_TABLES))
+            cur = conn.cursor()
+            cur.execute(f"SELECT sql FROM sqlite_master WHERE type = 'table' AND name IN ({names})", SNAPSHOT_TABLES)
+            self._schema = [r[0] for r in cur.fetchall() if r[0]]
+        return self._schema
+
+    def _materialize(self, conn, cutoff: int, world_time: int) -> Tuple[Dict[str, Any], bytes]:
+        target = sqlite3.connect(":memory:")
+        try:
+            for ddl in self._table_schema(conn):
+                target.execute(ddl)
+            stats = rebuild(conn, target, until_event_id=cutoff, world_time=world_time)
+            state = build_world_state(target)
+        except LookupError as e:
+            raise HistoryUnavailable(str(e))
+        finally:
+            target.close()
+        info = {"event_id": cutoff, "world_time": world_time, "snapshot_id": stats["snapshot_id"],
+                "replayed": stats["applied"]}
+        return info, serialize_state(state)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.stats, cached=len(self._cache), cache_size=self.cache_size)
+
@@ -0,0 +1,277 @@
+"""Versioned, pre-serialized snapshot behind `GET /world/state`.
+
+The snapshot is rebuilt only after a commit changed world state. Detection
+uses SQLite's `PRAGMA data_version` on a dedicated connection: the value
+changes whenever any other connection commits, including the ingest
+writer, the CRUD endpoints, the clock and out-of-process scripts. After a
+change the poll also reads `state_generation`, which triggers on the state
+tables bump (see `src.db.migrations`). If that did not move, the commit
+only touched other tables (the event log, tick log, the clock's own
+`system_state` keys) and the cached snapshot stands. An unchanged poll is
+one pragma plus a lock, and it returns the cached JSON bytes.
+
+World time is not part of the versioned snapshot: the clock rewrites it
+every tick, which would bump the version (and miss every `If-None-Match`)
+once per tick. It is served by `/world/clock` and the `X-World-Time`
+header instead.
+
+A rebuild that actually differs from the previous snapshot bumps `version`.
+The version is seeded from the boot time in milliseconds, so it keeps
+increasing across restarts, and it doubles as the HTTP `ETag`.
+
+Each bump also records the entity-level delta between the two snapshots
+(see `diff_states`) in a bounded history, which backs
+`GET /world/state/changes?since=`. A client whose version is older than
+the retained history, or from before a restart, must re-fetch the
+snapshot (`ResyncRequired`).
+"""
+import json
+import logging
+import sqlite3
+import threading
+import os
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from src.db.migrations import CLOCK_STATE_KEYS
+from src.db.queries import add_faction_runtime_state, get_world_state
+
+logger = logging.getLogger(__name__)
+
+WORLD_CHANGES_HISTORY = int(os.environ.get("CHRONICLE_WORLD_CHANGES_HISTORY", "1000"))
+
+# nested faction keys that are published as entities of their own
+_FACTION_RUNTIME_KEYS = ("metrics", "outgoing_relationships", "cooldowns")
+_MISSING = object()
+
+
+class ResyncRequired(Exception):
+    """The requested version is no longer (or not yet) covered by the change history."""
+
+    def __init__(self, since: int, version: int):
+        super().__init__(f"version {since} is outside the change history; re-fetch /world/state")
+        self.since = since
+        self.version = version
+
+
+def build_world_state(conn) -> Dict[str, Any]:
+    state = get_world_state(conn)
+    add_faction_runtime_state(conn, state)
+    return state
+
+
+def build_live_state(conn) -> Dict[str, Any]:
+    """`build_world_state` minus the clock's keys: the versioned `/world/state` body."""
+    state = build_world_state(conn)
+    state["system"] = {k: v for k, v in (state.get("system") or {}).items() if k not in CLOCK_STATE_KEYS}
+    return state
+
+
+def serialize_state(state: Dict[str, Any]) -> bytes:
+    # same encoding as FastAPI's JSONResponse so cached bodies match
+    return json.dumps(state, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def flatten_state(state: Dict[str, Any]) -> Dict[Tuple[str, str], Any]:
+    """Split a snapshot into `(entity, id) -> value` pairs, the unit of change."""
+    flat: Dict[Tuple[str, str], Any] = {}
+    for kind in ("characters", "locations", "character_state", "system"):
+        for key, value in (state.get(kind) or {}).items():
+            flat[(kind, str(key))] = value
+    for fid, faction in (state.get("factions") or {}).items():
+        fid = str(fid)
+        flat[("factions", fid)] = {k: v for k, v in faction.items() if k not in _FACTION_RUNTIME_KEYS}
+        if "metrics" in faction:
+            flat[("faction_metrics", fid)] = faction["metrics"]
+        for tgt, rel in (faction.get("outgoing_relationships") or {}).items():
+            flat[("faction_relationships", f"{fid}:{tgt}")] = rel
+        for key, until in (faction.get("cooldowns") or {}).items():
+            flat[("faction_cooldowns", f"{fid}:{key}")] = until
+    return flat
+
+
+def diff_states(old: Dict[str, Any], new: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Entity-level upserts and deletes that turn `old` into `new`."""
+    before = flatten_state(old)
+    after = flatten_state(new)
+    changes = []
+    for key, value in after.items():
+        if before.get(key, _MISSING) != value:
+            changes.append({"op": "upsert", "entity": key[0], "id": key[1], "data": value})
+    for key in before:
+        if key not in after:
+            changes.append({"op": "delete", "entity": key[0], "id": key[1]})
+    return changes
+
+
+def apply_changes(state: Dict[str, Any], changes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Apply `diff_states` output to a local replica of the snapshot, in place."""
+    for ch in changes:
+        entity, key, upsert = ch["entity"], ch["id"], ch["op"] == "upsert"
+        if entity in ("characters", "locations", "character_state", "system"):
+            bucket = state.setdefault(entity, {})
+            if upsert:
+                bucket[key] = ch["data"]
+            else:
+                bucket.pop(key, None)
+            continue
+        factions = state.setdefault("factions", {})
+        if entity == "factions":
+            if upsert:
+                runtime = {k: v for k, v in factions.get(key, {}).items() if k in _FACTION_RUNTIME_KEYS}
+                factions[key] = dict(ch["data"], **runtime)
+            else:
+                factions.pop(key, None)
+        elif entity == "faction_metrics":
+            if upsert:
+                factions.setdefault(key, {})["metrics"] = ch["data"]
+            elif key in factions:
+                factions[key].pop("metrics", None)
+        else:
+            fid, sub = key.split(":", 1)
+            field = "outgoing_relationships" if entity == "faction_relationships" else "cooldowns"
+            if upsert:
+                factions.setdefault(fid, {}).setdefault(field, {})[sub] = ch["data"]
+            elif field in factions.get(fid, {}):
+                factions[fid][field].pop(sub, None)
+    return state
+
+
+class WorldStateView:
+    def __init__(self, conn_factory: Callable[[], Any], builder: Callable[[Any], Dict[str, Any]] = build_live_state,
+                 history: int = WORLD_CHANGES_HISTORY):
+        self._conn_factory = conn_factory
+        self._builder = builder
+        self._lock = threading.Lock()
+        self._conn = None
+        self._data_version: Optional[int] = None
+        self._generation: Any = _MISSING
+        self._dirty = True
+        self._state: Optional[Dict[str, Any]] = None
+        self._body: Optional[bytes] = None
+        self.version = int(time.time() * 1000)
+        # (version, changes) per bump; `_history_floor` is the oldest `since` we can serve
+        self._history: Deque[Tuple[int, List[Dict[str, Any]]]] = deque(maxlen=max(1, int(history)))
+        self._history_floor = self.version
+        self.stats = {"hits": 0, "rebuilds": 0, "bumps": 0, "unrelated_commits": 0}
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.version}"'
+
+    def mark_dirty(self):
+        """Force a rebuild on the next read (for changes that never reach the DB)."""
+        self._dirty = True
+
+    def current(self) -> Tuple[int, bytes]:
+        """Return `(version, body)`, rebuilding only if the DB changed."""
+        with self._lock:
+            if self._poll() or self._body is None:
+                self._rebuild()
+            else:
+                self.stats["hits"] += 1
+            return self.version, self._body
+
+    def snapshot(self) -> Tuple[int, Dict[str, Any]]:
+        """Like `current()` but returns the decoded state; treat it as read-only."""
+        with self._lock:
+            if self._poll() or self._state is None:
+                self._rebuild()
+            return self.version, self._state
+
+    def changes_since(self, since: int) -> Tuple[int, List[Dict[str, Any]]]:
+        """Return `(version, changes)` for every bump after `since`, oldest first.
+
+        Raises `ResyncRequired` when `since` predates the retained history or
+        is ahead of the current version (e.g. held across a restart).
+        """
+        with self._lock:
+            if self._poll() or self._state is None:
+                self._rebuild()
+            if since > self.version or since < self._history_floor:
+                raise ResyncRequired(since, self.version)
+            out = []
+            for version, changes in self._history:
+                if version > since:
+                    out.extend(dict(ch, version=version) for ch in changes)
+            return self.version, out
+
+    def close(self):
+        with self._lock:
+            self._close_conn()
+
+    # ------------------------------------------------------------------
+    # Internals (caller holds the lock)
+    # ------------------------------------------------------------------
+    def _close_conn(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+        self._conn = None
+        self._data_version = None
+        self._generation = _MISSING
+
+    def _read_generation(self) -> Optional[int]:
+        try:
+            row = self._conn.execute("SELECT generation FROM state_generation WHERE id = 0").fetchone()
+        except sqlite3.OperationalError:
+            # not migrated: every commit counts as a state change
+            return None
+        return row[0] if row else None
+
+    def _poll(self) -> bool:
+        changed = self._dirty
+        self._dirty = False
+        for _ in range(2):
+            try:
+                if self._conn is None:
+                    self._conn = self._conn_factory()
+                dv = self._conn.execute("PRAGMA data_version").fetchone()[0]
+                break
+            except sqlite3.Error:
+                # closed under us (pool shutdown, test teardown): reopen once
+                self._close_conn()
+                changed = True
+        else:
+            return True
+        if dv != self._data_version:
+            self._data_version = dv
+            generation = self._read_generation()
+            if generation is None or generation != self._generation:
+                self._generation = generation
+                changed = True
+            else:
+                self.stats["unrelated_commits"] += 1
+        return changed
+
+    def _rebuild(self):
+        if self._conn is None:
+            self._conn = self._conn_factory()
+        conn = self._conn
+        # one read transaction so every table comes from the same commit
+        try:
+            conn.execute("BEGIN")
+            try:
+                state = self._builder(conn)
+            finally:
+                conn.rollback()
+        except sqlite3.Error:
+            logger.exception("Failed to rebuild world state")
+            self._close_conn()
+            if self._body is not None:
+                return
+            raise
+        self.stats["rebuilds"] += 1
+        if self._state is None:
+            self._history_floor = self.version
+        elif state != self._state:
+            self.version += 1
+            self.stats["bumps"] += 1
+            if len(self._history) == self._history.maxlen:
+                self._history_floor = self._history[0][0]
+            self._history.append((self.version, diff_states(self._state, state)))
+        self._state = state
+        self._body = serialize_state(state)
@@ -0,0 +1,38 @@
+"""Shim for the shared wire codecs.
+Re-exports shared.wire, putting the story-universe root on sys.path when
+the service is run from its own directory.
+"""
+import sys
+from pathlib import Path
+
+# `shared/` sits at the story-universe root next to this service, or in the
+# service root itself when the container image copies it in
+for _base in Path(__file__).resolve().parents[1:3]:
+    if (_base / "shared" / "wire.py").is_file():
+        if str(_base) not in sys.path:
+            sys.path.insert(0, str(_base))
+        break
+
+from shared.wire import (
+    JSON,
+    MSGPACK,
+    UnsupportedContentType,
+    Codec,
+    JSON_CODEC,
+    CODECS,
+    MSGPACK_CODEC,
+    register_codec,
+    available_codecs,
+    get_codec,
+    Encoded,
+    encode_body,
+    decode_body,
+    encode_frames,
+    decode_sequenced,
+    decode_frames,
+    recv_message,
+    recv_sequenced,
+    SequenceTracker,
+    fetch_range,
+    GapFiller,
+)
@@ -1,9 +1,18 @@
 import sys
 import os
+import sqlite3
 from pathlib import Path
 
+import pytest
+
 # Prevent background clock from starting during tests which can hang the test runner.
 os.environ.setdefault("CHRONICLE_DISABLE_CLOCK", "1")
+# Point every module at the throwaway test DB before `src.db.database` is first
+# imported, so no test opens (and converts to WAL) the checked-in universe.db.
+os.environ.setdefault(
+    "CHRONICLE_KEEPER_DB_PATH",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'test_chronicle.db')),
+)
 
 # Ensure local `src` packages are importable for tests.
 # This file is placed in chronicle-keeper/tests; we add:
@@ -27,6 +36,65 @@ for base in possible_roots:
         if p not in sys.path:
             sys.path.insert(0, p)
 
+# the story-universe root holds `shared/` (wire codecs, ids, config); it must
+# win over the repo-level `shared` package when pytest runs from the repo root
+if str(CHRON_ROOT.parent) not in sys.path:
+    sys.path.insert(0, str(CHRON_ROOT.parent))
+
 # also add the chronicle-keeper root so its `src` package is importable
 if str(CHRON_ROOT) not in sys.path:
     sys.path.insert(0, str(CHRON_ROOT))
+
+
+SCHEMA_PATH = CHRON_ROOT / 'src' / 'db' / 'schema.sql'
+
+# one character in one location; most DB-backed tests need nothing more
+DEFAULT_SEED = [
+    ('INSERT INTO characters (id, name, age, traits, location_id, status) VALUES (1, ?, 30, ?, 100, ?)', ('Tester', '[]', 'alive')),
+    ('INSERT INTO locations (id, name) VALUES (100, ?)', ('Town',)),
+]
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers',
+        'test_db(name="test.db", schema=True, migrate=True, seed=DEFAULT_SEED, extra=()): '
+        'how the `db_path` fixture builds its database',
+    )
+
+
+def build_test_db(path, schema=True, migrate=True, seed=None, extra=()):
+    """Create a file database for a test.
+
+    Always has the `events`/`system_state` tables; `schema` adds
+    `src/db/schema.sql`, `migrate` runs `apply_migrations`, and `seed` (rows
+    as `(sql, params)`, default `DEFAULT_SEED`) plus `extra` are inserted.
+    """
+    from src.db.migrations import apply_migrations
+    from src.db.test_db_setup import setup_test_db
+
+    setup_test_db(path)
+    conn = sqlite3.connect(path)
+    try:
+        if schema:
+            conn.executescript(SCHEMA_PATH.read_text(encoding='utf-8'))
+        if migrate:
+            apply_migrations(conn)
+        for sql, params in list(DEFAULT_SEED if seed is None else seed) + list(extra):
+            conn.execute(sql, params)
+        conn.commit()
+    finally:
+        conn.close()
+    return path
+
+
+@pytest.fixture
+def db_path(request, tmp_path):
+    """Path of a fresh test database; configure it with `@pytest.mark.test_db(...)`."""
+    from src.db.database import close_all_connections
+
+    marker = request.node.get_closest_marker('test_db')
+    options = dict(marker.kwargs) if marker else {}
+    path = build_test_db(str(tmp_path / options.pop('name', 'test.db')), **options)
+    yield path
+    close_all_connections(path)
@@ -1,8 +1,18 @@
 import os
+import sqlite3
+import threading
 import time
 from datetime import datetime
 
-from src.services.clock import WorldClock
+import pytest
+
+from src.db.database import get_pool
+from src.db.queries import get_world_state
+from src.services import clock
+from src.services.clock import AdaptivePacer, TickSchedule, WorldClock
+from src.services.world_state import WorldStateView
+
+pytestmark = pytest.mark.test_db(name='clock.db', schema=False, seed=[])
 
 
 def test_clock_no_start_when_disabled(monkeypatch, tmp_path):
@@ -22,3 +32,226 @@ def test_clock_write_metadata(tmp_path):
     # if WorldClock writes to a file, check for existence; otherwise ensure no exception
     # This test primarily ensures _write_tick doesn't raise on typical input
     assert True
+
+
+class _RecordingPublisher:
+    """Stands in for the ZMQ publisher; notes what the DB held at publish time."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.published = []
+
+    def publish_tick(self, tick_data, max_retries=2):
+        conn = sqlite3.connect(self.db_path)
+        logged = conn.execute('SELECT MAX(world_time) FROM world_ticks').fetchone()[0]
+        conn.close()
+        self.published.append((tick_data['world_time'], logged))
+        return True
+
+    def get_stats(self):
+        return {}
+
+    def close(self):
+        pass
+
+
+def _clock(db_path, **kwargs):
+    return WorldClock(tick_interval=0.01, db_path=db_path, publisher=_RecordingPublisher(db_path), **kwargs)
+
+
+def _system_state(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = dict(conn.execute('SELECT key, value FROM system_state').fetchall())
+    conn.close()
+    return rows
+
+
+def test_ticks_publish_before_write_behind_persistence(db_path):
+    wc = _clock(db_path, checkpoint_ticks=3)
+    assert wc._process_tick() and wc._process_tick()
+    # published from memory; nothing logged yet
+    assert wc.publisher.published == [(1, None), (2, None)]
+    assert wc.metrics['inline_flushes'] == 1  # the first tick leases time
+    assert wc.flush() == 2
+    assert _system_state(db_path) == {'time': '2', 'time_lease': '5'}
+    conn = sqlite3.connect(db_path)
+    assert conn.execute('SELECT world_time FROM world_ticks ORDER BY world_time').fetchall() == [(1,), (2,)]
+    conn.close()
+
+
+def test_lease_stays_out_of_world_state(db_path):
+    view = WorldStateView(lambda: get_pool(db_path).open_dedicated())
+    version, _ = view.current()
+    wc = _clock(db_path, checkpoint_ticks=3)
+    wc._process_tick()
+    wc.flush()
+    conn = sqlite3.connect(db_path)
+    assert get_world_state(conn)['system'] == {'time': '1'}
+    conn.close()
+    # the live snapshot also leaves out `time`, so a flush does not re-version it
+    assert view.current()[0] == version
+    view.close()
+
+
+def test_restart_after_crash_never_repeats_published_time(db_path):
+    wc = _clock(db_path, checkpoint_ticks=3)
+    for _ in range(5):
+        wc._process_tick()
+    # tick 4 ran past the lease from tick 1 and renewed it inline
+    assert wc.metrics['inline_flushes'] == 2
+    assert [t for t, _ in wc.publisher.published] == [1, 2, 3, 4, 5]
+    # crash: tick 5 is only in memory
+    assert _system_state(db_path)['time_lease'] == '6'
+
+    restarted = _clock(db_path, checkpoint_ticks=3)
+    restarted._process_tick()
+    assert restarted.publisher.published[0][0] == 7
+
+
+def test_clean_stop_resumes_exactly_and_reports_jitter(db_path):
+    wc = _clock(db_path, checkpoint_ticks=3)
+    wc.start()
+    time.sleep(0.1)
+    wc.stop()
+    status = wc.get_status()
+    ticked = status['world_time']
+    assert ticked >= 2 and status['ticks_pending'] == 0
+    assert _system_state(db_path) == {'time': str(ticked), 'time_lease': str(ticked)}
+    assert status['jitter']['samples'] >= 2 and status['jitter']['max_ms'] >= 0
+
+    restarted = _clock(db_path)
+    restarted._process_tick()
+    assert restarted.publisher.published[0][0] == ticked + 1
+
+
+def test_default_publisher_binds_on_start_only(monkeypatch, db_path):
+    made = []
+
+    def publisher():
+        made.append(_RecordingPublisher(db_path))
+        return made[-1]
+
+    monkeypatch.setattr(clock, 'TickPublisher', publisher)
+    wc = WorldClock(tick_interval=0.01, db_path=db_path)
+    # constructing a clock (as importing the module does) binds no ports
+    assert wc.publisher is None and not made
+    assert wc.get_status()['publisher_status'] == {}
+    wc.start()
+    try:
+        assert not wc.start()
+    finally:
+        wc.stop()
+    assert made == [wc.publisher]
+
+
+def test_schedule_stays_on_the_deadline_grid():
+    sched = TickSchedule(1.0, 'skip', start=100.0)
+    assert sched.due(99.9) == (0, 0.0)
+    assert sched.due(100.2)[0] == 1
+    # sleeping late never shifts later deadlines
+    assert sched.next_deadline == 101.0
+    assert sched.due(101.3)[0] == 1 and sched.next_deadline == 102.0
+
+
+@pytest.mark.parametrize('policy,expected_steps,expected_stats', [
+    ('skip', [1], {'skipped': 3}),
+    ('coalesce', [4], {'coalesced': 3}),
+    ('burst', [1, 1, 1], {'skipped': 1, 'burst': 2}),
+])
+def test_catch_up_policies(policy, expected_steps, expected_stats):
+    sched = TickSchedule(1.0, policy, max_burst=2, start=0.0)
+    steps = []
+    # a 3.5s stall: deadlines 0, 1, 2 and 3 have all passed
+    while True:
+        n, _ = sched.due(3.5)
+        if not n:
+            break
+        steps.append(n)
+    assert steps == expected_steps
+    assert sched.next_deadline == 4.0
+    for key, value in expected_stats.items():
+        assert sched.stats[key] == value
+    with pytest.raises(ValueError):
+        TickSchedule(1.0, 'rewind')
+
+
+def test_accelerated_mode_waits_for_downstream(db_path):
+    publisher = _RecordingPublisher(db_path)
+    backlog = iter([500, 500] + [0] * 1000)
+    publisher.backlog = lambda: next(backlog)
+    wc = WorldClock(tick_interval=5.0, db_path=db_path, publisher=publisher, checkpoint_ticks=10)
+    stats = wc.run_accelerated(40, max_backlog=100)
+    assert stats['ticks'] == 40 and stats['stalls'] == 2
+    assert [t for t, _ in publisher.published] == list(range(1, 41))
+    assert _system_state(db_path)['time'] == '40'
+    assert wc.metrics['mode'] == 'realtime'
+
+
+def test_accelerated_mode_keeps_pace_with_a_throttled_consumer(db_path):
+    publisher = _RecordingPublisher(db_path)
+    wc = WorldClock(tick_interval=5.0, db_path=db_path, publisher=publisher, checkpoint_ticks=1000)
+    stop = threading.Event()
+
+    def consumer():
+        # keeps up with every tick but acks only every 200 ms, like the engine's throttle
+        while not stop.wait(0.2):
+            if publisher.published:
+                wc.ack('engine', publisher.published[-1][0])
+
+    wc.ack('engine', 0)
+    acker = threading.Thread(target=consumer, daemon=True)
+    acker.start()
+    try:
+        stats = wc.run_accelerated(300)
+    finally:
+        stop.set()
+        acker.join()
+    # ticks published between acks do not count as lag
+    assert stats['ticks'] == 300 and stats['seconds'] < 5
+
+
+def test_pacer_stretches_interval_while_consumers_lag():
+    pacer = AdaptivePacer(1.0, min_interval=0.5, max_interval=3.0, lag_target=2, ack_ttl=10)
+    assert pacer.update(5, now=0) == 1.0  # nobody acks: nominal pace
+    pacer.ack('engine', 1, now=0)
+    pacer.ack('logger', 5, now=0)
+    assert pacer.lag(5, now=1) == 4  # the slowest live consumer sets the lag
+    assert pacer.update(5, now=1) == 1.5
+    assert pacer.update(6, now=2) == 2.25
+    assert pacer.update(7, now=3) == 3.0  # capped
+    pacer.ack('engine', 6, now=4)
+    pacer.ack('engine', 2, now=4)  # late duplicate: watermark stays
+    assert pacer.update(7, now=4) == 2.7
+    # consumers that stop acking no longer hold the clock back
+    assert pacer.lag(7, now=20) is None and pacer.update(7, now=20) == 1.0
+    assert pacer.stats['slowdowns'] == 3 and pacer.stats['acks'] == 4
+
+
+def test_ack_lag_is_measured_when_the_consumer_acks():
+    pacer = AdaptivePacer(1.0, lag_target=2, ack_ttl=10)
+    assert pacer.ack_lag(now=0) is None
+    pacer.ack('engine', 5, now=0)  # no clock time known yet
+    assert pacer.ack_lag(now=0) is None
+    pacer.ack('engine', 95, now=1, clock_time=100)
+    pacer.ack('logger', 100, now=1, clock_time=100)
+    assert pacer.ack_lag(now=2) == 5
+    # world time moving on after the ack is not lag
+    assert pacer.lag(400, now=2) == 305 and pacer.ack_lag(now=2) == 5
+    assert pacer.ack_lag(now=20) is None
+
+
+def test_clock_loop_applies_the_paced_interval(db_path):
+    wc = _clock(db_path)
+    wc.pacer = AdaptivePacer(0.01, max_interval=0.05, lag_target=0)
+    wc.ack('engine', 0)
+    wc.start()
+    time.sleep(0.2)
+    wc.stop()
+    status = wc.get_status()
+    assert status['interval'] == 0.05 and status['lag'] > 0
+    assert status['consumers']['engine']['world_time'] == 0
+    # a consumer that was behind when it acked holds back accelerated mode
+    wc.ack('engine', 0)
+    assert not wc.downstream_ready()
+    wc.ack('engine', wc.world_time)
+    assert wc.downstream_ready()
@@ -248,3 +248,36 @@ def test_attack_protected_character():
     event = {"type": "character_action", "character_id": "1", "action": "attack", "target_id": "2"}
     valid, reason = v.validate_event(event)
     assert not valid and "protected character" in reason
+
+
+def _events_db():
+    import sqlite3
+    from src.db.migrations import apply_migrations
+    from src.db.queries import insert_event
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE events (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp INTEGER, type TEXT, description TEXT, '
+                 'involved_characters TEXT, involved_locations TEXT, metadata TEXT)')
+    apply_migrations(conn)
+    c = conn.cursor()
+    for i in range(150):
+        insert_event(c, {"id": f"evt_{i:04d}", "type": "character_action", "timestamp": i})
+    conn.commit()
+    return conn
+
+
+def test_duplicate_id_detected_beyond_recent_window():
+    conn = _events_db()
+    v = ContinuityValidator(world_state=make_world_state(), db_conn_getter=lambda: conn)
+    # evt_0000 is older than the 100 events kept in memory
+    ok, reason = v.validate_event({"type": "character_action", "character_id": "1", "id": "evt_0000"})
+    assert not ok and "Duplicate" in reason
+    assert v.validate_event({"type": "character_action", "character_id": "1", "id": "evt_new"})[0]
+
+
+def test_causation_resolves_canonical_id():
+    conn = _events_db()
+    v = ContinuityValidator(world_state=make_world_state(), db_conn_getter=lambda: conn)
+    ok, _ = v.validate_event({"type": "character_action", "character_id": "1", "id": "evt_x", "metadata": {"causationId": "evt_0001"}})
+    assert ok
+    ok, reason = v.validate_event({"type": "character_action", "character_id": "1", "id": "evt_y", "metadata": {"causationId": "1"}})
+    assert not ok and "not found" in reason
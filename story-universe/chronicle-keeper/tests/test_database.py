@@ -0,0 +1,110 @@
+import threading
+
+from src.db.database import get_connection, close_all_connections
+
+
+def test_pooled_connection_reused_per_thread(tmp_path):
+    db = str(tmp_path / 'pool.db')
+    try:
+        a = get_connection(db)
+        b = get_connection(db)
+        assert a.raw is b.raw
+
+        other = []
+        t = threading.Thread(target=lambda: other.append(get_connection(db).raw))
+        t.start()
+        t.join()
+        assert other[0] is not a.raw
+    finally:
+        close_all_connections(db)
+
+
+def test_pooled_connection_uses_wal(tmp_path):
+    db = str(tmp_path / 'wal.db')
+    try:
+        conn = get_connection(db)
+        mode = conn.execute('PRAGMA journal_mode').fetchone()[0]
+        assert mode.lower() == 'wal'
+        assert conn.execute('PRAGMA synchronous').fetchone()[0] == 1  # NORMAL
+    finally:
+        close_all_connections(db)
+
+
+def test_close_releases_and_rolls_back(tmp_path):
+    import sqlite3
+    db = str(tmp_path / 'release.db')
+    try:
+        conn = get_connection(db)
+        conn.execute('CREATE TABLE t (v INTEGER)')
+        conn.commit()
+        conn.row_factory = sqlite3.Row
+        conn.execute('INSERT INTO t (v) VALUES (1)')
+        conn.close()
+
+        conn = get_connection(db)
+        assert conn.row_factory is None
+        assert conn.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 0
+
+        # context-manager commits as with a plain sqlite3 connection
+        with get_connection(db) as c2:
+            c2.execute('INSERT INTO t (v) VALUES (2)')
+        assert conn.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 1
+    finally:
+        close_all_connections(db)
+
+
+def test_nested_close_keeps_outer_transaction(tmp_path):
+    import sqlite3
+    db = str(tmp_path / 'nested.db')
+    try:
+        outer = get_connection(db)
+        outer.execute('CREATE TABLE t (v INTEGER)')
+        outer.commit()
+        outer.execute('BEGIN')
+        outer.execute('INSERT INTO t (v) VALUES (1)')
+
+        # a helper that opens and closes its own connection mid-transaction
+        inner = get_connection(db)
+        inner.row_factory = sqlite3.Row
+        assert inner.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 1
+        inner.close()
+        inner.close()  # idempotent: must not release the outer hold too
+
+        assert outer.in_transaction and outer.row_factory is None
+        outer.commit()
+        assert outer.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 1
+
+        # the outermost release still rolls back
+        outer.execute('INSERT INTO t (v) VALUES (2)')
+        outer.close()
+        assert get_connection(db).execute('SELECT COUNT(*) FROM t').fetchone()[0] == 1
+    finally:
+        close_all_connections(db)
+
+
+def test_proxy_collected_off_its_thread_leaves_the_connection_alone(tmp_path):
+    db = str(tmp_path / 'finalizer.db')
+    try:
+        proxy = get_connection(db)
+        conn = proxy.raw
+        conn.execute('CREATE TABLE t (v INTEGER)')
+        conn.commit()
+        conn.execute('BEGIN')
+        conn.execute('INSERT INTO t (v) VALUES (1)')
+
+        # the GC may finalize an unclosed proxy on whichever thread it runs;
+        # the owner is still using the connection
+        t = threading.Thread(target=proxy.__del__)
+        t.start()
+        t.join()
+        assert conn.in_transaction
+        proxy.close()  # the hold is already given up: a no-op
+        conn.commit()
+
+        # the next release on the owning thread is the outermost one again
+        again = get_connection(db)
+        again.execute('INSERT INTO t (v) VALUES (2)')
+        again.close()
+        assert get_connection(db).execute('SELECT COUNT(*) FROM t').fetchone()[0] == 1
+    finally:
+        close_all_connections(db)
@@ -0,0 +1,112 @@
+import logging
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from src.db.migrations import apply_migrations, dedupe_unique_keys, COLUMNS, INDEXES, TABLES, TRIGGERS
+
+
+def _make_conn():
+    conn = sqlite3.connect(':memory:')
+    schema_path = Path(__file__).resolve().parents[1] / 'src' / 'db' / 'schema.sql'
+    conn.executescript(schema_path.read_text(encoding='utf-8'))
+    conn.execute('''CREATE TABLE IF NOT EXISTS events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp INTEGER,
+        type TEXT,
+        description TEXT,
+        involved_characters TEXT,
+        involved_locations TEXT,
+        metadata TEXT
+    )''')
+    conn.commit()
+    return conn
+
+
+# (hot query, params, index expected in the plan)
+HOT_QUERIES = [
+    ('SELECT * FROM events ORDER BY timestamp DESC LIMIT ? OFFSET ?', (50, 0), 'idx_events_timestamp'),
+    ('SELECT * FROM events WHERE type = ? ORDER BY timestamp DESC LIMIT ? OFFSET ?', ('character_action', 50, 0), 'idx_events_type_timestamp'),
+    ('SELECT COALESCE(canonical_id, id), timestamp, type, description, involved_characters, involved_locations, metadata FROM events ORDER BY timestamp DESC LIMIT 100', (), 'idx_events_timestamp'),
+    ('SELECT 1 FROM events WHERE canonical_id = ?', ('evt_1',), 'ux_events_canonical_id'),
+    # keyset pages and since= tailing for /world/events/recent
+    ('SELECT e.* FROM events e WHERE 1 AND (e.timestamp, e.id) < (?, ?) ORDER BY e.timestamp DESC, e.id DESC LIMIT ?', (10, 5, 50), 'idx_events_timestamp'),
+    ('SELECT e.* FROM events e WHERE 1 AND +e.type = ? AND e.id > ? ORDER BY e.id ASC LIMIT ?', ('character_action', 5, 50), 'INTEGER PRIMARY KEY (rowid>?)'),
+    ("SELECT e.* FROM event_participants p JOIN events e ON e.id = p.event_id WHERE p.entity_type = 'character' AND p.entity_id = ? AND p.event_id > ? ORDER BY p.event_id ASC LIMIT ?", ('1', 5, 50), 'PRIMARY KEY (entity_type=? AND entity_id=? AND event_id>?)'),
+    ('SELECT relationship_type, strength, cooldown_until FROM faction_relationships WHERE source_faction_id = ? AND target_faction_id = ?', (1, 2), 'ux_faction_relationships_pair'),
+    ('SELECT id, target_faction_id, relationship_type, strength, last_updated, cooldown_until, metadata FROM faction_relationships WHERE source_faction_id = ?', (1,), 'ux_faction_relationships_pair'),
+    ('SELECT until_ts FROM faction_cooldowns WHERE faction_id = ? AND cooldown_key = ?', (1, 'persona_drift'), 'ux_faction_cooldowns_key'),
+    ('SELECT cooldown_key, until_ts FROM faction_cooldowns WHERE faction_id = ?', (1,), 'ux_faction_cooldowns_key'),
+    ('SELECT * FROM inventory WHERE owner_type=? AND owner_id=? AND item_id=? AND equipped=0', ('character', '1', 1), 'idx_inventory_owner_item'),
+    ('SELECT i.*, it.name as item_name FROM inventory i LEFT JOIN items it ON i.item_id = it.id WHERE owner_type=? AND owner_id=?', ('character', '1'), 'idx_inventory_owner_item'),
+]
+
+
+@pytest.mark.parametrize('sql,params,index', HOT_QUERIES)
+def test_hot_query_plans_use_indexes(sql, params, index):
+    conn = _make_conn()
+    apply_migrations(conn)
+    plan = conn.execute('EXPLAIN QUERY PLAN ' + sql, params).fetchall()
+    detail = '\n'.join(row[-1] for row in plan)
+    assert index in detail, detail
+    assert 'USE TEMP B-TREE FOR ORDER BY' not in detail, detail
+
+
+def test_migrations_are_idempotent_and_refuse_to_dedupe(caplog):
+    conn = _make_conn()
+    c = conn.cursor()
+    # duplicates written before the unique index existed
+    c.execute('INSERT INTO faction_relationships (source_faction_id, target_faction_id, relationship_type, strength) VALUES (1, 2, ?, 0.1)', ('rival',))
+    c.execute('INSERT INTO faction_relationships (source_faction_id, target_faction_id, relationship_type, strength) VALUES (1, 2, ?, 0.9)', ('ally',))
+    # legacy events have no canonical id; the unique index must not collapse them
+    c.execute('INSERT INTO events (timestamp, type) VALUES (1, ?)', ('system_tick',))
+    c.execute('INSERT INTO events (timestamp, type) VALUES (2, ?)', ('system_tick',))
+    conn.commit()
+
+    with caplog.at_level(logging.ERROR, logger='src.db.migrations'):
+        created = apply_migrations(conn)
+    # startup migrations never delete: the blocked index is skipped and the keys logged
+    assert 'ux_faction_relationships_pair' not in created
+    assert 'ux_faction_relationships_pair' in caplog.text and '(1, 2)' in caplog.text
+    assert c.execute('SELECT COUNT(*) FROM faction_relationships').fetchone()[0] == 2
+
+    assert dedupe_unique_keys(conn, commit=False) == {'ux_faction_relationships_pair': 1}
+    assert c.execute('SELECT COUNT(*) FROM faction_relationships').fetchone()[0] == 2
+    assert dedupe_unique_keys(conn) == {'ux_faction_relationships_pair': 1}
+    assert apply_migrations(conn) == ['ux_faction_relationships_pair']
+    assert set(created) | {'ux_faction_relationships_pair'} == (
+        {name for name, _, _, _ in INDEXES} | {name for name, _, _ in TABLES}
+        | {f'{table}.{column}' for table, column, _ in COLUMNS} | {name for name, _, _ in TRIGGERS})
+    assert apply_migrations(conn) == []
+
+    rows = c.execute('SELECT relationship_type FROM faction_relationships').fetchall()
+    assert rows == [('ally',)]
+    assert c.execute('SELECT COUNT(*) FROM events WHERE canonical_id IS NULL').fetchone()[0] == 2
+
+    # INSERT OR REPLACE now upserts instead of appending duplicates
+    c.execute('INSERT OR REPLACE INTO faction_cooldowns (faction_id, cooldown_key, until_ts) VALUES (1, ?, 10)', ('attack',))
+    c.execute('INSERT OR REPLACE INTO faction_cooldowns (faction_id, cooldown_key, until_ts) VALUES (1, ?, 20)', ('attack',))
+    assert c.execute('SELECT until_ts FROM faction_cooldowns').fetchall() == [(20,)]
+
+
+def test_migrations_skip_missing_tables():
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE events (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp INTEGER, type TEXT)')
+    created = apply_migrations(conn)
+    assert created == [
+        'event_participants',
+        'state_snapshots',
+        'world_ticks',
+        'tick_rollups',
+        'events.canonical_id',
+        'events.payload',
+        'events.applied_at',
+        'idx_events_timestamp',
+        'idx_events_type_timestamp',
+        'ux_events_canonical_id',
+        'idx_event_participants_entity_ts',
+        'idx_event_participants_event',
+        'idx_state_snapshots_last_event',
+        'idx_world_ticks_timestamp',
+    ]
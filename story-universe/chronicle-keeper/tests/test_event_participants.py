@@ -0,0 +1,127 @@
+import sqlite3
+
+import pytest
+
+from src.db.migrations import apply_migrations
+from src.db.queries import (decode_cursor, encode_cursor, extract_participants, insert_event, latest_event_id,
+                            query_recent_events, record_participants)
+
+
+def _make_conn():
+    conn = sqlite3.connect(':memory:')
+    conn.execute('''CREATE TABLE events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp INTEGER,
+        type TEXT,
+        description TEXT,
+        involved_characters TEXT,
+        involved_locations TEXT,
+        metadata TEXT
+    )''')
+    apply_migrations(conn)
+    return conn
+
+
+def test_extract_participants_roles_and_dedupe():
+    ev = {'character_id': '1', 'target_id': 2, 'involved_characters': ['1', '3'], 'location_id': '100',
+          'involved_factions': [7]}
+    assert extract_participants(ev) == [
+        ('character', '1', 'actor'),
+        ('character', '2', 'target'),
+        ('character', '3', 'involved'),
+        ('location', '100', 'location'),
+        ('faction', '7', 'involved'),
+    ]
+    # legacy rows store python reprs of lists
+    assert extract_participants({'involved_characters': "['4', '5']"}) == [
+        ('character', '4', 'involved'), ('character', '5', 'involved')]
+
+
+def test_character_filter_matches_exact_ids():
+    conn = _make_conn()
+    c = conn.cursor()
+    insert_event(c, {'type': 'character_action', 'timestamp': 10, 'character_id': '1', 'location_id': '100'})
+    insert_event(c, {'type': 'character_action', 'timestamp': 20, 'character_id': '11', 'location_id': '100'})
+    insert_event(c, {'type': 'dialogue', 'timestamp': 30, 'involved_characters': ['21', '1']})
+    conn.commit()
+
+    got = query_recent_events(conn, character_id=1)
+    assert [e['timestamp'] for e in got] == [30, 10]
+
+    got = query_recent_events(conn, character_id=1, location_id=100)
+    assert [e['timestamp'] for e in got] == [10]
+
+    got = query_recent_events(conn, location_id=100, event_type='character_action', limit=1)
+    assert [e['timestamp'] for e in got] == [20]
+
+
+def test_participant_filter_plan_is_index_range_scan():
+    conn = _make_conn()
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT e.* FROM event_participants p JOIN events e ON e.id = p.event_id"
+        " WHERE p.entity_type = 'character' AND p.entity_id = ? ORDER BY p.timestamp DESC LIMIT 50", ('1',)
+    ).fetchall()
+    detail = '\n'.join(r[-1] for r in plan)
+    assert 'idx_event_participants_entity_ts' in detail
+    assert 'TEMP B-TREE' not in detail
+
+
+def test_backfill_is_idempotent():
+    conn = _make_conn()
+    c = conn.cursor()
+    c.execute("INSERT INTO events (timestamp, type, involved_characters, involved_locations) VALUES (5, 'legacy', ?, ?)",
+              ("['1', '2']", "['100']"))
+    row_id = c.lastrowid
+    legacy = {'involved_characters': "['1', '2']", 'involved_locations': "['100']"}
+    assert record_participants(c, row_id, legacy, 5) == 3
+    record_participants(c, row_id, legacy, 5)
+    assert c.execute('SELECT COUNT(*) FROM event_participants').fetchone()[0] == 3
+    assert [e['type'] for e in query_recent_events(conn, location_id=100)] == ['legacy']
+
+
+def test_keyset_pages_do_not_skip_or_repeat_under_inserts():
+    conn = _make_conn()
+    c = conn.cursor()
+    for i in range(25):
+        # several events share a timestamp; the rowid breaks ties
+        insert_event(c, {'id': f'evt_{i}', 'type': 'character_action', 'timestamp': 100 + i // 3, 'character_id': '1'})
+    conn.commit()
+
+    seen = []
+    before = None
+    for page in range(10):
+        rows = query_recent_events(conn, limit=7, before=before)
+        if not rows:
+            break
+        seen.extend(r['canonical_id'] for r in rows)
+        before = decode_cursor(encode_cursor(rows[-1]['timestamp'], rows[-1]['id']))
+        # a new event arriving mid-pagination must not shift later pages
+        insert_event(c, {'id': f'late_{page}', 'type': 'character_action', 'timestamp': 1000 + page})
+        conn.commit()
+    assert seen == [f'evt_{i}' for i in reversed(range(25))]
+
+    by_char = query_recent_events(conn, limit=5, character_id='1', before=(104, 10**9))
+    assert [r['timestamp'] for r in by_char] == [104, 104, 104, 103, 103]
+
+
+def test_since_cursor_tails_new_events_in_commit_order():
+    conn = _make_conn()
+    c = conn.cursor()
+    for i in range(3):
+        insert_event(c, {'id': f'evt_{i}', 'type': 'character_action', 'timestamp': 10 + i})
+    conn.commit()
+    since = latest_event_id(conn)
+    assert query_recent_events(conn, after_id=since) == []
+
+    insert_event(c, {'id': 'evt_3', 'type': 'character_action', 'timestamp': 13})
+    # backdated and undated events committed later must still be tailed
+    insert_event(c, {'id': 'evt_backdated', 'type': 'character_action', 'timestamp': 1})
+    insert_event(c, {'id': 'evt_undated', 'type': 'character_action', 'timestamp': None, 'character_id': '1'})
+    conn.commit()
+    assert [r['canonical_id'] for r in query_recent_events(conn, after_id=since)] == \
+        ['evt_3', 'evt_backdated', 'evt_undated']
+    assert [r['canonical_id'] for r in query_recent_events(conn, after_id=since, character_id='1')] == ['evt_undated']
+    assert query_recent_events(conn, after_id=latest_event_id(conn)) == []
+
+    with pytest.raises(ValueError):
+        decode_cursor('not-a-cursor')
@@ -0,0 +1,126 @@
+import sqlite3
+import time
+from pathlib import Path
+
+import pytest
+
+from src.db.database import get_connection
+from src.db.migrations import apply_migrations
+from src.services.continuity import ContinuityValidator
+from src.services.event_store import SnapshotScheduler, capture_state, rebuild, take_snapshot
+from src.services.ingest_queue import IngestWriter
+
+SCHEMA = (Path(__file__).resolve().parents[1] / 'src' / 'db' / 'schema.sql').read_text(encoding='utf-8')
+
+
+def _schema_conn(path=':memory:'):
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.execute('CREATE TABLE IF NOT EXISTS events (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp INTEGER, type TEXT, '
+                 'description TEXT, involved_characters TEXT, involved_locations TEXT, metadata TEXT)')
+    conn.execute('CREATE TABLE IF NOT EXISTS system_state (key TEXT PRIMARY KEY, value TEXT)')
+    apply_migrations(conn)
+    return conn
+
+
+pytestmark = pytest.mark.test_db(name='replay.db', seed=(
+    [('INSERT INTO characters (id, name, age, traits, location_id, status) VALUES (?, ?, 30, ?, 100, ?)', (cid, f'C{cid}', '[]', 'alive'))
+     for cid in (1, 2)]
+    + [('INSERT INTO locations (id, name) VALUES (?, ?)', (lid, f'L{lid}')) for lid in (100, 200)]
+    + [('INSERT INTO factions (id, name, personality_traits) VALUES (?, ?, ?)', (fid, f'F{fid}', '{"aggression": 0.5}'))
+       for fid in (1, 2)]
+    + [('INSERT INTO faction_metrics (faction_id, trust) VALUES (?, 0.8)', (fid,)) for fid in (1, 2)]
+))
+
+
+def _ingest(db_path, events):
+    getter = lambda: get_connection(db_path)
+    writer = IngestWriter(ContinuityValidator(db_conn_getter=getter), getter, batch_size=16, flush_ms=0)
+    results = writer.submit_batch(events).result(timeout=10)
+    writer.stop()
+    assert all(r['status'] == 'accepted' for r in results), results
+
+
+EVENTS_A = [
+    {'type': 'character_action', 'timestamp': 1, 'character_id': '1', 'action': 'move', 'location_id': '200'},
+    {'type': 'faction_event', 'timestamp': 2, 'source_faction_id': 1, 'target_faction_id': 2, 'action': 'attack', 'severity': 0.5},
+]
+EVENTS_B = [
+    {'type': 'character_state_change', 'timestamp': 3, 'character_id': '2', 'new_status': 'dead'},
+    {'type': 'faction_event', 'timestamp': 4, 'source_faction_id': 2, 'target_faction_id': 1, 'action': 'attack', 'severity': 0.2},
+    {'type': 'character_action', 'timestamp': 5, 'character_id': '1', 'action': 'move', 'location_id': '100'},
+]
+
+
+def test_snapshot_plus_tail_rebuilds_live_state(db_path, monkeypatch):
+    conn = sqlite3.connect(db_path)
+    take_snapshot(conn)
+    _ingest(db_path, EVENTS_A)
+    mid = take_snapshot(conn)
+    _ingest(db_path, EVENTS_B)
+    live = capture_state(conn.cursor())
+    # replay much later: cooldown deadlines must come from the stored applied_at
+    later = time.time() + 86400
+    monkeypatch.setattr(time, 'time', lambda: later)
+
+    target = _schema_conn()
+    stats = rebuild(conn, target)
+    assert stats['snapshot_id'] == mid
+    assert stats['applied'] == len(EVENTS_B) and stats['skipped'] == 0
+    assert capture_state(target.cursor()) == live
+
+    # without the newer snapshot, the base snapshot plus the whole log gives the same answer
+    conn.execute('DELETE FROM state_snapshots WHERE id = ?', (mid,))
+    conn.commit()
+    older = _schema_conn()
+    stats = rebuild(conn, older)
+    assert stats['applied'] == len(EVENTS_A) + len(EVENTS_B)
+    assert capture_state(older.cursor()) == live
+    conn.close()
+
+
+def test_rebuild_until_event_stops_at_that_event(db_path):
+    conn = sqlite3.connect(db_path)
+    take_snapshot(conn)
+    _ingest(db_path, EVENTS_A)
+    cut = conn.execute('SELECT MAX(id) FROM events').fetchone()[0]
+    expected = capture_state(conn.cursor())
+    _ingest(db_path, EVENTS_B)
+
+    target = _schema_conn()
+    rebuild(conn, target, until_event_id=cut)
+    assert capture_state(target.cursor()) == expected
+
+    with pytest.raises(LookupError):
+        rebuild(conn, _schema_conn(), until_event_id=-1)
+    conn.close()
+
+
+def test_legacy_rows_are_skipped_and_ticks_replayed(db_path):
+    conn = sqlite3.connect(db_path)
+    take_snapshot(conn)
+    conn.execute("INSERT INTO events (timestamp, type, metadata) VALUES (1, 'character_state_change', '{}')")
+    conn.execute("INSERT INTO events (timestamp, type, metadata) VALUES (2, 'system_tick', ?)", ('{"world_time": 42}',))
+    conn.commit()
+
+    target = _schema_conn()
+    stats = rebuild(conn, target)
+    assert stats['skipped'] == 1 and stats['applied'] == 1
+    assert target.execute("SELECT value FROM system_state WHERE key = 'time'").fetchone() == ('42',)
+    conn.close()
+
+
+def test_scheduler_snapshots_on_event_count_and_out_of_band_writes(db_path):
+    scheduler = SnapshotScheduler(lambda: get_connection(db_path), every_events=3, keep=2)
+    assert scheduler.maybe_snapshot() is not None  # base snapshot
+    assert scheduler.maybe_snapshot() is None
+    _ingest(db_path, EVENTS_A)
+    assert scheduler.maybe_snapshot() is None
+    _ingest(db_path, EVENTS_B)
+    assert scheduler.maybe_snapshot() is not None
+    scheduler.note_out_of_band_write()
+    assert scheduler.maybe_snapshot() is not None
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute('SELECT COUNT(*) FROM state_snapshots').fetchone()[0] == 2
+    conn.close()
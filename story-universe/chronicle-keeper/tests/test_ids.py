@@ -0,0 +1,51 @@
+import threading
+import time
+
+from src.ids import IdGenerator, new_id
+from src.models.canonical_event import CanonicalEvent
+
+
+def test_one_million_ids_unique_across_threads():
+    gen = IdGenerator(node_id=7)
+    per_thread = 250_000
+    chunks = [None] * 4
+
+    def mint(slot):
+        chunks[slot] = [gen.new_id() for _ in range(per_thread)]
+
+    threads = [threading.Thread(target=mint, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    ids = [i for chunk in chunks for i in chunk]
+    assert len(ids) == 1_000_000
+    assert len(set(ids)) == 1_000_000
+    # each thread sees a strictly increasing stream
+    for chunk in chunks:
+        assert chunk == sorted(chunk)
+
+
+def test_ids_sort_by_time_and_survive_clock_steps(monkeypatch):
+    gen = IdGenerator(node_id=1)
+    now = [1_700_000_000_000_000_000]
+    monkeypatch.setattr(time, "time_ns", lambda: now[0])
+    a = gen.new_id()
+    now[0] -= 5_000_000_000  # wall clock steps back 5s
+    b = gen.new_id()
+    now[0] += 10_000_000_000
+    c = gen.new_id()
+    assert a < b < c
+    assert a.startswith("evt_1700000000000_0001")
+
+
+def test_node_tag_and_prefix():
+    a = IdGenerator(node_id=0x00AB).new_id("arc")
+    b = IdGenerator(node_id=0x00AC).new_id("arc")
+    assert a.split("_")[2][:4] == "00ab" and b.split("_")[2][:4] == "00ac"
+    assert a.startswith("arc_")
+
+
+def test_generated_ids_are_valid_canonical_ids():
+    ev = CanonicalEvent(id=new_id(), type="character_action", timestamp=1)
+    assert ev.id.startswith("evt_")
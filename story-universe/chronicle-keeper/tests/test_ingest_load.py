@@ -0,0 +1,91 @@
+"""Load test: /event saturation must never put database work on the event loop.
+
+The ingest writer's connection getter is slowed down to stand in for a slow
+fsync on the Pi's SD card. Every connection getter the app uses records the
+thread it runs on; if any ran on the event loop's thread, every in-flight
+/ping would wait behind it. Asserting on that, rather than on wall-clock
+latency, keeps the test stable on a loaded runner.
+"""
+import asyncio
+import os
+import threading
+import time
+
+import httpx
+import pytest
+
+TEST_DB_PATH = os.environ["CHRONICLE_KEEPER_DB_PATH"]
+from src.db.test_db_setup import setup_test_db, teardown_test_db
+
+SLOW_COMMIT_S = 0.05
+
+
+async def _pings(client, n):
+    for _ in range(n):
+        r = await client.get("/ping")
+        assert r.status_code == 200
+
+
+async def _flood(client, stop, counts, worker):
+    i = 0
+    while not stop.is_set():
+        i += 1
+        r = await client.post("/event", json={
+            "type": "character_action", "timestamp": 9999999999,
+            "character_id": "1", "location_id": "100", "id": f"load_{worker}_{i}",
+        })
+        key = r.json().get("status", r.status_code)
+        counts[key] = counts.get(key, 0) + 1
+
+
+@pytest.fixture
+def app_with_slow_writer(monkeypatch):
+    setup_test_db(TEST_DB_PATH)
+    from src import main
+    from src.db.database import get_connection
+    from src.db.migrations import apply_migrations
+    from src.services.ingest_queue import IngestWriter
+
+    db_threads = set()
+
+    def recorded(getter):
+        def wrapped(*args, **kwargs):
+            db_threads.add(threading.get_ident())
+            return getter(*args, **kwargs)
+        return wrapped
+
+    def slow_conn():
+        time.sleep(SLOW_COMMIT_S)
+        return get_connection()
+
+    conn = get_connection()
+    apply_migrations(conn)
+    conn.close()
+
+    writer = IngestWriter(main.validator, recorded(slow_conn), batch_size=16, flush_ms=2)
+    monkeypatch.setattr(main, "ingest_writer", writer)
+    monkeypatch.setattr(main, "get_connection", recorded(get_connection))
+    monkeypatch.setattr(main.validator, "_db_conn_getter", recorded(main.validator._db_conn_getter))
+    yield main.app, db_threads
+    writer.stop()
+    teardown_test_db(TEST_DB_PATH)
+
+
+def test_no_db_work_on_the_loop_while_event_saturated(app_with_slow_writer):
+    app, db_threads = app_with_slow_writer
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            stop = asyncio.Event()
+            counts = {}
+            flooders = [asyncio.create_task(_flood(client, stop, counts, w)) for w in range(64)]
+            await asyncio.sleep(0.2)
+            await _pings(client, 200)
+            stop.set()
+            await asyncio.gather(*flooders)
+            return threading.get_ident(), counts
+
+    loop_thread, counts = asyncio.run(scenario())
+    assert counts.get("accepted", 0) > 64
+    assert db_threads and loop_thread not in db_threads
@@ -0,0 +1,98 @@
+import sqlite3
+import threading
+
+import pytest
+
+from src.db.database import get_connection
+from src.services.continuity import ContinuityValidator
+from src.services.ingest_queue import IngestQueueFull, IngestWriter
+
+
+pytestmark = pytest.mark.test_db(name='ingest.db')
+
+
+def _writer(db_path, **kwargs):
+    getter = lambda: get_connection(db_path)
+    return IngestWriter(ContinuityValidator(db_conn_getter=getter), getter, **kwargs)
+
+
+def _count_events(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute('SELECT COUNT(*) FROM events').fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_concurrent_submissions_share_commits(db_path):
+    writer = _writer(db_path, batch_size=50, flush_ms=50)
+    futures = [writer.submit({'type': 'character_action', 'timestamp': 1000 + i, 'character_id': '1', 'location_id': '100', 'id': f'e{i}'})
+               for i in range(40)]
+    results = [f.result(timeout=5) for f in futures]
+    writer.stop()
+
+    assert all(r['status'] == 'accepted' for r in results)
+    assert [r['id'] for r in results] == [f'e{i}' for i in range(40)]
+    assert _count_events(db_path) == 40
+    stats = writer.get_stats()
+    assert stats['events'] == 40
+    assert stats['batches'] < 40
+
+
+def test_ack_is_sent_after_commit(db_path):
+    writer = _writer(db_path, batch_size=8, flush_ms=0)
+    fut = writer.submit({'type': 'character_action', 'timestamp': 5, 'character_id': '1', 'location_id': '100'})
+    assert fut.result(timeout=5)['status'] == 'accepted'
+    # visible to an independent connection as soon as the future resolves
+    assert _count_events(db_path) == 1
+    writer.stop()
+
+
+def test_events_in_one_batch_validate_in_order(db_path):
+    writer = _writer(db_path, batch_size=10, flush_ms=100)
+    died = writer.submit({'type': 'character_state_change', 'timestamp': 10, 'character_id': '1', 'new_status': 'dead'})
+    acted = writer.submit({'type': 'character_action', 'timestamp': 11, 'character_id': '1', 'action': 'attack'})
+    assert died.result(timeout=5)['status'] == 'accepted'
+    res = acted.result(timeout=5)
+    writer.stop()
+    assert res['status'] == 'rejected' and 'dead' in res['reason'].lower()
+    assert writer.get_stats()['batches'] == 1
+    assert _count_events(db_path) == 1
+
+
+def test_full_queue_sheds_load(db_path):
+    gate = threading.Event()
+
+    def slow_getter():
+        gate.wait(5)
+        return get_connection(db_path)
+
+    writer = IngestWriter(ContinuityValidator(db_conn_getter=lambda: get_connection(db_path)), slow_getter,
+                          batch_size=1, flush_ms=0, max_queue=1)
+    ev = {'type': 'character_action', 'timestamp': 1, 'character_id': '1', 'location_id': '100'}
+    first = writer.submit(dict(ev))
+    # wait until the writer has taken the first event and is stuck opening its connection
+    for _ in range(100):
+        if writer.get_stats()['queued'] == 0:
+            break
+        threading.Event().wait(0.01)
+    second = writer.submit(dict(ev))
+    with pytest.raises(IngestQueueFull):
+        writer.submit(dict(ev))
+    gate.set()
+    assert first.result(timeout=5)['status'] == 'accepted'
+    assert second.result(timeout=5)['status'] == 'accepted'
+    writer.stop()
+
+
+def test_submitted_batch_validates_against_its_own_earlier_events(db_path):
+    writer = _writer(db_path, batch_size=10, flush_ms=0)
+    results = writer.submit_batch([
+        {'type': 'character_action', 'timestamp': 20, 'character_id': '1', 'location_id': '100'},
+        {'type': 'character_state_change', 'timestamp': 21, 'character_id': '1', 'new_status': 'dead'},
+        {'type': 'character_action', 'timestamp': 22, 'character_id': '1', 'action': 'attack'},
+    ]).result(timeout=5)
+    writer.stop()
+    assert [r['status'] for r in results] == ['accepted', 'accepted', 'rejected']
+    assert writer.get_stats()['batches'] == 1
+    assert _count_events(db_path) == 2
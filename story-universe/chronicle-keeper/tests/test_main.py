@@ -49,3 +49,98 @@ def test_get_recent_events(client):
     resp = client.get("/world/events/recent?limit=2")
     assert resp.status_code == 200
     assert isinstance(resp.json(), list)
+
+def test_events_batch_returns_results_in_order(client):
+    events = [
+        {"type": "character_action", "timestamp": 9999999999, "character_id": "1", "location_id": "100", "id": "b1"},
+        {"timestamp": 123},
+        {"type": "character_action", "timestamp": 9999999999, "character_id": "1", "location_id": "100", "id": "b3"},
+    ]
+    resp = client.post("/events/batch", json=events)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [r["status"] for r in body["results"]] == ["accepted", "rejected", "accepted"]
+    assert body["results"][0]["id"] == "b1" and body["results"][2]["id"] == "b3"
+    assert body["accepted"] == 2 and body["rejected"] == 1
+
+
+def test_recent_events_cursor_headers(client):
+    first = client.get("/world/events/recent", params={"limit": 1})
+    assert first.status_code == 200
+    assert len(first.json()) == 1
+    latest = first.headers["X-Latest-Cursor"]
+    nxt = first.headers["X-Next-Cursor"]
+
+    older = client.get("/world/events/recent", params={"limit": 1, "cursor": nxt})
+    assert older.json() and older.json()[0]["id"] != first.json()[0]["id"]
+
+    tail = client.get("/world/events/recent", params={"since": latest})
+    assert tail.json() == [] and tail.headers["X-Latest-Cursor"] == latest
+
+    assert client.get("/world/events/recent", params={"cursor": "%%%"}).status_code == 400
+
+
+def test_recent_events_view_serves_stored_encoding(client):
+    event = {"type": "character_action", "timestamp": 9999999999, "character_id": "1",
+             "location_id": "100", "id": "raw1", "description": "served raw"}
+    assert client.post("/event", json=event).json()["status"] == "accepted"
+
+    rows = client.get("/world/events/recent", params={"limit": 1})
+    raw = client.get("/world/events/recent", params={"limit": 1, "view": "events"})
+    assert raw.status_code == 200
+    assert raw.headers["X-Latest-Cursor"] == rows.headers["X-Latest-Cursor"]
+    # the body is the stored payload itself, byte for byte
+    assert raw.content == b"[" + rows.json()[0]["payload"].encode("utf-8") + b"]"
+    served = raw.json()[0]
+    assert served["id"] == "raw1" and served["description"] == "served raw"
+    assert client.get("/world/events/recent", params={"view": "bogus"}).status_code == 400
+
+
+def test_world_state_etag_and_not_modified(client):
+    first = client.get("/world/state")
+    etag = first.headers["ETag"]
+    assert first.headers["X-World-Version"] == etag.strip('"')
+
+    again = client.get("/world/state", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b""
+    assert again.headers["ETag"] == etag
+
+    import sqlite3
+    conn = sqlite3.connect(TEST_DB_PATH)
+    conn.execute("INSERT OR REPLACE INTO system_state (key, value) VALUES ('etag_probe', '1')")
+    conn.commit()
+    conn.close()
+    changed = client.get("/world/state", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert int(changed.headers["X-World-Version"]) > int(etag.strip('"'))
+    assert changed.json()["system"]["etag_probe"] == "1"
+
+
+def test_world_state_changes_feed(client):
+    base = int(client.get("/world/state").headers["X-World-Version"])
+    import sqlite3
+    conn = sqlite3.connect(TEST_DB_PATH)
+    conn.execute("INSERT OR REPLACE INTO system_state (key, value) VALUES ('feed_probe', '2')")
+    conn.commit()
+    conn.close()
+    body = client.get("/world/state/changes", params={"since": base}).json()
+    assert body["version"] > base
+    assert {"op": "upsert", "entity": "system", "id": "feed_probe", "data": "2", "version": body["version"]} in body["changes"]
+
+    gone = client.get("/world/state/changes", params={"since": 1})
+    assert gone.status_code == 410
+    assert gone.json()["detail"]["version"] == body["version"]
+
+
+def test_world_state_as_of_current_time_serves_live_state(client):
+    resp = client.get("/world/state", params={"as_of": 10 ** 9})
+    assert resp.status_code == 200
+    assert "ETag" in resp.headers
+
+
+def test_world_clock_ack(client):
+    assert client.post("/world/clock/ack", json={"consumer": "engine"}).status_code == 400
+    resp = client.post("/world/clock/ack", json={"consumer": "engine", "world_time": 3})
+    assert resp.status_code == 200
+    assert "interval" in resp.json() and "lag" in resp.json()
+    assert "engine" in client.get("/world/clock").json()["consumers"]
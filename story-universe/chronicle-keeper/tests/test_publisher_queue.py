@@ -1,15 +1,295 @@
+import json
 import queue
-from src.messaging.publisher import TickPublisher
+import threading
+import time
+
+import pytest
+import zmq
+
+from src.messaging import publisher as publisher_module
+from src.messaging.publisher import SendLanes, TickPublisher
+from src.models.canonical_event import encode_event
+from src.wire import Encoded, GapFiller, decode_frames, encode_frames, fetch_range, recv_sequenced
+
+
+def _stopped_sender(pub):
+    pub._sender_shutdown.set()
+    pub._sender_thread.join(timeout=2.0)
+    return pub
 
 
 def test_publisher_queue_behavior():
-    pub = TickPublisher(address="tcp://127.0.0.1:5555", bind=False)
-    # shrink the queue to force drops
-    pub._send_queue = queue.Queue(maxsize=1)
+    pub = _stopped_sender(TickPublisher(address="tcp://127.0.0.1:5555", bind=False))
+    # shrink the event lane to force drops
+    pub._lanes = SendLanes(sizes={"event": 1})
 
-    ok1 = pub.publish("tick", {"tick": 1})
-    ok2 = pub.publish("tick", {"tick": 2})
-    # first should enqueue, second should be dropped due to full queue
+    ok1 = pub.publish("event", {"id": 1})
+    ok2 = pub.publish("event", {"id": 2})
+    # first should enqueue, second should be dropped due to full lane
     assert ok1 is True
-    assert ok2 is False or ok2 is not True
+    assert ok2 is False
+    assert pub.metrics.lane_drops == {"control": 0, "event": 1, "log": 0}
+    assert pub.metrics.to_dict()["lane_drops"]["event"] == 1
+    pub.close()
+
+
+def test_ticks_conflate_and_jump_the_event_backlog():
+    pub = _stopped_sender(TickPublisher(address="tcp://127.0.0.1:5555", bind=False))
+    pub._lanes = SendLanes(sizes={"event": 2})
+
+    pub.publish_event({"id": "e1", "type": "x", "timestamp": 1})
+    for world_time in (1, 2, 3):
+        assert pub.publish_tick({"world_time": world_time}) is True
+    pub.publish_event({"id": "e2", "type": "x", "timestamp": 2})
+    assert pub._lanes.depths() == {"control": 1, "event": 2, "log": 0}
+    assert pub.metrics.lane_drops["control"] == 2 and pub.metrics.message_errors == 0
+
+    # the newest tick goes out first, unnumbered until sent
+    lane, topic, batch = pub._lanes.get_nowait()
+    assert (lane, topic, batch[0]["data"], batch.seq) == ("control", "tick", {"world_time": 3}, None)
+    assert [pub._lanes.get_nowait()[2][0]["id"] for _ in range(2)] == ["e1", "e2"]
+    with pytest.raises(queue.Empty):
+        pub._lanes.get_nowait()
+    pub.close()
+
+
+def test_log_lane_drops_oldest():
+    lanes = SendLanes(sizes={"log": 2})
+    for n in range(3):
+        accepted, dropped = lanes.put("log", "entry", publisher_module._Batch([{"n": n}]))
+        assert accepted
+    assert dropped == 1
+    assert [lanes.get_nowait()[2][0]["n"] for _ in range(2)] == [1, 2]
+    with pytest.raises(ValueError):
+        SendLanes(policies={"event": "drop_random"})
+
+
+def test_publish_many_uses_one_queue_slot():
+    pub = _stopped_sender(TickPublisher(address="tcp://127.0.0.1:5555", bind=False))
+    pub._lanes = SendLanes(sizes={"event": 1})
+
+    assert pub.publish_events([{"id": "a", "involved_characters": ["1"]}, {"id": "b"}]) is True
+    lane, topic, batch = pub._lanes.get_nowait()
+    assert (lane, topic) == ("event", "event")
+    assert [m["id"] for m in batch] == ["a", "b"]
+    pub.close()
+
+
+def test_queued_messages_carry_per_topic_sequence_numbers():
+    log = publisher_module.ReplayLog(size=3)
+    assert log.append("system:tick", [{"t": 1}]) == 1
+    assert log.append("system:tick", [{"t": 2}, {"t": 3}, {"t": 4}]) == 2
+    assert log.append("system:event", [{"id": "a"}]) == 1
+
+    reply = log.replay("system:tick", 1, 3)
+    # seq 1 has left the 3-message ring
+    assert reply["first"] == 2 and reply["last"] == 4
+    assert reply["messages"] == [[2, {"t": 2}], [3, {"t": 3}]]
+
+    pub = TickPublisher(address="tcp://127.0.0.1:5555", bind=False)
+    pub._sender_shutdown.set()
+    pub._sender_thread.join(timeout=2.0)
+    before = publisher_module._replay_log.last_seqs().get("system:event", 0)
+    pub.publish("event", {"id": "x"})
+    pub.publish_events([{"id": "y"}, {"id": "z"}])
+    _, _, single = pub._lanes.get_nowait()
+    _, _, batch = pub._lanes.get_nowait()
+    assert (single.seq, batch.seq) == (before + 1, before + 2)
+    assert pub.get_stats()["sequences"]["system:event"] == before + 3
     pub.close()
+
+
+def test_replay_channel_serves_missing_range():
+    log = publisher_module.ReplayLog(size=10)
+    log.append("system:tick", [{"t": i} for i in range(1, 6)])
+    server = publisher_module.ReplayServer("inproc://replay-test", log=log)
+    server.start()
+    try:
+        reply = fetch_range("inproc://replay-test", "system:tick", 2, 4)
+        assert reply["messages"] == [[2, {"t": 2}], [3, {"t": 3}], [4, {"t": 4}]]
+        assert fetch_range("inproc://replay-test", "system:tick", 1, 1)["messages"] == [[1, {"t": 1}]]
+        assert server.get_stats()["requests"] == 2
+
+        filler = GapFiller("inproc://replay-test")
+        assert filler.process("system:tick", 1, {"t": 1}) == [{"t": 1}]
+        assert filler.process("system:tick", 4, {"t": 4}) == [{"t": 2}, {"t": 3}, {"t": 4}]
+        # 6..8 were never published, so only 5 comes back
+        assert filler.process("system:tick", 9, {"t": 9}) == [{"t": 5}, {"t": 9}]
+        assert (filler.recovered, filler.lost) == (3, 3)
+    finally:
+        server.stop()
+
+
+def test_encoded_events_are_published_without_reencoding():
+    pub = TickPublisher(address="tcp://127.0.0.1:5555", bind=False)
+    pub._sender_shutdown.set()
+    pub._sender_thread.join(timeout=2.0)
+
+    record = encode_event({"id": "e1", "type": "character_action", "timestamp": 5, "data": {"n": 1}})
+    pub.publish_event(record)
+    _, _, batch = pub._lanes.get_nowait()
+    message = batch[0]
+    assert isinstance(message, Encoded)
+    # the event's own buffer is reused after the spliced envelope
+    assert message.body.endswith(record.encoded[1:])
+    assert json.loads(message.body) == message.value
+    assert message.value["event_id"] and message.value["timestamp"] == 5
+    topic, decoded = decode_frames(encode_frames("system:event", message))
+    assert decoded == message.value
+
+    # plain dicts still go through the codec
+    pub.publish_event({"id": "e2", "type": "x", "timestamp": 6})
+    _, _, batch = pub._lanes.get_nowait()
+    assert isinstance(batch[0], dict)
+    pub.close()
+
+
+def _wait_for(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+def test_xpub_skips_topics_without_subscribers():
+    pub = TickPublisher(address="inproc://xpub-test", bind=True, replay_addr="")
+    assert pub.skip_unsubscribed
+    before = publisher_module._replay_log.last_seqs().get("system:tick", 0)
+    assert pub.publish_tick({"world_time": 1}) is True
+    assert pub.backlog() == 0 and pub.metrics.messages_skipped == 1
+    # a skipped tick is still numbered, so a later subscriber can replay it
+    assert publisher_module._replay_log.last_seqs()["system:tick"] == before + 1
+
+    sub = zmq.Context.instance().socket(zmq.SUB)
+    sub.connect("inproc://xpub-test")
+    sub.setsockopt_string(zmq.SUBSCRIBE, "system:tick")
+    try:
+        assert _wait_for(lambda: pub.subscribers("tick") == 1)
+        stats = pub.get_stats()
+        assert stats["subscribers"] == {"system:tick": 1, "system:event": 0}
+        assert stats["subscriptions"] == {"system:tick": 1}
+
+        pub.publish_tick({"world_time": 2})
+        assert sub.poll(2000)
+        topic, seq, message = recv_sequenced(sub)
+        assert topic == "system:tick" and seq == before + 2
+        assert message["data"] == {"world_time": 2}
+
+        events_before = publisher_module._replay_log.last_seqs().get("system:event", 0)
+        pub.publish_event({"id": "nobody-listens", "type": "x", "timestamp": 1})
+        assert pub.metrics.messages_skipped == 2
+        # skipped events are still sequenced, so they stay recoverable
+        assert publisher_module._replay_log.last_seqs()["system:event"] == events_before + 1
+    finally:
+        sub.close(linger=0)
+    pub.close()
+
+
+def test_get_batch_drains_lanes_in_priority_order():
+    lanes = SendLanes()
+    lanes.put("log", "entry", publisher_module._Batch([{"n": 0}]))
+    lanes.put("event", "event", publisher_module._Batch([{"id": "a"}]))
+    lanes.put("event", "event", publisher_module._Batch([{"id": "b"}, {"id": "c"}]))
+    lanes.put("event", "event", publisher_module._Batch([{"id": "d"}]))
+    lanes.put("control", "tick", publisher_module._Batch([{"t": 1}]))
+
+    # whole entries only: tick + a + [b, c] reaches the 3-message cap
+    entries = lanes.get_batch(3, linger_s=1.0, timeout=0)
+    assert [(lane, [m.get("id", m.get("t")) for m in batch]) for lane, _, batch in entries] == \
+        [("control", [1]), ("event", ["a"]), ("event", ["b", "c"])]
+    assert [lane for lane, _, _ in lanes.get_batch(64, timeout=0)] == ["event", "log"]
+    with pytest.raises(queue.Empty):
+        lanes.get_batch(64, timeout=0)
+
+    # a short batch waits at most the linger for more
+    lanes.put("event", "event", publisher_module._Batch([{"id": "e"}]))
+    t0 = time.monotonic()
+    assert len(lanes.get_batch(64, linger_s=0.05, timeout=0)) == 1
+    assert 0.04 <= time.monotonic() - t0 < 1.0
+
+
+def test_sender_flushes_a_burst_as_separate_messages():
+    pub = TickPublisher(address="inproc://batch-test", bind=True, replay_addr="")
+    pub.send_linger_s = 0.05
+    sub = zmq.Context.instance().socket(zmq.SUB)
+    sub.connect("inproc://batch-test")
+    sub.setsockopt_string(zmq.SUBSCRIBE, "system:event")
+    try:
+        assert _wait_for(lambda: pub.subscribers("event") == 1)
+        flushes = pub._flushes
+        before = publisher_module._replay_log.last_seqs().get("system:event", 0)
+        for n in range(5):
+            pub.publish_event({"id": f"e{n}", "type": "x", "timestamp": n})
+        received = []
+        while len(received) < 5 and sub.poll(2000):
+            received.append(recv_sequenced(sub))
+        # each event is its own sequenced message, in order, from one pass
+        assert [(seq, m["id"]) for _, seq, m in received] == [(before + 1 + n, f"e{n}") for n in range(5)]
+        assert pub._flushes == flushes + 1
+        assert pub.metrics.messages_sent == 5
+    finally:
+        sub.close(linger=0)
+    pub.close()
+
+
+def test_close_leaves_the_shared_context_usable():
+    pub = TickPublisher(address="inproc://close-test", bind=True, replay_addr="")
+    other = TickPublisher(address="inproc://close-other", bind=True, replay_addr="")
+    sub = zmq.Context.instance().socket(zmq.SUB)
+    sub.connect("inproc://close-other")
+    sub.setsockopt_string(zmq.SUBSCRIBE, "system:tick")
+    try:
+        # other sockets are still open on the instance context, so terminating
+        # it here would block until they close
+        closer = threading.Thread(target=pub.close, daemon=True)
+        closer.start()
+        closer.join(timeout=3.0)
+        assert not closer.is_alive()
+        assert not zmq.Context.instance().closed
+
+        assert _wait_for(lambda: other.subscribers("tick") == 1)
+        other.publish_tick({"world_time": 1})
+        assert sub.poll(2000)
+        assert recv_sequenced(sub)[2]["data"] == {"world_time": 1}
+    finally:
+        sub.close(linger=0)
+    other.close()
+
+
+def test_ticks_missed_while_disconnected_are_replayed():
+    pub = TickPublisher(address="inproc://reconnect-test", bind=True, replay_addr="inproc://reconnect-replay")
+    filler = GapFiller("inproc://reconnect-replay")
+
+    def subscribe():
+        sub = zmq.Context.instance().socket(zmq.SUB)
+        sub.connect("inproc://reconnect-test")
+        sub.setsockopt_string(zmq.SUBSCRIBE, "system:tick")
+        assert _wait_for(lambda: pub.subscribers("tick") == 1)
+        return sub
+
+    def receive(sub, world_time):
+        pub.publish_tick({"world_time": world_time})
+        assert sub.poll(2000)
+        return [m["data"]["world_time"] for m in filler.process(*recv_sequenced(sub))]
+
+    try:
+        sub = subscribe()
+        assert [receive(sub, t) for t in (1, 2, 3)] == [[1], [2], [3]]
+        sub.close(linger=0)
+        assert _wait_for(lambda: pub.subscribers("tick") == 0)
+        skipped = pub.metrics.messages_skipped
+        for world_time in range(4, 9):
+            pub.publish_tick({"world_time": world_time})
+        assert pub.metrics.messages_skipped == skipped + 5
+
+        sub = subscribe()
+        try:
+            # the first tick after reconnecting exposes the gap; 4..8 come from replay
+            assert receive(sub, 9) == [4, 5, 6, 7, 8, 9]
+            assert (filler.recovered, filler.lost) == (5, 0)
+        finally:
+            sub.close(linger=0)
+    finally:
+        pub.close()
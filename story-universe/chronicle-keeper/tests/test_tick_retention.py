@@ -0,0 +1,89 @@
+import json
+import sqlite3
+
+import pytest
+
+from src.services.tick_retention import (
+    TickRetention,
+    enable_incremental_vacuum,
+    incremental_vacuum,
+    record_tick,
+    tick_position,
+    tick_time_at,
+)
+
+HOUR = 3600
+
+
+pytestmark = pytest.mark.test_db(name='ticks.db', schema=False, seed=[])
+
+
+def _event(conn, ts):
+    conn.execute("INSERT INTO events (timestamp, type) VALUES (?, 'character_action')", (ts,))
+
+
+def test_ticks_are_placed_in_the_event_log(db_path):
+    conn = sqlite3.connect(db_path)
+    record_tick(conn.cursor(), 1, timestamp=10)
+    _event(conn, 11)
+    _event(conn, 12)
+    record_tick(conn.cursor(), 2, timestamp=15)
+    record_tick(conn.cursor(), 3, timestamp=20)
+    conn.commit()
+    assert conn.execute('SELECT COUNT(*) FROM events').fetchone()[0] == 2
+    assert tick_position(conn, 1) == (2, 1)  # both events precede tick 2
+    assert tick_position(conn, 2) == (2, 2)
+    assert tick_position(conn, 3) is None
+    assert tick_time_at(conn, 0) == 1
+    assert tick_time_at(conn) == 3
+
+
+def test_retention_moves_legacy_ticks_and_rolls_up_old_hours(db_path):
+    conn = sqlite3.connect(db_path)
+    # legacy clock rows in `events`, interleaved with a real event
+    conn.execute("INSERT INTO events (timestamp, type, metadata) VALUES (?, 'system_tick', ?)", (HOUR, json.dumps({'world_time': 1})))
+    _event(conn, HOUR + 1)
+    conn.execute("INSERT INTO events (timestamp, type, metadata) VALUES (?, 'system_tick', ?)", (HOUR + 5, json.dumps({'world_time': 2})))
+    conn.commit()
+    for wt, ts in ((3, 2 * HOUR), (4, 2 * HOUR + 5), (5, 3 * HOUR)):
+        record_tick(conn.cursor(), wt, timestamp=ts)
+    conn.commit()
+
+    retention = TickRetention(lambda: sqlite3.connect(db_path), keep_hours=1)
+    result = retention.run_once(now=4 * HOUR + 10)
+    assert result['legacy_moved'] == 2
+    assert result['rolled_up'] == 4  # hours 1 and 2; hour 3 is inside the window
+    assert conn.execute("SELECT type FROM events").fetchall() == [('character_action',)]
+    assert conn.execute('SELECT hour_start, ticks, first_world_time, last_world_time, first_event_id, last_event_id '
+                        'FROM tick_rollups ORDER BY hour_start').fetchall() == [
+        (HOUR, 2, 1, 2, 0, 2), (2 * HOUR, 2, 3, 4, 3, 3)]
+    assert conn.execute('SELECT world_time FROM world_ticks').fetchall() == [(5,)]
+    # per-hour precision before the window, per tick inside it
+    assert tick_position(conn, 0) == (0, 0)
+    assert tick_position(conn, 3) == (3, 2)
+    assert tick_position(conn, 4) == (3, 4)
+    assert tick_time_at(conn, 2) == 2
+
+    # a later pass merges into the existing hour
+    record_tick(conn.cursor(), 6, timestamp=2 * HOUR + 10)
+    conn.commit()
+    assert retention.run_once(now=4 * HOUR + 20)['rolled_up'] == 1
+    assert conn.execute('SELECT ticks, last_world_time FROM tick_rollups WHERE hour_start = ?', (2 * HOUR,)).fetchone() == (3, 6)
+    assert retention.stats['passes'] == 2 and retention.stats['rolled_up'] == 5
+    conn.close()
+
+
+def test_incremental_vacuum_releases_pages(db_path):
+    conn = sqlite3.connect(db_path)
+    assert incremental_vacuum(conn) == 0  # auto_vacuum is off on this file
+    enable_incremental_vacuum(conn)
+    conn.executemany("INSERT INTO events (timestamp, type, description) VALUES (?, 'x', ?)",
+                     ((i, 'y' * 500) for i in range(2000)))
+    conn.commit()
+    conn.execute('DELETE FROM events')
+    conn.commit()
+    assert conn.execute('PRAGMA freelist_count').fetchone()[0] > 0
+    assert incremental_vacuum(conn, pages=10) == 10
+    assert incremental_vacuum(conn) > 0
+    assert conn.execute('PRAGMA freelist_count').fetchone()[0] == 0
+    conn.close()
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+import zmq
+
+from src import wire
+
+
+TICK = {"type": "system_tick", "tick_id": 3, "timestamp": 1.5, "data": {"world_time": 3}}
+
+
+def test_json_frames_roundtrip():
+    frames = wire.encode_frames("system:tick", TICK)
+    assert frames[:2] == [b"system:tick", b"application/json"]
+    assert wire.decode_frames(frames) == ("system:tick", TICK)
+
+
+def test_legacy_two_frame_messages_decode_as_json():
+    frames = [b"system:event", json.dumps({"id": "a"}).encode("utf-8")]
+    assert wire.decode_frames(frames) == ("system:event", {"id": "a"})
+
+
+def test_unknown_content_type_is_rejected():
+    with pytest.raises(wire.UnsupportedContentType):
+        wire.decode_frames([b"system:tick", b"application/cbor", b"\xa0"])
+    with pytest.raises(ValueError):
+        wire.decode_frames([b"system:tick"])
+
+
+def test_unavailable_codec_falls_back_to_json(monkeypatch):
+    monkeypatch.delitem(wire.CODECS, wire.MSGPACK, raising=False)
+    assert wire.get_codec("msgpack") is wire.JSON_CODEC
+    assert wire.get_codec("nonsense") is wire.JSON_CODEC
+
+
+def test_msgpack_roundtrip():
+    pytest.importorskip("msgpack")
+    codec = wire.get_codec("msgpack")
+    frames = wire.encode_frames("system:tick", TICK, codec)
+    assert frames[1] == b"application/msgpack"
+    assert len(frames[2]) < len(wire.JSON_CODEC.encode(TICK))
+    assert wire.decode_frames(frames) == ("system:tick", TICK)
+
+
+def test_recv_message_over_socket():
+    ctx = zmq.Context()
+    try:
+        a, b = ctx.socket(zmq.PAIR), ctx.socket(zmq.PAIR)
+        a.bind("inproc://wire-test")
+        b.connect("inproc://wire-test")
+        a.send_multipart(wire.encode_frames("system:tick", TICK))
+        assert b.poll(1000)
+        assert wire.recv_message(b) == ("system:tick", TICK)
+        a.close(linger=0)
+        b.close(linger=0)
+    finally:
+        ctx.term()
+
+
+def test_sequence_frame_roundtrip():
+    frames = wire.encode_frames("system:tick", TICK, seq=42)
+    assert len(frames) == 4
+    assert wire.decode_sequenced(frames) == ("system:tick", 42, TICK)
+    assert wire.decode_frames(frames) == ("system:tick", TICK)
+    assert wire.decode_sequenced(frames[:3])[1] is None
+
+
+def test_sequence_tracker_reports_gaps_and_restarts():
+    tracker = wire.SequenceTracker()
+    assert tracker.observe("system:tick", 5) is None  # baseline
+    assert tracker.observe("system:tick", 6) is None
+    assert tracker.observe("system:tick", 10) == (7, 9)
+    assert tracker.observe("system:event", 3) is None  # topics are independent
+    assert tracker.observe("system:tick", 1) is None  # publisher restarted
+    assert tracker.observe("system:tick", 3) == (2, 2)
+    assert (tracker.gaps, tracker.missed, tracker.restarts) == (2, 4, 1)
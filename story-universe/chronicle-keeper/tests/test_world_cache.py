@@ -0,0 +1,69 @@
+import sqlite3
+from pathlib import Path
+
+from src.services.continuity import ContinuityValidator
+
+
+def _make_conn():
+    schema_path = Path(__file__).resolve().parents[1] / 'src' / 'db' / 'schema.sql'
+    conn = sqlite3.connect(':memory:')
+    conn.executescript(schema_path.read_text(encoding='utf-8'))
+    c = conn.cursor()
+    c.execute('INSERT INTO characters (id, name, age, traits, location_id, status) VALUES (1, ?, 30, ?, 100, ?)', ('Tester', '[]', 'alive'))
+    c.execute('INSERT INTO locations (id, name) VALUES (100, ?)', ('Town',))
+    c.execute('INSERT INTO locations (id, name) VALUES (200, ?)', ('Forest',))
+    c.execute('INSERT INTO factions (id, name) VALUES (1, ?)', ('A',))
+    c.execute('INSERT INTO factions (id, name) VALUES (2, ?)', ('B',))
+    conn.commit()
+    return conn
+
+
+def test_state_loaded_once_across_validations():
+    conn = _make_conn()
+    v = ContinuityValidator(db_conn_getter=lambda: conn)
+    for _ in range(5):
+        ok, _ = v.validate_event({'type': 'character_action', 'character_id': '1', 'location_id': '100'})
+        assert ok
+    assert v.cache.loads == 1
+
+
+def test_applied_consequences_patch_cache_without_reload():
+    conn = _make_conn()
+    v = ContinuityValidator(db_conn_getter=lambda: conn)
+    v.validate_event({'type': 'character_action', 'character_id': '1'})
+    version = v.cache.version
+
+    v.apply_event_consequences({'type': 'character_state_change', 'character_id': '1', 'new_status': 'dead'}, db_conn=conn)
+    ok, reason = v.validate_event({'type': 'character_action', 'character_id': '1', 'action': 'attack'})
+    assert not ok and 'dead' in reason.lower()
+
+    # attack creates a hostile relationship row with an active cooldown
+    attack = {'type': 'faction_event', 'source_faction_id': 1, 'target_faction_id': 2, 'action': 'attack'}
+    assert v.validate_event(attack)[0]
+    v.apply_event_consequences(attack, db_conn=conn)
+    ok, reason = v.validate_event(attack)
+    assert not ok and 'cooldown' in reason
+
+    assert v.cache.loads == 1
+    assert v.cache.version > version
+
+
+def test_reload_picks_up_out_of_band_writes():
+    conn = _make_conn()
+    v = ContinuityValidator(db_conn_getter=lambda: conn)
+    assert v.validate_event({'type': 'character_action', 'character_id': '1', 'location_id': '200'})[0]
+
+    conn.execute('UPDATE locations SET locked = 1 WHERE id = 200')
+    conn.commit()
+    # stale until refreshed
+    assert v.validate_event({'type': 'character_action', 'character_id': '1', 'location_id': '200'})[0]
+
+    v.cache.refresh_location(200, conn=conn)
+    ok, reason = v.validate_event({'type': 'character_action', 'character_id': '1', 'location_id': '200'})
+    assert not ok and 'locked' in reason
+
+    conn.execute('UPDATE locations SET locked = 0 WHERE id = 200')
+    conn.commit()
+    v.reload_state()
+    assert v.validate_event({'type': 'character_action', 'character_id': '1', 'location_id': '200'})[0]
+    assert v.cache.loads == 2
@@ -0,0 +1,93 @@
+import json
+import sqlite3
+
+import pytest
+
+from src.db.database import get_connection
+from src.services.continuity import ContinuityValidator
+from src.services.event_store import take_snapshot
+from src.services.ingest_queue import IngestWriter
+from src.services.tick_retention import record_tick, rollup_ticks
+from src.services.world_history import HistoryUnavailable, WorldHistory
+
+pytestmark = pytest.mark.test_db(name='history.db', extra=[('INSERT INTO locations (id, name) VALUES (200, ?)', ('Forest',))])
+
+
+def _tick(db_path, world_time):
+    # same rows the world clock writes
+    conn = sqlite3.connect(db_path)
+    conn.execute("REPLACE INTO system_state (key, value) VALUES ('time', ?)", (str(world_time),))
+    record_tick(conn.cursor(), world_time, timestamp=36000 + world_time)
+    conn.commit()
+    conn.close()
+
+
+def _move(db_path, location_id):
+    getter = lambda: get_connection(db_path)
+    writer = IngestWriter(ContinuityValidator(db_conn_getter=getter), getter, flush_ms=0)
+    res = writer.submit({'type': 'character_action', 'timestamp': 1, 'character_id': '1',
+                         'action': 'move', 'location_id': location_id}).result(timeout=5)
+    writer.stop()
+    assert res['status'] == 'accepted'
+
+
+@pytest.fixture
+def history(db_path):
+    conn = sqlite3.connect(db_path)
+    take_snapshot(conn)
+    conn.close()
+    _tick(db_path, 1)
+    _move(db_path, '200')
+    _tick(db_path, 2)
+    _move(db_path, '100')
+    _tick(db_path, 3)
+    return WorldHistory(lambda: get_connection(db_path), cache_size=2)
+
+
+def _location(body):
+    return json.loads(body)['characters']['1']['location_id']
+
+
+def test_state_as_of_world_time(history):
+    info, body = history.state_as_of(0)
+    assert _location(body) == 100 and json.loads(body)['system']['time'] == '0'
+    info, body = history.state_as_of(1)
+    assert _location(body) == 200 and json.loads(body)['system']['time'] == '1'
+    assert info['replayed'] == 1 and info['world_time'] == 1
+    assert _location(history.state_as_of(2)[1]) == 100
+    # nothing has happened after world time 3 yet: the live state answers
+    assert history.state_as_of(3) is None
+
+
+def test_repeated_queries_hit_the_lru_cache(history):
+    history.state_as_of(1)
+    history.state_as_of(1)
+    history.state_as_of(0)
+    history.state_as_of(2)
+    stats = history.get_stats()
+    assert stats['hits'] == 1 and stats['misses'] == 3
+    assert stats['cached'] == 2
+    history.state_as_of(1)  # evicted as least recently used
+    assert history.get_stats()['misses'] == 4
+
+
+def test_time_before_every_snapshot_is_unavailable(db_path):
+    _tick(db_path, 1)
+    _move(db_path, '200')
+    conn = sqlite3.connect(db_path)
+    take_snapshot(conn)
+    conn.close()
+    _tick(db_path, 2)
+    history = WorldHistory(lambda: get_connection(db_path))
+    with pytest.raises(HistoryUnavailable):
+        history.state_as_of(0)
+    assert _location(history.state_as_of(1)[1]) == 200
+
+
+def test_rolled_up_hours_answer_from_the_hour_start(history, db_path):
+    conn = sqlite3.connect(db_path)
+    assert rollup_ticks(conn, keep_hours=0, now=10 ** 10) == 3
+    conn.close()
+    # only the hour's first tick is placed exactly: the state before it
+    info, body = history.state_as_of(2)
+    assert info['world_time'] == 0 and _location(body) == 100
@@ -0,0 +1,118 @@
+import json
+import sqlite3
+
+import pytest
+
+from src.db.database import close_all_connections, get_pool
+from src.services.world_state import ResyncRequired, WorldStateView, apply_changes
+
+
+pytestmark = pytest.mark.test_db(name='world.db', extra=[('INSERT INTO factions (id, name) VALUES (1, ?)', ('A',))])
+
+
+def _write(db_path, sql, *args):
+    conn = sqlite3.connect(db_path)
+    conn.execute(sql, args)
+    conn.commit()
+    conn.close()
+
+
+def test_unchanged_polls_reuse_the_serialized_body(db_path):
+    view = WorldStateView(lambda: get_pool(db_path).open_dedicated())
+    version, body = view.current()
+    assert json.loads(body)['characters']['1']['name'] == 'Tester'
+    for _ in range(10):
+        v, b = view.current()
+        assert v == version and b is body
+    assert view.stats['rebuilds'] == 1
+    assert view.stats['hits'] == 10
+
+
+def test_committed_change_bumps_version_once(db_path):
+    view = WorldStateView(lambda: get_pool(db_path).open_dedicated())
+    version, _ = view.current()
+
+    _write(db_path, 'UPDATE characters SET location_id = 200 WHERE id = 1')
+    v1, body = view.current()
+    assert v1 == version + 1
+    assert json.loads(body)['characters']['1']['location_id'] == 200
+    assert view.current()[0] == v1
+
+    # a commit that leaves the world as it was rebuilds but keeps the version
+    _write(db_path, 'UPDATE characters SET location_id = 200 WHERE id = 1')
+    assert view.current()[0] == v1
+
+
+def test_clock_and_log_commits_skip_the_rebuild(db_path):
+    view = WorldStateView(lambda: get_pool(db_path).open_dedicated())
+    version, body = view.current()
+
+    # what the clock's write-behind flush and the ingest log commit
+    _write(db_path, "REPLACE INTO system_state (key, value) VALUES ('time', ?)", '7')
+    _write(db_path, "REPLACE INTO system_state (key, value) VALUES ('time_lease', ?)", '19')
+    _write(db_path, "INSERT INTO events (timestamp, type) VALUES (1, 'character_action')")
+    v, b = view.current()
+    assert v == version and b is body
+    assert view.stats['rebuilds'] == 1 and view.stats['unrelated_commits'] == 1
+    assert 'time' not in json.loads(b)['system']
+
+    _write(db_path, "REPLACE INTO system_state (key, value) VALUES ('weather', ?)", 'rain')
+    v, b = view.current()
+    assert v == version + 1 and json.loads(b)['system'] == {'weather': 'rain'}
+
+
+def test_faction_runtime_tables_are_part_of_the_snapshot(db_path):
+    view = WorldStateView(lambda: get_pool(db_path).open_dedicated())
+    version, _ = view.current()
+    _write(db_path, 'INSERT INTO faction_metrics (faction_id, trust, power, resources, influence) VALUES (1, 0.9, 3, 4, 5)')
+    v1, body = view.current()
+    assert v1 > version
+    assert json.loads(body)['factions']['1']['metrics']['power'] == 3
+
+
+def test_reopens_after_pool_shutdown(db_path):
+    view = WorldStateView(lambda: get_pool(db_path).open_dedicated())
+    version, _ = view.current()
+    close_all_connections(db_path)
+    _write(db_path, 'UPDATE locations SET name = ? WHERE id = 100', 'Harbour')
+    v1, body = view.current()
+    assert v1 == version + 1
+    assert json.loads(body)['locations']['100']['name'] == 'Harbour'
+
+
+def test_changes_since_returns_entity_deltas(db_path):
+    view = WorldStateView(lambda: get_pool(db_path).open_dedicated())
+    base, _ = view.snapshot()
+    replica = json.loads(view.current()[1])
+
+    _write(db_path, 'UPDATE characters SET location_id = 200 WHERE id = 1')
+    view.current()
+    _write(db_path, 'INSERT INTO faction_cooldowns (faction_id, cooldown_key, until_ts) VALUES (1, ?, 50)', 'raid')
+    _write(db_path, 'DELETE FROM locations WHERE id = 100')
+    version, changes = view.changes_since(base)
+
+    assert version == base + 2
+    assert [c['version'] for c in changes] == sorted(c['version'] for c in changes)
+    ops = {(c['op'], c['entity'], c['id']) for c in changes}
+    assert ('upsert', 'characters', '1') in ops
+    assert ('upsert', 'faction_cooldowns', '1:raid') in ops
+    assert ('delete', 'locations', '100') in ops
+    assert view.changes_since(version) == (version, [])
+
+    # replaying the feed on the client's copy reproduces the snapshot
+    assert apply_changes(replica, changes) == json.loads(view.current()[1])
+
+
+def test_changes_since_outside_history_requires_resync(db_path):
+    view = WorldStateView(lambda: get_pool(db_path).open_dedicated(), history=2)
+    base, _ = view.current()
+    for name in ('a', 'b', 'c'):
+        _write(db_path, 'UPDATE locations SET name = ? WHERE id = 100', name)
+        view.current()
+    with pytest.raises(ResyncRequired):
+        view.changes_since(base)
+    with pytest.raises(ResyncRequired):
+        view.changes_since(base + 10)
+    version, changes = view.changes_since(base + 1)
+    assert version == base + 3
+    assert [c['data']['name'] for c in changes] == ['b', 'c']
@@ -0,0 +1,109 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+TEST_DB_PATH = os.environ["CHRONICLE_KEEPER_DB_PATH"]
+from src.db.test_db_setup import setup_test_db, teardown_test_db
+from src.messaging.ws_gateway import ClientChannel, EventGateway, SubscriptionFilter
+from src.models.canonical_event import CanonicalEvent
+
+
+def test_filter_matches_types_participants_and_correlation():
+    flt = SubscriptionFilter.from_params(event_type="character_action,combat", character_id="7")
+    assert flt.matches({"type": "combat", "source_id": "7", "target_id": "8"})
+    assert flt.matches({"type": "character_action", "involved_characters": "[3, 7]"})
+    assert not flt.matches({"type": "combat", "character_id": "8"})
+    assert not flt.matches({"type": "system_tick"})
+
+    def event(correlation_id):
+        return CanonicalEvent(id="evt_1", type="x", timestamp=1, location_id=100,
+                              metadata={"correlationId": correlation_id}).model_dump()
+
+    by_corr = SubscriptionFilter.from_params(correlation_id="corr_1", location_id="100")
+    assert by_corr.matches(event("corr_1"))
+    assert not by_corr.matches(event("corr_2"))
+    assert not by_corr.matches(event(None))
+    assert SubscriptionFilter().matches({"type": "anything"})
+
+
+def test_channel_policies_bound_the_buffer():
+    async def scenario():
+        oldest = ClientChannel(SubscriptionFilter(), "drop_oldest", 3)
+        newest = ClientChannel(SubscriptionFilter(), "drop_newest", 3)
+        for i in range(5):
+            oldest.offer(str(i))
+            newest.offer(str(i))
+        coalesce = ClientChannel(SubscriptionFilter(), "coalesce", 3)
+        for msg, key in [("e1", None), ("t1", "tick"), ("t2", "tick"), ("e2", None), ("t3", "tick")]:
+            coalesce.offer(msg, key)
+        return await oldest.drain(), await newest.drain(), await coalesce.drain(), oldest, coalesce
+
+    a, b, c, oldest, coalesce = asyncio.run(scenario())
+    assert a == ["2", "3", "4"] and oldest.stats["dropped"] == 2
+    assert b == ["0", "1", "2"]
+    assert c == ["e1", "e2", "t3"] and coalesce.stats["coalesced"] == 2
+    with pytest.raises(ValueError):
+        ClientChannel(SubscriptionFilter(), "block")
+
+
+def test_slow_client_does_not_hold_back_others():
+    async def scenario():
+        gateway = EventGateway(maxsize=4)
+        slow = gateway.open(SubscriptionFilter())
+        fast = gateway.open(SubscriptionFilter(), maxsize=1000)
+        received = []
+
+        async def reader():
+            while len(received) < 100:
+                received.extend(await fast.drain())
+
+        task = asyncio.create_task(reader())
+        for i in range(100):
+            gateway.on_publish("system:event", [{"type": "t", "n": i}])
+            await asyncio.sleep(0)
+        await asyncio.wait_for(task, 2)
+        gateway.detach()
+        return received, len(slow), slow.stats["dropped"], gateway
+
+    received, backlog, dropped, gateway = asyncio.run(scenario())
+    assert [json.loads(m)["data"]["n"] for m in received] == list(range(100))
+    assert backlog == 4 and dropped == 96
+    assert gateway.get_stats()["received"] == 100
+
+
+@pytest.fixture
+def client():
+    setup_test_db(TEST_DB_PATH)
+    from fastapi.testclient import TestClient
+    from src.main import app
+    with TestClient(app) as c:
+        yield c
+    teardown_test_db(TEST_DB_PATH)
+
+
+def test_websocket_receives_only_matching_events(client):
+    with client.websocket_connect("/ws/events?character_id=ws1&policy=coalesce&buffer=8") as ws:
+        hello = ws.receive_json()
+        assert hello["topic"] == "control"
+        assert hello["data"]["subscribed"]["character_id"] == ["ws1"]
+        assert hello["data"]["policy"] == "coalesce"
+
+        for cid in ("ws2", "ws1"):
+            r = client.post("/event", json={"type": "character_action", "timestamp": 9999999999,
+                                            "character_id": cid, "location_id": "100"})
+            assert r.json()["status"] == "accepted"
+        msg = ws.receive_json()
+        assert msg["topic"] == "system:event"
+        assert msg["data"]["character_id"] == "ws1"
+
+        ws.send_text(json.dumps({"subscribe": {"character_id": ["ws2"]}}))
+        assert ws.receive_json()["data"]["subscribed"]["character_id"] == ["ws2"]
+
+
+def test_websocket_rejects_unknown_policy(client):
+    from starlette.websockets import WebSocketDisconnect
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect("/ws/events?policy=block") as ws:
+            ws.receive_json()
@@ -9,14 +9,19 @@ Implements lightweight logic for:
 
 This is a scaffold intended for iterative improvement.
 """
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import time
 import random
+import threading
 import requests
 import json
 import os
 import csv
 from pathlib import Path
+try:
+    from ids import new_id
+except ImportError:
+    from src.ids import new_id
 try:
     from generators.character_gen import CharacterManager
 except Exception:
@@ -46,6 +51,10 @@ except Exception:
 
 STATE_FILE = os.path.join(os.path.dirname(__file__), "engine_state.json")
 
+# Name this engine acks ticks under (POST /world/clock/ack) and the most acks per second
+TICK_CONSUMER = os.environ.get("NARRATIVE_CONSUMER_ID", "narrative-engine")
+ACK_MIN_INTERVAL = float(os.environ.get("NARRATIVE_ACK_MIN_INTERVAL_S", "1.0"))
+
 
 def load_state() -> Dict[str, Any]:
     if os.path.exists(STATE_FILE):
@@ -94,24 +103,41 @@ class NarrativeEngine:
             self.planner = None
         # local faction name lookup (fallback when Pi has no factions)
         self.local_factions = self._load_local_faction_names()
+        # last /world/state body and its ETag, reused on 304
+        self._world_state: Optional[Dict[str, Any]] = None
+        self._world_etag: Optional[str] = None
+        # last tick acked to the Pi's clock; a throttled watermark waits in
+        # `_ack_pending` for the timer that sends it once the interval has passed
+        self._last_ack = 0.0
+        self._ack_pending: Optional[int] = None
+        self._ack_timer: Optional[threading.Timer] = None
+        self._ack_lock = threading.Lock()
 
     # ----------------------
     # Pi queries
     # ----------------------
     def fetch_world_state(self) -> Dict[str, Any]:
+        # conditional GET: the Pi answers 304 while the world version is unchanged
+        headers = {"If-None-Match": self._world_etag} if self._world_etag else {}
         try:
-            r = requests.get(f"{self.pi}/world/state", timeout=5)
+            r = requests.get(f"{self.pi}/world/state", timeout=5, headers=headers)
+            if getattr(r, "status_code", None) == 304 and self._world_state is not None:
+                return self._world_state
             if r.ok:
-                return r.json()
+                self._world_state = r.json()
+                self._world_etag = (getattr(r, "headers", None) or {}).get("ETag")
+                return self._world_state
         except Exception:
             pass
         return {}
 
     def fetch_recent_events(self, limit: int = 50) -> List[Dict[str, Any]]:
         try:
-            r = requests.get(f"{self.pi}/world/events/recent?limit={limit}", timeout=5)
+            # view=events returns the canonical events straight from storage
+            r = requests.get(f"{self.pi}/world/events/recent?limit={limit}&view=events", timeout=5)
             if r.ok:
-                return r.json().get("events", [])
+                body = r.json()
+                return body if isinstance(body, list) else body.get("events", [])
         except Exception:
             pass
         return []
@@ -573,7 +599,7 @@ class NarrativeEngine:
     # Arc management
     # ----------------------
     def _start_new_arc(self, arc_type: str, characters: List[str]) -> Dict[str, Any]:
-        arc = {"id": f"arc_{int(time.time())}_{random.randint(0,9999)}", "arc": arc_type, "characters": characters, "progress": 0, "created_at": int(time.time())}
+        arc = {"id": new_id("arc"), "arc": arc_type, "characters": characters, "progress": 0, "created_at": int(time.time())}
         self.arcs.append(arc)
         return arc
 
@@ -641,7 +667,7 @@ class NarrativeEngine:
                     etype = suggested.get('type')
                     if etype and self._allowed_by_cooldown(etype):
                         # adopt planner event
-                        suggested['id'] = f"evt_{int(time.time())}_{random.randint(0,9999)}"
+                        suggested['id'] = new_id()
                         suggested['timestamp'] = int(time.time())
                         self._set_cooldown(etype, seconds=30)
                         self.last_event = suggested
@@ -845,7 +871,7 @@ class NarrativeEngine:
                 break
         # if no arc, create a lightweight correlation id per-event
         if not correlation:
-            correlation = f"corr_{int(time.time())}_{random.randint(0,9999)}"
+            correlation = new_id("corr")
 
         event.setdefault("metadata", {})
         # preserve existing metadata if present
@@ -857,7 +883,7 @@ class NarrativeEngine:
         event["source"] = "narrative_engine"
 
         # update last_event and save state
-        event_id = f"evt_{int(time.time())}_{random.randint(0,9999)}"
+        event_id = new_id()
         event["id"] = event_id
         event["timestamp"] = int(time.time())
 
@@ -871,6 +897,54 @@ class NarrativeEngine:
     # Send to Pi
     # ----------------------
     def send_event(self, event: Dict[str, Any]) -> bool:
+        if not self._should_send(event):
+            return False
+
+        try:
+            r = requests.post(f"{self.pi}/event", json=event, timeout=5)
+            return r.ok
+        except Exception:
+            return False
+
+    def ack_tick(self, tick: Dict[str, Any]) -> bool:
+        """Tell the Pi this tick is fully processed; its clock slows down while we lag.
+
+        Acks are watermarks, sent at most once per `ACK_MIN_INTERVAL`. The
+        throttle is trailing: a throttled watermark is sent when the interval
+        has passed, even if no further tick arrives to carry it. Returns True
+        only when this call sent the ack itself.
+        """
+        world_time = (tick.get("data") or {}).get("world_time")
+        if world_time is None:
+            return False
+        with self._ack_lock:
+            if self._ack_pending is None or world_time > self._ack_pending:
+                self._ack_pending = world_time
+            wait = self._last_ack + ACK_MIN_INTERVAL - time.time()
+            if wait > 0:
+                if self._ack_timer is None:
+                    self._ack_timer = threading.Timer(wait, self._send_ack)
+                    self._ack_timer.daemon = True
+                    self._ack_timer.start()
+                return False
+        return self._send_ack()
+
+    def _send_ack(self) -> bool:
+        """Post the newest pending watermark to the Pi's clock."""
+        with self._ack_lock:
+            self._ack_timer = None
+            world_time, self._ack_pending = self._ack_pending, None
+            if world_time is None:
+                return False
+            self._last_ack = time.time()
+        try:
+            r = requests.post(f"{self.pi}/world/clock/ack",
+                              json={"consumer": TICK_CONSUMER, "world_time": world_time}, timeout=2)
+            return r.ok
+        except Exception:
+            return False
+
+    def _should_send(self, event: Dict[str, Any]) -> bool:
         # Simple pre-send validation: avoid sending empty narrative events
         etype = event.get("type", "")
         # allow system events to pass
@@ -886,12 +960,47 @@ class NarrativeEngine:
                 except Exception:
                     pass
                 return False
+        return True
+
+    def process_ticks(self, ticks: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], bool]]:
+        """Generate one event per tick and send them to the Pi in one batch.
+
+        Ticks recovered after a gap arrive together, so catching up costs one
+        request instead of one per missed tick. The newest tick is acked once
+        the batch is sent. Returns `(event, sent)` pairs.
+        """
+        events = [ev for ev in (self.generate_event() for _ in ticks) if ev]
+        results = list(zip(events, self.send_events(events))) if events else []
+        if ticks:
+            self.ack_tick(ticks[-1])
+        return results
+
+    def send_events(self, events: List[Dict[str, Any]]) -> List[bool]:
+        """Send several events in one request to `/events/batch`.
 
+        Returns one flag per event (True if the Pi accepted it). Falls back to
+        per-event `send_event` when the Pi predates the batch endpoint.
+        """
+        sent = [False] * len(events)
+        todo = [i for i, ev in enumerate(events) if self._should_send(ev)]
+        if not todo:
+            return sent
         try:
-            r = requests.post(f"{self.pi}/event", json=event, timeout=5)
-            return r.ok
+            r = requests.post(f"{self.pi}/events/batch", json=[events[i] for i in todo], timeout=10)
         except Exception:
-            return False
+            return sent
+        if r.status_code in (404, 405):
+            for i in todo:
+                sent[i] = self.send_event(events[i])
+            return sent
+        if not r.ok:
+            return sent
+        try:
+            for i, res in zip(todo, r.json().get("results", [])):
+                sent[i] = res.get("status") == "accepted"
+        except Exception:
+            pass
+        return sent
 
 
 if __name__ == "__main__":
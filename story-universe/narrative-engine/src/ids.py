@@ -0,0 +1,16 @@
+"""Shim for the shared id generator.
+Re-exports shared.ids, putting the story-universe root on sys.path when
+the service is run from its own directory.
+"""
+import sys
+from pathlib import Path
+
+# `shared/` sits at the story-universe root next to this service, or in the
+# service root itself when the container image copies it in
+for _base in Path(__file__).resolve().parents[1:3]:
+    if (_base / "shared" / "ids.py").is_file():
+        if str(_base) not in sys.path:
+            sys.path.insert(0, str(_base))
+        break
+
+from shared.ids import IdGenerator, default_node_id, new_id
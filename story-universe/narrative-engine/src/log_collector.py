@@ -1,7 +1,8 @@
 # Evo-X2 Log Collector (ZeroMQ SUB)
 import zmq
 import json
-from src.config import ZMQ_PUB_CLIENT_ADDR
+from src.config import ZMQ_PUB_CLIENT_ADDR, ZMQ_REPLAY_CLIENT_ADDR
+from src.wire import GapFiller, recv_sequenced
 
 LOG_FILE = "central_logs.txt"
 
@@ -9,12 +10,14 @@ context = zmq.Context()
 socket = context.socket(zmq.SUB)
 socket.connect(ZMQ_PUB_CLIENT_ADDR)  # Pi's PUB address (from config)
 socket.setsockopt_string(zmq.SUBSCRIBE, "")
+gaps = GapFiller(ZMQ_REPLAY_CLIENT_ADDR)
 
 print("[Evo-X2] Central log collector started. Waiting for logs...")
 
 with open(LOG_FILE, "a") as f:
     while True:
-        msg = socket.recv_json()
-        f.write(json.dumps(msg) + "\n")
+        topic, seq, received = recv_sequenced(socket)
+        for msg in gaps.process(topic, seq, received):
+            f.write(json.dumps({"topic": topic, **msg}) + "\n")
+            print(f"[LOG] {msg}")
         f.flush()
-        print(f"[LOG] {msg}")
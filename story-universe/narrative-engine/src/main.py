@@ -10,12 +10,17 @@ Environment variables:
     CHRONICLE_BASE_URL - base URL for the Chronicle Keeper (default http://127.0.0.1:8001)
     USE_ZMQ_TICKS - if set to '1', try to subscribe to Pi ticks via ZeroMQ
     TICK_INTERVAL - fallback interval in seconds when not using ZMQ (default 5)
+    ZMQ_REPLAY_CLIENT_ADDR - keeper replay channel for ticks missed while disconnected (default tcp://127.0.0.1:5556)
 """
 import os
 import time
 import logging
 
 from event_generator import NarrativeEngine
+try:
+    from wire import GapFiller, recv_sequenced
+except ImportError:
+    from src.wire import GapFiller, recv_sequenced
 
 
 LOG = logging.getLogger("narrative-engine")
@@ -35,7 +40,7 @@ def run_interval_mode(engine: NarrativeEngine, interval: int = 5):
         LOG.info("Interrupted, exiting")
 
 
-def run_zmq_mode(engine: NarrativeEngine, zmq_addr: str):
+def run_zmq_mode(engine: NarrativeEngine, zmq_addr: str, replay_addr: str = None):
     try:
         import zmq
     except Exception:
@@ -46,16 +51,23 @@ def run_zmq_mode(engine: NarrativeEngine, zmq_addr: str):
     ctx = zmq.Context()
     sock = ctx.socket(zmq.SUB)
     sock.connect(zmq_addr)
-    sock.setsockopt_string(zmq.SUBSCRIBE, "")
+    # events share the socket under "system:event"; only ticks drive generation
+    sock.setsockopt_string(zmq.SUBSCRIBE, "system:tick")
+    gaps = GapFiller(replay_addr)
 
     try:
         while True:
-            msg = sock.recv_json()
-            # Expected tick message; we generate one event per tick
-            LOG.info("Received tick: %s", msg)
-            ev = engine.generate_event()
-            if ev:
-                sent = engine.send_event(ev)
+            try:
+                topic, seq, received = recv_sequenced(sock)
+            except ValueError as e:
+                LOG.warning("Dropping undecodable message: %s", e)
+                continue
+            # ticks skipped since the last one (recovered over the replay channel) come first
+            ticks = gaps.process(topic, seq, received)
+            for msg in ticks:
+                LOG.info("Received tick: %s", msg)
+            # one event per tick, sent as one batch
+            for ev, sent in engine.process_ticks(ticks):
                 LOG.info("Generated event %s sent=%s", ev.get("id"), sent)
     except KeyboardInterrupt:
         LOG.info("Interrupted, exiting ZMQ loop")
@@ -66,11 +78,12 @@ def main():
     use_zmq = os.getenv("USE_ZMQ_TICKS", "0") == "1"
     tick_interval = int(os.getenv("TICK_INTERVAL", "5"))
     zmq_addr = os.getenv("ZMQ_PUB_CLIENT_ADDR", f"tcp://127.0.0.1:5555")
+    replay_addr = os.getenv("ZMQ_REPLAY_CLIENT_ADDR", "tcp://127.0.0.1:5556")
 
     engine = NarrativeEngine(pi_base_url=base)
 
     if use_zmq:
-        run_zmq_mode(engine, zmq_addr)
+        run_zmq_mode(engine, zmq_addr, replay_addr)
     else:
         run_interval_mode(engine, tick_interval)
 
@@ -9,8 +9,9 @@ import logging
 
 def main():
     import zmq
-    from src.config import ZMQ_SUB_ADDR
+    from src.config import ZMQ_REPLAY_CLIENT_ADDR, ZMQ_SUB_ADDR
     from src.event_generator import NarrativeEngine
+    from src.wire import GapFiller, recv_sequenced
 
     logging.basicConfig(level=logging.INFO)
     log = logging.getLogger("tick-subscriber")
@@ -22,7 +23,10 @@ def main():
     sock = ctx.socket(zmq.SUB)
     log.info("Connecting to tick publisher at %s", addr)
     sock.connect(addr)
-    sock.setsockopt_string(zmq.SUBSCRIBE, "")
+    sock.setsockopt_string(zmq.SUBSCRIBE, "system:tick")
+
+    # ticks missed while disconnected are fetched from the keeper's replay channel
+    gaps = GapFiller(ZMQ_REPLAY_CLIENT_ADDR)
 
     poller = zmq.Poller()
     poller.register(sock, zmq.POLLIN)
@@ -32,14 +36,20 @@ def main():
         while True:
             socks = dict(poller.poll(1000))
             if sock in socks and socks[sock] == zmq.POLLIN:
-                msg = sock.recv_json()
-                log.info("Received tick: %s", msg)
-                # Only react to system_tick messages
-                if msg.get("type") == "system_tick":
-                    ev = engine.generate_event()
-                    if ev:
-                        sent = engine.send_event(ev)
-                        log.info("Generated event %s sent=%s", ev.get("id"), sent)
+                try:
+                    topic, seq, received = recv_sequenced(sock)
+                except ValueError as e:
+                    log.warning("Dropping undecodable message: %s", e)
+                    continue
+                ticks = []
+                for msg in gaps.process(topic, seq, received):
+                    log.info("Received tick: %s", msg)
+                    # Only react to system_tick messages
+                    if msg.get("type") == "system_tick":
+                        ticks.append(msg)
+                # recovered ticks and the current one go to the Pi as one batch
+                for ev, sent in engine.process_ticks(ticks):
+                    log.info("Generated event %s sent=%s", ev.get("id"), sent)
             else:
                 # periodic maintenance: advance arcs and save state
                 engine._advance_arcs()
@@ -8,6 +8,7 @@ from src.event_generator import NarrativeEngine
 class FakeResponse:
     def __init__(self, ok=True, json_data=None):
         self.ok = ok
+        self.status_code = 200 if ok else 500
         self._json = json_data or {}
 
     def json(self):
@@ -58,5 +59,47 @@ class TestNarrativeEngine(unittest.TestCase):
                 self.assertTrue(cg.get('progress', 0) >= 0)
 
 
+    def test_throttled_ack_is_sent_once_the_interval_passes(self):
+        posted = []
+
+        def fake_post(url, json=None, timeout=2):
+            posted.append(json['world_time'])
+            return FakeResponse(ok=True)
+
+        with patch('src.event_generator.requests.get', side_effect=Exception('no pi')), \
+                patch('src.event_generator.requests.post', side_effect=fake_post), \
+                patch('src.event_generator.ACK_MIN_INTERVAL', 0.05):
+            eng = NarrativeEngine(pi_base_url='http://localhost:9999')
+            self.assertTrue(eng.ack_tick({'data': {'world_time': 1}}))
+            self.assertFalse(eng.ack_tick({'data': {'world_time': 2}}))
+            self.assertFalse(eng.ack_tick({'data': {'world_time': 3}}))
+            self.assertEqual(posted, [1])
+            # no further tick arrives, yet the newest watermark still goes out
+            time.sleep(0.2)
+            self.assertEqual(posted, [1, 3])
+
+
+    def test_recovered_ticks_are_sent_as_one_batch(self):
+        posted = []
+
+        def fake_post(url, json=None, timeout=5):
+            posted.append((url.rsplit('/', 2)[-2:], json))
+            if url.endswith('/events/batch'):
+                return FakeResponse(ok=True, json_data={'results': [{'status': 'accepted'} for _ in json]})
+            return FakeResponse(ok=True)
+
+        with patch('src.event_generator.requests.get', side_effect=Exception('no pi')), \
+                patch('src.event_generator.requests.post', side_effect=fake_post):
+            eng = NarrativeEngine(pi_base_url='http://localhost:9999')
+            eng._should_send = lambda ev: True
+            ticks = [{'type': 'system_tick', 'data': {'world_time': t}} for t in (4, 5, 6)]
+            results = eng.process_ticks(ticks)
+        self.assertEqual([sent for _, sent in results], [True, True, True])
+        (batch_url, batch), (ack_url, ack) = posted
+        self.assertEqual(batch_url, ['events', 'batch'])
+        self.assertEqual([ev['id'] for ev in batch], [ev['id'] for ev, _ in results])
+        self.assertEqual((ack_url, ack['world_time']), (['clock', 'ack'], 6))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1 @@
+"""Modules shared by the Story Universe services: config, wire codecs, ids."""
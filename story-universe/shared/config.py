@@ -19,6 +19,10 @@ ZMQ_PORT = int(os.getenv("ZMQ_PORT", "5555"))
 ZMQ_PUB_BIND_ADDR = os.getenv("ZMQ_PUB_BIND_ADDR", f"tcp://*:{ZMQ_PORT}")
 ZMQ_PUB_CLIENT_ADDR = os.getenv("ZMQ_PUB_CLIENT_ADDR", f"tcp://{CHRONICLE_IP}:{ZMQ_PORT}")
 ZMQ_SUB_ADDR = os.getenv("ZMQ_SUB_ADDR", ZMQ_PUB_CLIENT_ADDR)
+# Request/reply side channel for fetching missed stream messages by sequence
+ZMQ_REPLAY_PORT = int(os.getenv("ZMQ_REPLAY_PORT", "5556"))
+ZMQ_REPLAY_BIND_ADDR = os.getenv("ZMQ_REPLAY_BIND_ADDR", f"tcp://*:{ZMQ_REPLAY_PORT}")
+ZMQ_REPLAY_CLIENT_ADDR = os.getenv("ZMQ_REPLAY_CLIENT_ADDR", f"tcp://{CHRONICLE_IP}:{ZMQ_REPLAY_PORT}")
 
 # Convenience
 TICK_PORT = ZMQ_PORT
@@ -0,0 +1,75 @@
+"""Time-sortable, collision-free ids shared by all Story Universe components.
+
+Layout (snowflake-style, fixed width so ids sort lexicographically by time):
+
+    <prefix>_<unix ms, 13 digits>_<node, 4 hex><sequence, 6 hex>
+    evt_1760659200123_3fa2000007
+
+- the millisecond part never goes backwards within a process, even if the
+  wall clock does; the sequence orders ids minted in the same millisecond
+  and borrows the next millisecond if it ever overflows
+- the node tag separates processes: set `STORY_NODE_ID` (0-65535) per
+  process for a hard guarantee; otherwise it is derived from host and pid
+
+Ids still match the `evt_<digits>_<word>` shape `CanonicalEvent` accepts.
+"""
+import os
+import socket
+import threading
+import time
+import zlib
+
+SEQUENCE_MAX = 0xFFFFFF
+NODE_MAX = 0xFFFF
+
+
+def default_node_id() -> int:
+    env = os.getenv("STORY_NODE_ID")
+    if env:
+        return int(env, 0) & NODE_MAX
+    return zlib.crc32(f"{socket.gethostname()}:{os.getpid()}".encode("utf-8")) & NODE_MAX
+
+
+class IdGenerator:
+    """Thread-safe monotonic id source for one process."""
+
+    def __init__(self, node_id=None):
+        self.node_id = (default_node_id() if node_id is None else int(node_id)) & NODE_MAX
+        self._lock = threading.Lock()
+        self._last_ms = 0
+        self._seq = 0
+
+    def _next(self):
+        now = time.time_ns() // 1_000_000
+        with self._lock:
+            if now > self._last_ms:
+                self._last_ms = now
+                self._seq = 0
+            else:
+                self._seq += 1
+                if self._seq > SEQUENCE_MAX:
+                    self._last_ms += 1
+                    self._seq = 0
+            return self._last_ms, self._seq
+
+    def new_id(self, prefix: str = "evt") -> str:
+        ms, seq = self._next()
+        return f"{prefix}_{ms:013d}_{self.node_id:04x}{seq:06x}"
+
+
+_default = IdGenerator()
+
+
+def _reset_after_fork():
+    # a forked child would otherwise replay its parent's (ms, node, seq) stream
+    global _default
+    _default = IdGenerator()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def new_id(prefix: str = "evt") -> str:
+    """Mint an id from the process-wide generator."""
+    return _default.new_id(prefix)
@@ -0,0 +1,236 @@
+"""Pluggable payload codecs for the ZMQ tick/event stream.
+
+Every message is three frames:
+
+    [topic, content type, body]
+    [b"system:tick", b"application/msgpack", <msgpack bytes>]
+
+The content-type frame makes each message self-describing. Subscribers
+decode whatever arrives with `decode_frames`. Two-frame `[topic, json]`
+messages from older publishers are read as JSON.
+
+A sequenced publisher appends a fourth frame, the message's per-topic
+sequence number (8-byte big-endian). `SequenceTracker` spots gaps in that
+numbering. `fetch_range` then asks the publisher's replay side channel
+(REQ/REP) for exactly the missing messages. The publisher chooses its
+codec by name (`get_codec`). MessagePack needs the optional `msgpack`
+package; without it `get_codec("msgpack")` falls back to JSON, so the wire
+stays readable everywhere.
+"""
+import json
+import logging
+import struct
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+
+
+class UnsupportedContentType(ValueError):
+    """A message arrived in a codec this process cannot decode."""
+
+
+class Codec:
+    def __init__(self, name: str, content_type: str, encode: Callable[[Any], bytes], decode: Callable[[bytes], Any]):
+        self.name = name
+        self.content_type = content_type
+        self.content_type_frame = content_type.encode("ascii")
+        self.encode = encode
+        self.decode = decode
+
+    def __repr__(self):
+        return f"Codec({self.name!r})"
+
+
+def _json_encode(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+JSON_CODEC = Codec("json", JSON, _json_encode, json.loads)
+
+# content type -> codec; `register_codec` adds more
+CODECS: Dict[str, Codec] = {JSON: JSON_CODEC}
+
+try:
+    import msgpack
+
+    MSGPACK_CODEC = Codec(
+        "msgpack",
+        MSGPACK,
+        lambda obj: msgpack.packb(obj, use_bin_type=True),
+        lambda data: msgpack.unpackb(data, raw=False),
+    )
+    CODECS[MSGPACK] = MSGPACK_CODEC
+except ImportError:
+    MSGPACK_CODEC = None
+
+
+def register_codec(codec: Codec):
+    CODECS[codec.content_type] = codec
+
+
+def available_codecs() -> List[str]:
+    return [c.name for c in CODECS.values()]
+
+
+def get_codec(name: str = "json") -> Codec:
+    """Codec by name or content type; unknown or unavailable ones fall back to JSON."""
+    for codec in CODECS.values():
+        if name in (codec.name, codec.content_type):
+            return codec
+    logger.warning("Wire codec %r is not available (installed: %s); using JSON", name, ", ".join(available_codecs()))
+    return JSON_CODEC
+
+
+class Encoded:
+    """A payload that was already encoded (by `codec`); sent as-is, never re-encoded.
+
+    `value` is the decoded form, for in-process readers and replay.
+    """
+
+    __slots__ = ("value", "codec", "body")
+
+    def __init__(self, value: Any, body: bytes, codec: Codec = JSON_CODEC):
+        self.value = value
+        self.body = body
+        self.codec = codec
+
+
+def encode_body(payload: Any, codec: Codec = JSON_CODEC) -> List[bytes]:
+    if isinstance(payload, Encoded):
+        return [payload.codec.content_type_frame, payload.body]
+    return [codec.content_type_frame, codec.encode(payload)]
+
+
+def decode_body(content_type: bytes, body: bytes) -> Any:
+    name = content_type.decode("ascii", "replace")
+    codec = CODECS.get(name)
+    if codec is None:
+        raise UnsupportedContentType(f"cannot decode {name!r}; installed: {', '.join(available_codecs())}")
+    return codec.decode(body)
+
+
+def encode_frames(topic: str, payload: Any, codec: Codec = JSON_CODEC, seq: Optional[int] = None) -> List[bytes]:
+    frames = [topic.encode("utf-8")] + encode_body(payload, codec)
+    if seq is not None:
+        frames.append(struct.pack(">Q", seq))
+    return frames
+
+
+def decode_sequenced(frames: List[bytes]) -> Tuple[str, Optional[int], Any]:
+    """`(topic, seq, payload)` from a received multipart message; seq is None if unsequenced."""
+    if len(frames) == 2:
+        # legacy [topic, json]
+        return frames[0].decode("utf-8"), None, json.loads(frames[1])
+    if len(frames) not in (3, 4):
+        raise ValueError(f"expected 2 to 4 frames, got {len(frames)}")
+    seq = struct.unpack(">Q", frames[3])[0] if len(frames) == 4 else None
+    return frames[0].decode("utf-8"), seq, decode_body(frames[1], frames[2])
+
+
+def decode_frames(frames: List[bytes]) -> Tuple[str, Any]:
+    """`(topic, payload)` from a received multipart message."""
+    topic, _seq, payload = decode_sequenced(frames)
+    return topic, payload
+
+
+def recv_message(sock, flags: int = 0) -> Tuple[str, Any]:
+    """Receive and decode one message from a SUB socket."""
+    return decode_frames(sock.recv_multipart(flags))
+
+
+def recv_sequenced(sock, flags: int = 0) -> Tuple[str, Optional[int], Any]:
+    return decode_sequenced(sock.recv_multipart(flags))
+
+
+class SequenceTracker:
+    """Per-topic gap detection for a sequenced stream.
+
+    The first message seen on a topic sets the baseline; nothing before it
+    is reported missing. A sequence number at or below the last one seen
+    means the publisher restarted, and the baseline resets.
+    """
+
+    def __init__(self):
+        self.last: Dict[str, int] = {}
+        self.gaps = 0
+        self.missed = 0
+        self.restarts = 0
+
+    def observe(self, topic: str, seq: Optional[int]) -> Optional[Tuple[int, int]]:
+        """Record `seq`; returns the inclusive `(first, last)` range skipped before it, if any."""
+        if seq is None:
+            return None
+        prev = self.last.get(topic)
+        self.last[topic] = seq
+        if prev is None:
+            return None
+        if seq <= prev:
+            self.restarts += 1
+            return None
+        if seq == prev + 1:
+            return None
+        self.gaps += 1
+        self.missed += seq - prev - 1
+        return prev + 1, seq - 1
+
+
+def fetch_range(addr: str, topic: str, first: int, last: int, timeout_ms: int = 1000,
+                context=None) -> Optional[Dict[str, Any]]:
+    """Ask a publisher's replay channel for messages `first..last` of `topic`.
+
+    Returns the reply, `{"topic", "first", "last", "messages": [[seq, payload], ...]}`.
+    Reply `first`/`last` are the oldest buffered and newest assigned sequence
+    numbers; requested messages older than `first` are gone. Returns None if
+    the publisher does not answer within `timeout_ms`.
+    """
+    import zmq
+
+    ctx = context or zmq.Context.instance()
+    sock = ctx.socket(zmq.REQ)
+    sock.setsockopt(zmq.LINGER, 0)
+    try:
+        sock.connect(addr)
+        sock.send_multipart(encode_body({"topic": topic, "first": int(first), "last": int(last)}))
+        if not sock.poll(timeout_ms):
+            logger.warning("Replay request to %s for %s %d..%d timed out", addr, topic, first, last)
+            return None
+        content_type, body = sock.recv_multipart()
+        return decode_body(content_type, body)
+    finally:
+        sock.close()
+
+
+class GapFiller:
+    """Sequence tracking plus replay for a subscriber loop.
+
+    `process` returns what to handle for one received message: any
+    recovered messages it skipped, oldest first, followed by the message
+    itself. With no `replay_addr`, gaps are only counted.
+    """
+
+    def __init__(self, replay_addr: Optional[str], timeout_ms: int = 1000, context=None):
+        self.replay_addr = replay_addr
+        self.timeout_ms = timeout_ms
+        self.context = context
+        self.tracker = SequenceTracker()
+        self.recovered = 0
+        self.lost = 0
+
+    def process(self, topic: str, seq: Optional[int], payload: Any) -> List[Any]:
+        gap = self.tracker.observe(topic, seq)
+        if gap is None:
+            return [payload]
+        first, last = gap
+        reply = None
+        if self.replay_addr:
+            reply = fetch_range(self.replay_addr, topic, first, last, self.timeout_ms, self.context)
+        got = [p for _s, p in (reply or {}).get("messages", [])]
+        self.recovered += len(got)
+        lost = last - first + 1 - len(got)
+        if lost:
+            self.lost += lost
+            logger.warning("Lost %d of %d messages %d..%d on %s", lost, last - first + 1, first, last, topic)
+        return got + [payload]